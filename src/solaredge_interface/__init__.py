@@ -9,6 +9,7 @@ __license__ = "MIT"
 __env_api_key__ = 'SOLAREDGE_API_KEY'
 __env_site_id__ = 'SOLAREDGE_SITE_ID'
 __env_output_format__ = 'SOLAREDGE_OUTPUT_FORMAT'
+__env_api_baseurl__ = 'SOLAREDGE_API_BASEURL'
 
 __output_format_default__ = 'json'
 
@@ -18,4 +19,5 @@ __config_section_name__ = 'solaredge-interface'
 
 __solaredge_api_baseurl__ = 'https://monitoringapi.solaredge.com'
 __http_request_timeout__ = 10
+__http_request_parallel__ = 3  # the SolarEdge API permits 3 concurrent requests per api_key
 __http_request_user_agent__ = '{}/{}'.format(__title__, __version__)
@@ -0,0 +1,275 @@
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+
+from solaredge_interface import __title__ as NAME
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+FLEET_INDEX_MAX_AGE = 86400  # seconds before the equipment of a site is refreshed again
+
+FLEET_INDEX_SCHEMA_VERSION = 2
+FLEET_INDEX_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS sites (site_id INTEGER PRIMARY KEY, name TEXT, account_id INTEGER, status TEXT, '
+    'peak_power REAL, timezone TEXT, last_update_time TEXT, refreshed REAL)',
+    'CREATE TABLE IF NOT EXISTS equipment (site_id INTEGER, kind TEXT, serial TEXT, name TEXT, manufacturer TEXT, '
+    'model TEXT, connected_to TEXT, PRIMARY KEY (site_id, kind, serial, name, connected_to))',
+    'CREATE INDEX IF NOT EXISTS equipment_serial ON equipment (serial)',
+    'CREATE INDEX IF NOT EXISTS equipment_model ON equipment (model)',
+    'CREATE TABLE IF NOT EXISTS groups (name TEXT, site_id INTEGER, PRIMARY KEY (name, site_id))',
+]
+
+EQUIPMENT_KINDS = {
+    'inverters': 'inverter',
+    'batteries': 'battery',
+    'meters': 'meter',
+    'gateways': 'gateway',
+}
+
+
+class FleetIndexException(SolarEdgeInterfaceException):
+    pass
+
+
+class FleetIndex:
+    """
+    A persistent sqlite index of the sites reachable by a `SolarEdgeAPI` instance and the equipment at each site, built
+    from `get_sites`, `get_site_inventory` and `get_site_equipment_sensors`.  The lookup methods of the index answer
+    from sqlite without requests; of the api methods only `get_site_inverter_data(fleet_index=...)` consults it.
+    """
+
+    api = None
+    filename = None
+    max_age = None
+
+    def __init__(self, api, filename=None, max_age=FLEET_INDEX_MAX_AGE):
+        """
+        _parameters_
+        * _api_ (SolarEdgeAPI) required - the api instance used to refresh the index.
+        * _filename_ (str) default: None - sqlite database filename; if None a `solaredge-interface.fleet.<hash>.sqlite`
+        file in the system temp directory is used, keyed by the baseurl and api_key of `api`.  Use `:memory:` for an
+        index that is not persisted.
+        * _max_age_ (int) default: `86400` - seconds before the equipment of a site is considered stale and refreshed.
+        """
+        self.api = api
+        self.filename = filename or self.default_filename(api)
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.filename, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            if self.connection.execute('PRAGMA user_version').fetchone()[0] != FLEET_INDEX_SCHEMA_VERSION:
+                for table in ['sites', 'equipment', 'groups']:
+                    self.connection.execute('DROP TABLE IF EXISTS {}'.format(table))
+                self.connection.execute('PRAGMA user_version = {:d}'.format(FLEET_INDEX_SCHEMA_VERSION))
+            for statement in FLEET_INDEX_SCHEMA:
+                self.connection.execute(statement)
+
+    @staticmethod
+    def default_filename(api):
+        """
+        Returns the default index filename for `api`; one file per baseurl and api_key (or key pool) so that a
+        `refresh()` under one key never drops the sites of another key.
+        """
+        api_keys = api.key_pool.api_keys if getattr(api, 'key_pool', None) is not None else [api.api_key]
+        key = '{}|{}'.format(api.baseurl, ','.join(sorted(api_keys)))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), '{}.fleet.{}.sqlite'.format(NAME, digest))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def refresh(self, site_ids=None, force=False, sensors=True):
+        """
+        Incrementally refresh the index; lists every site (or only `site_ids`) and fetches the inventory of sites that
+        are new, stale or have a changed `lastUpdateTime`.  Sites no longer listed by the api are dropped.  Returns the
+        list of site_ids whose equipment was refreshed.
+
+        _parameters_
+        * _site_ids_ (list) default: None - refresh only these sites; if None every site from `iter_sites()`.
+        * _force_ (bool) default: False - if True refresh the equipment of every site regardless of age.
+        * _sensors_ (bool) default: True - if True also index the sensors from `get_site_equipment_sensors`, one
+        additional request per refreshed site.
+        """
+        if site_ids is None:
+            sites = [self.__site_row(site) for site in self.api.iter_sites(status='All')]
+        else:
+            sites = []
+            for site_id in site_ids:
+                response = self.api.get_site_details(site_id)
+                if response.status_code != 200 or not response.data:
+                    raise FleetIndexException('Unable to obtain details for site_id {}'.format(site_id),
+                                              response.status_code, response.text)
+                sites.append(self.__site_row(response.data['details']))
+
+        with self.lock:
+            known = {row['site_id']: row for row in self.connection.execute('SELECT * FROM sites')}
+        now = time.time()
+        stale = [
+            site for site in sites
+            if force or site['site_id'] not in known
+            or (known[site['site_id']]['refreshed'] or 0) + self.max_age < now
+            or known[site['site_id']]['last_update_time'] != site['last_update_time']
+        ]
+
+        with self.lock, self.connection:
+            for site in sites:
+                # insert-or-ignore then update (rather than an upsert, which needs SQLite 3.24) keeps the refreshed
+                # and last_update_time columns of known sites
+                self.connection.execute(
+                    'INSERT OR IGNORE INTO sites (site_id, name, account_id, status, peak_power, timezone, '
+                    'last_update_time) VALUES (:site_id, :name, :account_id, :status, :peak_power, :timezone, '
+                    ':last_update_time)', site)
+                self.connection.execute(
+                    'UPDATE sites SET name=:name, account_id=:account_id, status=:status, peak_power=:peak_power, '
+                    'timezone=:timezone WHERE site_id=:site_id', site)
+            if site_ids is None:
+                listed = [site['site_id'] for site in sites]
+                for site_id in [site_id for site_id in known if site_id not in listed]:
+                    logger.debug('fleet-index; dropping site_id={}'.format(site_id))
+                    for table in ['sites', 'equipment', 'groups']:
+                        self.connection.execute('DELETE FROM {} WHERE site_id = ?'.format(table), (site_id,))
+
+        for site in stale:
+            self.__refresh_equipment(site, sensors=sensors)
+        return [site['site_id'] for site in stale]
+
+    @staticmethod
+    def __site_row(site):
+        return {
+            'site_id': int(site['id']),
+            'name': site.get('name'),
+            'account_id': site.get('accountId'),
+            'status': site.get('status'),
+            'peak_power': site.get('peakPower'),
+            'timezone': (site.get('location') or {}).get('timeZone'),
+            'last_update_time': str(site.get('lastUpdateTime')),
+        }
+
+    def __refresh_equipment(self, site, sensors=True):
+        site_id = site['site_id']
+        logger.debug('fleet-index; refreshing equipment for site_id={}'.format(site_id))
+        # bypass the LRU cache of get_site_inventory so a refresh always sees the current inventory
+        response = self.api.get_site_inventory(site_id, cache=False)
+        if response.status_code != 200 or not response.data:
+            raise FleetIndexException('Unable to obtain inventory for site_id {}'.format(site_id),
+                                      response.status_code, response.text)
+
+        rows = []
+        inventory = response.data.get('Inventory') or {}
+        for key, kind in EQUIPMENT_KINDS.items():
+            for item in inventory.get(key) or []:
+                serial = item.get('SN') or item.get('serialNumber') or item.get('name')
+                connected_to = item.get('connectedSolaredgeDeviceSN') or item.get('connectedInverterSn')
+                rows.append((site_id, kind, serial, item.get('name'), item.get('manufacturer'), item.get('model'),
+                             connected_to))
+
+        if sensors:
+            response = self.api.get_site_equipment_sensors(site_id)
+            if response.status_code == 200 and response.data:
+                for device in (response.data.get('SiteSensors') or {}).get('list') or []:
+                    for item in device.get('sensors') or []:
+                        rows.append((site_id, 'sensor', item.get('name'), item.get('measurement'), None,
+                                     item.get('type'), device.get('connectedTo')))
+            else:
+                logger.warning('fleet-index; unable to obtain sensors for site_id={}'.format(site_id))
+
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM equipment WHERE site_id = ?', (site_id,))
+            self.connection.executemany('INSERT OR REPLACE INTO equipment VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self.connection.execute('UPDATE sites SET refreshed = ?, last_update_time = ? WHERE site_id = ?',
+                                    (time.time(), site['last_update_time'], site_id))
+
+    def __select(self, sql, parameters=()):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, parameters)]
+
+    def site_ids(self):
+        """
+        Returns the indexed site_ids.
+        """
+        return [row['site_id'] for row in self.__select('SELECT site_id FROM sites ORDER BY site_id')]
+
+    def site(self, site_id):
+        """
+        Returns the indexed site as a dict with `timezone` and `inverters`, `batteries`, `meters`, `gateways` and
+        `sensors` equipment lists, or None if the site is not indexed.
+        """
+        rows = self.__select('SELECT * FROM sites WHERE site_id = ?', (int(site_id),))
+        if not rows:
+            return None
+        site = rows[0]
+        for key, kind in list(EQUIPMENT_KINDS.items()) + [('sensors', 'sensor')]:
+            site[key] = self.equipment(site_id, kind=kind)
+        return site
+
+    def timezone(self, site_id):
+        """
+        Returns the indexed timezone of `site_id` or None.
+        """
+        rows = self.__select('SELECT timezone FROM sites WHERE site_id = ?', (int(site_id),))
+        return rows[0]['timezone'] if rows else None
+
+    def equipment(self, site_id=None, kind=None):
+        """
+        Returns the indexed equipment, optionally only that of `site_id` and/or of `kind` (inverter, battery, meter,
+        gateway or sensor).
+        """
+        sql, parameters = 'SELECT * FROM equipment WHERE 1=1', []
+        if site_id is not None:
+            sql, parameters = sql + ' AND site_id = ?', parameters + [int(site_id)]
+        if kind is not None:
+            sql, parameters = sql + ' AND kind = ?', parameters + [kind]
+        return self.__select(sql + ' ORDER BY site_id, kind, serial', parameters)
+
+    def inverters(self, site_id):
+        """
+        Returns the inverter serial numbers of `site_id`.
+        """
+        return [row['serial'] for row in self.equipment(site_id, kind='inverter')]
+
+    def find_serial(self, serial):
+        """
+        Returns the equipment with serial number `serial`, including its `site_id`.
+        """
+        return self.__select('SELECT * FROM equipment WHERE serial = ?', (str(serial),))
+
+    def find_model(self, model):
+        """
+        Returns the equipment whose model matches `model`, an SQL LIKE pattern such as `SE%K`.
+        """
+        return self.__select('SELECT * FROM equipment WHERE model LIKE ? ORDER BY site_id, serial', (str(model),))
+
+    def set_group(self, name, site_ids):
+        """
+        Assign `site_ids` to the site group `name`, replacing the previous members of the group.
+        """
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM groups WHERE name = ?', (name,))
+            self.connection.executemany('INSERT INTO groups VALUES (?, ?)', [(name, int(s)) for s in site_ids])
+
+    def group(self, name):
+        """
+        Returns the site_ids in the site group `name`.
+        """
+        rows = self.__select('SELECT site_id FROM groups WHERE name = ? ORDER BY site_id', (name,))
+        return [row['site_id'] for row in rows]
+
+    def groups(self):
+        """
+        Returns the names of all site groups.
+        """
+        return [row['name'] for row in self.__select('SELECT DISTINCT name FROM groups ORDER BY name')]
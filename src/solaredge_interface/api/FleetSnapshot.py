@@ -0,0 +1,212 @@
+
+import os
+import json
+import mmap
+import time
+import bisect
+import struct
+import logging
+
+from solaredge_interface.utils.json import json_decode
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+FLEET_SNAPSHOT_MAGIC = b'SEFS'
+FLEET_SNAPSHOT_VERSION = 1
+FLEET_SNAPSHOT_HEADER = struct.Struct('<4sB3xqd')  # magic, version, site count, created (unix time)
+FLEET_SNAPSHOT_KINDS = ['timezone', 'details', 'inventory', 'dataPeriod']
+FLEET_SNAPSHOT_PAGE_SIZE = 100  # sites per get_sites page and per bulk-mode get_site_data_period request
+
+
+class FleetSnapshotException(SolarEdgeInterfaceException):
+    pass
+
+
+class FleetSnapshot:
+    """
+    A read-only, memory-mapped snapshot of fleet metadata; the timezone and the `get_site_details`,
+    `get_site_inventory` and `get_site_data_period` response bodies of every site.  Pass it (or its filename) as the
+    `fleet_snapshot` of `SolarEdgeAPI` to serve those lookups without requests, so that short-lived processes start
+    without re-fetching metadata.  Create a snapshot with `FleetSnapshot.export()`.
+
+    The file is a sorted int64 site_id table, an int64 `(offset, length)` table of the bodies of each site and the
+    bodies themselves; lookups bisect the mapped site_id table and copy only the body requested.
+    """
+
+    filename = None
+    created = None
+
+    def __init__(self, filename):
+        """
+        _parameters_
+        * _filename_ (str) required - the snapshot file written by `FleetSnapshot.export()`.
+        """
+        self.filename = filename
+        try:
+            with open(filename, 'rb') as f:
+                self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise FleetSnapshotException('Unable to open fleet snapshot: {}'.format(e), filename)
+        if len(self.mapped) < FLEET_SNAPSHOT_HEADER.size:
+            raise FleetSnapshotException('Truncated fleet snapshot', filename)
+        magic, version, count, self.created = FLEET_SNAPSHOT_HEADER.unpack_from(self.mapped, 0)
+        if magic != FLEET_SNAPSHOT_MAGIC or version != FLEET_SNAPSHOT_VERSION:
+            raise FleetSnapshotException('Not a version {} fleet snapshot'.format(FLEET_SNAPSHOT_VERSION), filename)
+        view = memoryview(self.mapped)
+        offset = FLEET_SNAPSHOT_HEADER.size
+        self.site_table = view[offset:offset + 8 * count].cast('q')
+        offset += 8 * count
+        self.body_table = view[offset:offset + 8 * 2 * len(FLEET_SNAPSHOT_KINDS) * count].cast('q')
+
+    def __len__(self):
+        return len(self.site_table)
+
+    def __contains__(self, site_id):
+        return self.__index(site_id) is not None
+
+    def __index(self, site_id):
+        try:
+            site_id = int(str(site_id).strip())
+        except ValueError:
+            return None
+        index = bisect.bisect_left(self.site_table, site_id)
+        if index < len(self.site_table) and self.site_table[index] == site_id:
+            return index
+        return None
+
+    def site_ids(self):
+        """
+        Returns the site_ids in the snapshot.
+        """
+        return self.site_table.tolist()
+
+    def body(self, site_id, kind):
+        """
+        Returns the bytes of the `kind` body (timezone, details, inventory or dataPeriod) of `site_id`, or None if it
+        is not in the snapshot.
+        """
+        index = self.__index(site_id)
+        if index is None:
+            return None
+        position = (index * len(FLEET_SNAPSHOT_KINDS) + FLEET_SNAPSHOT_KINDS.index(kind)) * 2
+        offset, length = self.body_table[position], self.body_table[position + 1]
+        if length < 0:
+            return None
+        return self.mapped[offset:offset + length]
+
+    def timezone(self, site_id):
+        """
+        Returns the timezone of `site_id` or None.
+        """
+        body = self.body(site_id, 'timezone')
+        return body.decode('utf-8') if body else None
+
+    def close(self):
+        self.site_table.release()
+        self.body_table.release()
+        self.mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def write(filename, sites):
+        """
+        Write a snapshot of `sites`, a dict of `{site_id: {kind: body}}` with str or bytes bodies, to `filename`.
+        """
+        site_ids = sorted([int(site_id) for site_id in sites])
+        bodies = {int(site_id): kinds for site_id, kinds in sites.items()}
+        table_bytes = FLEET_SNAPSHOT_HEADER.size + 8 * len(site_ids) * (1 + 2 * len(FLEET_SNAPSHOT_KINDS))
+        offsets, blob = [], []
+        position = table_bytes
+        for site_id in site_ids:
+            for kind in FLEET_SNAPSHOT_KINDS:
+                body = bodies[site_id].get(kind)
+                if body is None:
+                    offsets.extend([0, -1])
+                    continue
+                body = body.encode('utf-8') if type(body) is str else bytes(body)
+                offsets.extend([position, len(body)])
+                blob.append(body)
+                position += len(body)
+
+        temp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(temp_filename, 'wb') as f:
+            f.write(FLEET_SNAPSHOT_HEADER.pack(FLEET_SNAPSHOT_MAGIC, FLEET_SNAPSHOT_VERSION, len(site_ids),
+                                               time.time()))
+            f.write(struct.pack('<{}q'.format(len(site_ids)), *site_ids))
+            f.write(struct.pack('<{}q'.format(len(offsets)), *offsets))
+            for body in blob:
+                f.write(body)
+        os.replace(temp_filename, filename)
+
+    @classmethod
+    def export(cls, api, filename, site_ids=None):
+        """
+        Fetch the details, timezone, inventory and data period of every site (or only `site_ids`) with `api` and
+        write them as a snapshot to `filename`; returns the loaded `FleetSnapshot`.  Costs one request per page of
+        100 sites, one per site for the inventory and one bulk-mode request per 100 sites for the data periods.
+
+        _parameters_
+        * _api_ (SolarEdgeAPI) required - the api instance used, it must not itself use a `fleet_snapshot`.
+        * _filename_ (str) required - the snapshot file written.
+        * _site_ids_ (list) default: None - the sites in the snapshot, if None every site of the api_key.
+        """
+        if getattr(api, 'fleet_snapshot', None) is not None:
+            raise FleetSnapshotException('Export a fleet snapshot with a SolarEdgeAPI instance without a '
+                                         'fleet_snapshot')
+
+        sites = {}
+        if site_ids is None:
+            start_index, count = 0, None
+            while count is None or start_index < count:
+                response = api.get_sites(size=FLEET_SNAPSHOT_PAGE_SIZE, start_index=start_index, status='All')
+                data = json_decode(response.body) if response.status_code == 200 else None
+                if not data or 'sites' not in data:
+                    raise FleetSnapshotException('Unable to list sites', response.status_code, response.text)
+                count = data['sites'].get('count') or 0
+                page = data['sites'].get('site') or []
+                for site in page:
+                    sites[int(site['id'])] = {'details': json.dumps({'details': site})}
+                if not page:
+                    break
+                start_index += FLEET_SNAPSHOT_PAGE_SIZE
+        else:
+            for site_id in site_ids:
+                response = api.get_site_details(site_id)
+                if response.status_code != 200:
+                    raise FleetSnapshotException('Unable to obtain details for site_id {}'.format(site_id),
+                                                 response.status_code, response.text)
+                sites[int(site_id)] = {'details': response.body}
+
+        for site_id, kinds in sites.items():
+            details = json_decode(kinds['details'])['details']
+            kinds['timezone'] = (details.get('location') or {}).get('timeZone')
+            response = api.get_site_inventory(site_id)
+            if response.status_code == 200:
+                kinds['inventory'] = response.body
+            else:
+                logger.warning('fleet-snapshot; unable to obtain inventory for site_id={}'.format(site_id))
+
+        site_id_list = sorted(sites)
+        for index in range(0, len(site_id_list), FLEET_SNAPSHOT_PAGE_SIZE):
+            group = site_id_list[index:index + FLEET_SNAPSHOT_PAGE_SIZE]
+            response = api.get_site_data_period(','.join([str(site_id) for site_id in group]))
+            data = json_decode(response.body) if response.status_code == 200 else None
+            if not data:
+                logger.warning('fleet-snapshot; unable to obtain data periods for {} sites'.format(len(group)))
+                continue
+            if 'dataPeriod' in data:
+                sites[group[0]]['dataPeriod'] = json.dumps(data)
+                continue
+            for item in (data.get('datePeriodList') or {}).get('siteEnergyList') or []:
+                if int(item['siteId']) in sites:
+                    sites[int(item['siteId'])]['dataPeriod'] = json.dumps({'dataPeriod': item['dataPeriod']})
+
+        cls.write(filename, sites)
+        logger.debug('fleet-snapshot; wrote {} sites to {}'.format(len(sites), filename))
+        return cls(filename)
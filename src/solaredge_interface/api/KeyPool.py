@@ -0,0 +1,177 @@
+
+import time
+import logging
+import datetime
+import threading
+import collections
+
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+KEY_POOL_DAILY_QUOTA = 300  # SolarEdge daily request quota per api_key
+KEY_POOL_BACKOFF = 1.0  # seconds a key is avoided after a 429 that is not the daily quota, eg too many concurrent
+
+
+class KeyPoolException(SolarEdgeInterfaceException):
+    pass
+
+
+class KeyPool:
+    """
+    A pool of SolarEdge `api_key` values, each with its own daily request quota.  The pool learns which sites each key
+    can reach and routes every request to a key that can reach the site(s) and still has budget left today, and it
+    splits bulk-mode site lists across keys so fleet-wide throughput grows with the number of keys.
+
+    Pass a `KeyPool`, or simply a list of api_key values, as the `api_key` of `SolarEdgeAPI`.
+    """
+
+    daily_quota = None
+    discovered = None
+
+    def __init__(self, api_keys, daily_quota=KEY_POOL_DAILY_QUOTA):
+        """
+        _parameters_
+        * _api_keys_ (list) required - the api_key values in the pool.
+        * _daily_quota_ (int) default: `300` - requests permitted per api_key per day.
+        """
+        api_keys = [str(api_key).strip() for api_key in api_keys if api_key and str(api_key).strip()]
+        if not api_keys:
+            raise KeyPoolException('Must provide at least one SolarEdge api_key value.')
+        self.api_keys = list(collections.OrderedDict.fromkeys(api_keys))
+        self.daily_quota = daily_quota
+        self.discovered = False
+        self.lock = threading.Lock()
+        self.day = None
+        self.used = collections.Counter()
+        self.exhausted = set()
+        self.backoff = {}
+        self.site_keys = collections.defaultdict(list)
+
+    def __len__(self):
+        return len(self.api_keys)
+
+    def __reset_day(self):
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        if self.day != today:
+            self.day = today
+            self.used.clear()
+            self.exhausted.clear()
+
+    def remaining(self, api_key):
+        """
+        Returns the number of requests `api_key` may still make today.
+        """
+        with self.lock:
+            self.__reset_day()
+            return self.__remaining(api_key)
+
+    def __remaining(self, api_key):
+        if api_key in self.exhausted:
+            return 0
+        return max(0, self.daily_quota - self.used[api_key])
+
+    def add_sites(self, api_key, site_ids):
+        """
+        Record that `api_key` can reach the `site_ids`.
+        """
+        with self.lock:
+            for site_id in site_ids:
+                if api_key not in self.site_keys[str(site_id)]:
+                    self.site_keys[str(site_id)].append(api_key)
+
+    def keys_for_site(self, site_id):
+        """
+        Returns the api_key values known to reach `site_id`, or all keys if the site has not been discovered.
+        """
+        return list(self.site_keys.get(str(site_id).strip()) or self.api_keys)
+
+    def acquire(self, site_ids=None):
+        """
+        Returns an api_key that can reach every one of `site_ids` (or any key if None) and has the most budget left
+        today, counting one request against it.  Keys backing off after a 429 are used last, and only once their
+        back-off has passed.
+        """
+        with self.lock:
+            self.__reset_day()
+            candidates = self.api_keys
+            for site_id in site_ids or []:
+                candidates = [api_key for api_key in candidates if api_key in self.keys_for_site(site_id)]
+            candidates = [api_key for api_key in candidates if self.__remaining(api_key) > 0]
+            if not candidates:
+                raise KeyPoolException('No api_key with remaining daily quota can reach site(s): {}'.format(
+                    ','.join([str(site_id) for site_id in site_ids or []]) or 'any'))
+            now = time.monotonic()
+            api_key = max(candidates, key=lambda k: (self.backoff.get(k, 0) <= now, self.__remaining(k)))
+            self.used[api_key] += 1
+            wait = self.backoff.get(api_key, 0) - now
+        if wait > 0:
+            logger.debug('key-pool; waiting {:.2f}s for api_key ending {}'.format(wait, api_key[-4:]))
+            time.sleep(wait)
+        return api_key
+
+    def rate_limited(self, api_key, quota_spent=False):
+        """
+        Record that the API answered a request of `api_key` with a 429 status.  The key is marked as having no budget
+        left today when `quota_spent` or when its daily quota has been used, otherwise the 429 was transient (eg more
+        than 3 concurrent requests) and the key is avoided for a short back-off.
+        """
+        with self.lock:
+            self.__reset_day()
+            if quota_spent or self.used[api_key] >= self.daily_quota:
+                logger.debug('key-pool; api_key ending {} daily quota spent'.format(api_key[-4:]))
+                self.exhausted.add(api_key)
+            else:
+                logger.debug('key-pool; api_key ending {} rate limited, backing off'.format(api_key[-4:]))
+                self.backoff[api_key] = time.monotonic() + KEY_POOL_BACKOFF
+
+    def partition(self, site_ids):
+        """
+        Split the bulk-mode `site_ids` into `{api_key: [site_id, ...]}` groups so that every site is requested with a
+        key that can reach it using as few keys (and therefore requests) as possible; keys with the most budget left
+        are preferred so successive bulk calls rotate across the pool.
+        """
+        with self.lock:
+            self.__reset_day()
+            groups = collections.OrderedDict()
+            for site_id in site_ids:
+                candidates = [k for k in self.keys_for_site(site_id) if self.__remaining(k) > 0]
+                if not candidates:
+                    raise KeyPoolException('No api_key with remaining daily quota can reach site: {}'.format(site_id))
+                api_key = max(candidates, key=lambda k: (k in groups, self.__remaining(k)))
+                groups.setdefault(api_key, []).append(site_id)
+            return groups
+
+    def consume(self, api_key):
+        """
+        Count one request against `api_key` that was made without `acquire()`, eg while discovering its sites.
+        """
+        with self.lock:
+            self.__reset_day()
+            self.used[api_key] += 1
+
+
+def merge_bulk_data(items):
+    """
+    Merge the decoded responses of one bulk-mode call that was split across api_keys back into a single response;
+    lists are concatenated, `count` values are summed and all other values are taken from the first response.
+    """
+    merged = None
+    for item in items:
+        merged = item if merged is None else _merge_bulk_item(merged, item)
+    return merged
+
+
+def _merge_bulk_item(merged, item):
+    if type(merged) is dict and type(item) is dict:
+        for key, value in item.items():
+            if key not in merged:
+                merged[key] = value
+            elif key == 'count' and type(merged[key]) is int and type(value) is int:
+                merged[key] += value
+            else:
+                merged[key] = _merge_bulk_item(merged[key], value)
+        return merged
+    if type(merged) is list and type(item) is list:
+        return merged + item
+    return merged
@@ -0,0 +1,283 @@
+
+import os
+import json
+import hashlib
+import logging
+import datetime
+import threading
+import collections
+
+from solaredge_interface.utils.json import json_decode
+from solaredge_interface.utils.http_request import Response
+from solaredge_interface.utils.timedates import FORMAT_DATE_STRING, FORMAT_DATETIME_STRING, period_start
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_CACHE_MAX_KEYS = 256
+SEGMENT_CACHE_SETTLE = datetime.timedelta(minutes=30)  # data newer than this is not yet final at the SolarEdge API
+
+SEGMENT_UNIT_DELTAS = {
+    'QUARTER_OF_AN_HOUR': datetime.timedelta(minutes=15),
+    'HOUR': datetime.timedelta(hours=1),
+    'DAY': datetime.timedelta(days=1),
+}
+
+SEGMENT_ENDPOINTS = {
+    # endpoint: (data key, per-meter values, date params, default time_unit)
+    'site_power': ('power', False, False, 'QUARTER_OF_AN_HOUR'),
+    'site_power_details': ('powerDetails', True, False, 'QUARTER_OF_AN_HOUR'),
+    'site_energy': ('energy', False, True, 'DAY'),
+    'site_energy_details': ('energyDetails', True, False, 'DAY'),
+}
+
+ONE_SECOND = datetime.timedelta(seconds=1)
+
+
+class SegmentCacheEntry(object):
+    __slots__ = ['lock', 'loaded', 'held', 'values', 'meters', 'template']
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False  # the persisted values have been read, see SegmentCache.directory
+        self.held = []  # sorted, non-overlapping [start, end) datetime intervals whose values are final
+        self.values = {}  # meter type -> (sorted datetime64[s] timestamps, float64 values with NaN for None)
+        self.meters = []
+        self.template = None
+
+
+class SegmentCache:
+    """
+    An interval-indexed cache of time-ranged site power and energy values keyed by (baseurl, site, endpoint, meters,
+    time_unit).  A request is served from the sub-ranges already held and only the missing gaps are fetched from the
+    API, so a sliding window such as "the last 7 days" costs one small request rather than a full one.
+
+    Only final data is held; values in the current period, or newer than `settle`, are fetched again on the next
+    request.  Bulk-mode requests and WEEK, MONTH and YEAR time units are not cached.
+
+    The values of each key are held as numpy arrays of timestamps and float values, and each request slices them.
+    With a `directory` the arrays are also persisted as a compact series file (see
+    `solaredge_interface.utils.series_file`) and reloaded by later processes, so history is fetched only once.  The file
+    is rewritten only when the held range of a key grows.  Uncompressed files (the default) are decoded straight from
+    the memory-mapped file into the held arrays without a decompressed copy.
+    """
+
+    max_keys = None
+    settle = None
+    directory = None
+    compress = None
+
+    def __init__(self, max_keys=SEGMENT_CACHE_MAX_KEYS, settle=SEGMENT_CACHE_SETTLE, directory=None, compress=False):
+        """
+        _parameters_
+        * _max_keys_ (int) default: `256` - the number of (baseurl, site, endpoint, meters, time_unit) keys held, the
+        least recently used key is dropped first.
+        * _settle_ (timedelta) default: 30 minutes - values newer than this are not held.
+        * _directory_ (str) default: None - directory the values of each key are persisted in, created if it does not
+        exist; if None values are held in memory only.
+        * _compress_ (bool) default: False - zlib compress the persisted values; smaller files that are decompressed
+        into a copy when they are reloaded.
+        """
+        self.max_keys = max_keys
+        self.settle = settle
+        self.directory = directory
+        self.compress = compress
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+    @staticmethod
+    def supports(endpoint, site_id, time_unit=None):
+        """
+        Returns True if requests to `endpoint` for `site_id` at `time_unit` can be served by the cache.
+        """
+        if endpoint not in SEGMENT_ENDPOINTS or site_id is None:
+            return False
+        if type(site_id) is list or ',' in str(site_id):
+            return False
+        return (time_unit or SEGMENT_ENDPOINTS[endpoint][3]) in SEGMENT_UNIT_DELTAS
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __entry(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = SegmentCacheEntry()
+                while len(self.entries) > self.max_keys:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.move_to_end(key)
+            return entry
+
+    def get(self, endpoint, site_id, params, fetch, tz=None, baseurl=None):
+        """
+        Returns a `Response` with the values of `params` (startTime/endTime or startDate/endDate, timeUnit, meters)
+        spliced from the held values and the gaps fetched with `fetch(params)`, which must return an http `Response`.
+        A failed gap fetch is returned as-is.  The `baseurl` the values are fetched from is part of the cache key so
+        that a shared `directory` never serves the values of one API endpoint for another.
+        """
+        data_key, per_meter, dates, default_time_unit = SEGMENT_ENDPOINTS[endpoint]
+        time_unit = params.get('timeUnit') or default_time_unit
+        meters = ','.join(sorted([m.strip() for m in str(params.get('meters') or '').split(',') if m.strip()]))
+        if dates:
+            start = datetime.datetime.strptime(str(params['startDate']), FORMAT_DATE_STRING)
+            end = datetime.datetime.strptime(str(params['endDate']), FORMAT_DATE_STRING) + SEGMENT_UNIT_DELTAS['DAY']
+        else:
+            start = datetime.datetime.strptime(str(params['startTime']), FORMAT_DATETIME_STRING)
+            end = datetime.datetime.strptime(str(params['endTime']), FORMAT_DATETIME_STRING) + ONE_SECOND
+        align = 'DAY' if dates else time_unit
+        start = period_start(start, align)
+        if period_start(end, align) != end:
+            end = period_start(end, align) + SEGMENT_UNIT_DELTAS[align]
+        # [start, end) is now aligned to whole periods
+        final = period_start(self.__now(tz) - self.settle, align)
+
+        key = (baseurl or '', str(site_id).strip(), endpoint, meters, time_unit)
+        entry = self.__entry(key)
+        with entry.lock:
+            if not entry.loaded:
+                # read outside the cache lock so a slow file read holds up only the requests for this key
+                if self.directory:
+                    self.__load(key, entry)
+                entry.loaded = True
+            held = entry.held
+            response = None
+            for gap_start, gap_end in self.__gaps(entry.held, start, end):
+                if dates:
+                    gap_params = dict(params, startDate=gap_start.strftime(FORMAT_DATE_STRING),
+                                      endDate=(gap_end - ONE_SECOND).strftime(FORMAT_DATE_STRING))
+                else:
+                    gap_params = dict(params, startTime=gap_start.strftime(FORMAT_DATETIME_STRING),
+                                      endTime=(gap_end - ONE_SECOND).strftime(FORMAT_DATETIME_STRING))
+                logger.debug('segment-cache; {} site_id={} fetching gap {} - {}'.format(
+                    endpoint, site_id, gap_start, gap_end))
+                response = fetch(gap_params)
+                data = json_decode(response.body) if response.status_code == 200 else None
+                if not data or data_key not in data:
+                    return response
+                self.__store(entry, data[data_key], per_meter)
+                if gap_start < min(gap_end, final):
+                    entry.held = self.__hold(entry.held, gap_start, min(gap_end, final))
+
+            if self.directory and entry.held != held:
+                self.__save(key, entry)
+            data = {data_key: self.__values(entry, per_meter, start, end)}
+        if response is None:
+            response = Response(url=None, status_code=200, elapsed=datetime.timedelta(0))
+        response.text = json.dumps(data)
+        response.size = len(response.text)
+        return response
+
+    def __filename(self, key):
+        return os.path.join(self.directory, '{}.sets'.format(hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()))
+
+    def __save(self, key, entry):
+        from solaredge_interface.utils.series_file import write_series
+
+        series = {str(index): entry.values[meter] for index, meter in enumerate(entry.meters)}
+        metadata = {
+            'key': list(key),
+            'held': [[start.strftime(FORMAT_DATETIME_STRING), end.strftime(FORMAT_DATETIME_STRING)]
+                     for start, end in entry.held],
+            'meters': entry.meters,
+            'template': entry.template,
+        }
+        write_series(self.__filename(key), series, metadata=metadata, compress=self.compress)
+
+    def __load(self, key, entry):
+        from solaredge_interface.utils.series_file import read_series, SeriesFileException
+
+        filename = self.__filename(key)
+        if not os.path.isfile(filename):
+            return
+        try:
+            metadata, series = read_series(filename)
+            if metadata['key'] != list(key):
+                return
+            for index, meter in enumerate(metadata['meters']):
+                entry.values[meter] = series[str(index)]
+            entry.meters = list(metadata['meters'])
+            entry.template = metadata['template']
+            entry.held = [(datetime.datetime.strptime(start, FORMAT_DATETIME_STRING),
+                           datetime.datetime.strptime(end, FORMAT_DATETIME_STRING)) for start, end in metadata['held']]
+        except (SeriesFileException, OSError, ValueError, KeyError) as e:
+            logger.warning('segment-cache; ignoring unreadable series file {}: {}'.format(filename, e))
+            entry.values.clear()
+            entry.meters, entry.template, entry.held = [], None, []
+            return
+        logger.debug('segment-cache; loaded {} from {}'.format(key, filename))
+
+    @staticmethod
+    def __now(tz=None):
+        if tz:
+            from pytz import timezone
+            return datetime.datetime.now(timezone(tz)).replace(tzinfo=None)
+        return datetime.datetime.now()
+
+    @staticmethod
+    def __gaps(held, start, end):
+        gaps = []
+        cursor = start
+        for held_start, held_end in held:
+            if held_end <= cursor:
+                continue
+            if held_start >= end:
+                break
+            if held_start > cursor:
+                gaps.append((cursor, held_start))
+            cursor = max(cursor, held_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    @staticmethod
+    def __hold(held, start, end):
+        merged = []
+        for held_start, held_end in sorted(held + [(start, end)]):
+            if merged and held_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], held_end))
+            else:
+                merged.append((held_start, held_end))
+        return merged
+
+    @staticmethod
+    def __store(entry, data, per_meter):
+        import numpy as np
+
+        meters = (data.get('meters') or []) if per_meter else [dict(data, type=None)]
+        for meter in meters:
+            if meter.get('type') not in entry.meters:
+                entry.meters.append(meter.get('type'))
+            items = meter.get('values') or []
+            timestamps = np.array([item['date'] for item in items], dtype='datetime64[s]')
+            values = np.array([item.get('value') for item in items], dtype='f8')
+            if meter.get('type') in entry.values:
+                # the fetched values come first so that they replace the held values of the same timestamp
+                held_timestamps, held_values = entry.values[meter.get('type')]
+                timestamps = np.concatenate([timestamps, held_timestamps])
+                values = np.concatenate([values, held_values])
+            timestamps, first = np.unique(timestamps, return_index=True)
+            entry.values[meter.get('type')] = (timestamps, values[first])
+        entry.template = {k: v for k, v in data.items() if k not in ('values', 'meters')}
+
+    @staticmethod
+    def __values(entry, per_meter, start, end):
+        import numpy as np
+
+        meters = []
+        for meter in entry.meters:
+            timestamps, values = entry.values[meter]
+            first, last = np.searchsorted(timestamps, np.array([start, end], dtype='datetime64[s]'))
+            dates = np.char.replace(np.datetime_as_string(timestamps[first:last], unit='s'), 'T', ' ').tolist()
+            missing = np.isnan(values[first:last])
+            values = values[first:last].astype(object)
+            values[missing] = None
+            meters.append({'type': meter, 'values': [
+                {'date': date, 'value': value} for date, value in zip(dates, values.tolist())
+            ]})
+        if per_meter:
+            return dict(entry.template or {}, meters=meters)
+        return dict(entry.template or {}, values=meters[0]['values'] if meters else [])
@@ -1,20 +1,49 @@
 
 import os
+import json
+import time
 import shelve
 import logging
 import tempfile
+import threading
+import datetime
 import functools
+import itertools
+import collections
+import concurrent.futures
 
 from solaredge_interface import __title__ as NAME
 from solaredge_interface import __solaredge_api_baseurl__ as BASEURL
+from solaredge_interface import __http_request_parallel__ as PARALLEL_DEFAULT
 from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
 from solaredge_interface.utils.url_join import url_join, url_join_site_ids
-from solaredge_interface.utils.http_request import http_request
+from solaredge_interface.utils.http_request import http_request, http_session, Response, SlimResponse
 from solaredge_interface.utils.json import json_decode
+from solaredge_interface.utils.cache import lru_cache_metrics
+from solaredge_interface.utils.singleflight import SingleFlight
+from solaredge_interface.utils.circuit_breaker import CircuitBreaker, CircuitBreakerException, StaleCache
+from solaredge_interface.api.KeyPool import KeyPool, KeyPoolException, merge_bulk_data
+from solaredge_interface.api.models import Site, data_to_model
+from solaredge_interface.api.SegmentCache import SegmentCache, SEGMENT_ENDPOINTS
+from solaredge_interface.api.FleetSnapshot import FleetSnapshot
+from solaredge_interface.utils.timedates import FORMAT_DATE_STRING, FORMAT_DATETIME_STRING, time_windows
+from solaredge_interface.utils.metrics import MetricsCollector, METRIC_REQUESTS, METRIC_RETRIES, \
+    METRIC_REQUEST_LATENCY, METRIC_RESPONSE_BYTES, METRIC_CACHE_HITS, METRIC_CACHE_MISSES, METRIC_PHASE_PREFIX, \
+    METRIC_COALESCED, METRIC_CIRCUIT_OPEN, METRIC_STALE
 
 logger = logging.getLogger(__name__)
 
 
+EQUIPMENT_DATA_WINDOW = datetime.timedelta(days=7)  # the equipment data API is limited to one week per request
+PROCESS_POOL_MIN_BYTES = 16384  # smaller responses are post-processed in-process, the IPC would cost more
+EXPORT_WINDOWS = {
+    # the longest period of one power or energy request by time unit, coarser time units are not split
+    'QUARTER_OF_AN_HOUR': datetime.timedelta(days=30),
+    'HOUR': datetime.timedelta(days=30),
+    'DAY': datetime.timedelta(days=365),
+}
+
+
 class SolarEdgeAPI:
     """
     This class implements Python3 interfaces to the documented SolarEdge API end-points.  Refer to
@@ -25,25 +54,107 @@ class SolarEdgeAPI:
     api_key = None
     datetime_response = None
     pandas_response = None
+    metrics = None
+    retries = None
+    baseurl = None
+    session = None
+    key_pool = None
+    single_flight = None
+    slim_response = None
+    bytes_decode = None
+    segment_cache = None
+    pandas_datetime64 = None
+    process_pool = None
+    circuit_breaker = None
+    stale_cache = None
+    fleet_snapshot = None
+    typed_response = None
+    pandas_bulk_long = None
 
-    def __init__(self, api_key, datetime_response=False, pandas_response=False):
+    tempfile_cache_lock = threading.Lock()
+
+    def __init__(self, api_key, datetime_response=False, pandas_response=False, metrics=None, retries=0,
+                 baseurl=BASEURL, session=None, slim_response=False, bytes_decode=False,
+                 segment_cache=None, pandas_datetime64=False, process_pool=None, circuit_breaker=None, transport=None,
+                 fleet_snapshot=None, typed_response=False, pandas_bulk_long=False):
         """
         To call the SolarEdge API you need a valid `api_key` which can be obtained from your SolarEdge account.
 
         _parameters_
-        * _api_key_ (str) required - a valid api_key from https://monitoring.solaredge.com
+        * _api_key_ (str|list|KeyPool) required - a valid api_key from https://monitoring.solaredge.com, or a list of
+        api_key values (or a `KeyPool`) to route each request to a key that can reach the site and has daily quota left.
         * _datetime_response_ (bool) default: False - if True then parse all fields with a date or datetime string and
         convert them into timezone aware Python datetime objects.
         * _pandas_response_ (bool) default: False - if True then parse response data and flatten into Pandas DataFrame
         and make available in the `.pandas` response attribute
+        * _metrics_ (MetricsSink) default: None - sink that receives per-endpoint counters and timings such as request
+        latency, response bytes, retries, cache hits/misses and post-processing phase times; if None an in-process
+        `MetricsCollector` is used and made available as the `.metrics` attribute.
+        * _retries_ (int) default: `0` - number of times to retry a request after a connection error, a timeout or a
+        429/5xx response status.
+        * _baseurl_ (str) default: `https://monitoringapi.solaredge.com` - the SolarEdge API base URL, override to
+        point the client at another endpoint such as a local `SolarEdgeMockServer`.
+        * _session_ (requests.Session) default: None - http session providing the connection pool used for all
+        requests; if None a session is created on the first request and shared by all calls on this instance.
+        * _slim_response_ (bool) default: False - if True return compact `SlimResponse` objects that decode `.data`
+        and build `.pandas` only when first accessed and can drop their raw text with `.release()`.
+        * _bytes_decode_ (bool) default: False - if True keep the raw response body bytes as `.content` and JSON decode
+        directly from them; `.text` is then only decoded from the bytes when it is accessed.
+        * _segment_cache_ (SegmentCache|bool) default: None - cache for the time-ranged power and energy methods that
+        fetches only the sub-ranges not already held; True to use a new `SegmentCache`.
+        * _pandas_datetime64_ (bool) default: False - if True the date and time columns of `.pandas` are built as
+        timezone aware `datetime64` in the site timezone with one vectorised localisation per column; the datetimes of
+        `.data` are then left naive in site local time rather than localised value by value.
+        * _process_pool_ (int|bool|Executor) default: None - build the `pandas_response` DataFrame of large responses in
+        worker processes; an int number of workers, True for one per CPU, or a shared `ProcessPoolExecutor`.
+        * _circuit_breaker_ (CircuitBreaker|bool) default: None - fail fast once requests keep failing and serve the
+        last successful response of a request, with its `.stale_age`, while the API is unavailable; True to use a new
+        `CircuitBreaker`.
+        * _transport_ (Transport|str) default: None - the transport all requests are made with in place of `session`,
+        eg an `Http2Transport` or a `RecordReplayTransport`; or a name as accepted by `transport_from_string()`.
+        * _fleet_snapshot_ (FleetSnapshot|str) default: None - a `FleetSnapshot` (or its filename, memory-mapped here)
+        that serves the site details, timezone, inventory and data period of the sites it holds without requests.
+        * _typed_response_ (bool) default: False - if True also build the response data into the typed, slotted
+        models of `solaredge_interface.api.models` and make them available in the `.model` response attribute.
+        * _pandas_bulk_long_ (bool) default: False - if True the `.pandas` of bulk-mode (multi-site) responses is a
+        long-format DataFrame with `site_id` and `timestamp` columns, see `bulk_to_pandas()`; if False bulk-mode
+        responses are tabulated like every other response.
         """
         if not api_key:
             raise SolarEdgeInterfaceException('Must provide a SolarEdge api_key value.')
+        if type(api_key) in (list, tuple):
+            api_key = KeyPool(api_key)
+        if isinstance(api_key, KeyPool):
+            self.key_pool = api_key
+            api_key = api_key.api_keys[0]
         self.api_key = api_key
         self.datetime_response = datetime_response
         self.pandas_response = pandas_response
+        self.metrics = metrics if metrics is not None else MetricsCollector()
+        self.retries = retries
+        self.baseurl = baseurl or BASEURL
+        if type(transport) is str:
+            from solaredge_interface.utils.transport import transport_from_string
+            transport = transport_from_string(transport)
+        self.session = transport if transport is not None else session
+        self.session_lock = threading.Lock()
+        self.key_pool_lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.slim_response = slim_response
+        self.bytes_decode = bytes_decode
+        self.segment_cache = SegmentCache() if segment_cache is True else segment_cache or None
+        self.pandas_datetime64 = pandas_datetime64
+        self.process_pool = process_pool
+        self.process_pool_lock = threading.Lock()
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker or None
+        self.stale_cache = StaleCache() if self.circuit_breaker is not None else None
+        self.revalidating = set()
+        self.revalidating_lock = threading.Lock()
+        self.fleet_snapshot = FleetSnapshot(fleet_snapshot) if type(fleet_snapshot) is str else fleet_snapshot
+        self.typed_response = typed_response
+        self.pandas_bulk_long = pandas_bulk_long
 
-    @functools.lru_cache()
+    @lru_cache_metrics('accounts')
     def get_accounts(self, size=100, start_index=0, search_text="", sort_property="", sort_order="ASC"):
         """
         Returns a list of sub-accounts (if available) that are accessible by the `api_key` with an ability to
@@ -64,8 +175,9 @@ class SolarEdgeAPI:
         DESC (descending)
 
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
-        url = url_join(BASEURL, "accounts", "list")
+        url = url_join(self.baseurl, "accounts", "list")
         params = {
             'api_key': self.api_key,
             'size': size,
@@ -76,9 +188,9 @@ class SolarEdgeAPI:
             params['searchText'] = search_text
         if sort_property:
             params['sortProperty'] = sort_property
-        return self.__response_wrapper(http_request(url, params))
+        return self.__request('accounts', url, params)
 
-    @functools.lru_cache()
+    @lru_cache_metrics('sites')
     def get_sites(self, size=100, start_index=0, search_text="", sort_property="", sort_order="ASC", status="Active,Pending"):
         """
         Returns the sites accessible by the `api_key` with an ability to search and filter.
@@ -98,9 +210,12 @@ class SolarEdgeAPI:
         * _status_ (str) default: `Active,Pending` - Select the sites to be included in the list by their status:
         Active, Pending, Disabled, All.
 
+        With a key pool the listing is that of a single api_key, use `iter_sites()` to list the sites of every key.
+
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
-        url = url_join(BASEURL, "sites", "list")
+        url = url_join(self.baseurl, "sites", "list")
         params = {
             'api_key': self.api_key,
             'size': size,
@@ -112,9 +227,110 @@ class SolarEdgeAPI:
             params['searchText'] = search_text
         if sort_property:
             params['sortProperty'] = sort_property
-        return self.__response_wrapper(http_request(url, params))
+        return self.__request('sites', url, params)
+
+    def iter_accounts(self, page_size=100, prefetch=2, search_text="", sort_property="", sort_order="ASC"):
+        """
+        Generator that yields every sub-account accessible by the `api_key`, walking all pages of `get_accounts()`
+        and fetching the following pages while the current page is consumed.
+
+        _parameters_
+        * _page_size_ (int) default: `100` - accounts requested per page, the API permits at most 100.
+        * _prefetch_ (int) default: `2` - number of pages fetched ahead of the page being consumed; 0 to fetch each
+        page only when it is needed.
+        * _search_text_, _sort_property_, _sort_order_ - as `get_accounts()`.
+        """
+        return self.__iter_pages(self.get_accounts, 'accounts', 'list', page_size, prefetch, search_text=search_text,
+                                 sort_property=sort_property, sort_order=sort_order)
+
+    def iter_sites(self, page_size=100, prefetch=2, typed=False, search_text="", sort_property="", sort_order="ASC",
+                   status="Active,Pending"):
+        """
+        Generator that yields every site accessible by the `api_key`, walking all pages of `get_sites()` and fetching
+        the following pages while the current page is consumed.  With a key pool the sites of every api_key are
+        listed in turn, each site once, so the result does not depend on which key has the most budget left.
+
+        _parameters_
+        * _page_size_ (int) default: `100` - sites requested per page, the API permits at most 100.
+        * _prefetch_ (int) default: `2` - number of pages fetched ahead of the page being consumed; 0 to fetch each
+        page only when it is needed.
+        * _typed_ (bool) default: False - if True yield `solaredge_interface.api.models.Site` records rather than the
+        decoded site dicts.
+        * _search_text_, _sort_property_, _sort_order_, _status_ - as `get_sites()`.
+        """
+        if self.key_pool is not None and len(self.key_pool) > 1:
+            sites = self.__iter_key_pool_sites(page_size, search_text=search_text, sort_property=sort_property,
+                                               sort_order=sort_order, status=status)
+        else:
+            sites = self.__iter_pages(self.get_sites, 'sites', 'site', page_size, prefetch, search_text=search_text,
+                                      sort_property=sort_property, sort_order=sort_order, status=status)
+        if not typed:
+            return sites
+        return (Site(site) for site in sites)
+
+    def __iter_pages(self, method, data_key, list_key, page_size, prefetch, **kwargs):
+        items, count = self.__page_items(method(size=page_size, start_index=0, **kwargs), data_key, list_key)
+        start_indexes = iter(range(page_size, count, page_size))
+        if not prefetch:
+            yield from items
+            for start_index in start_indexes:
+                items, _ = self.__page_items(method(size=page_size, start_index=start_index, **kwargs), data_key,
+                                             list_key)
+                if not items:
+                    break
+                yield from items
+            return
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=prefetch)
+        pages = collections.deque()
+        try:
+            for start_index in itertools.islice(start_indexes, prefetch):
+                pages.append(executor.submit(method, size=page_size, start_index=start_index, **kwargs))
+            yield from items
+            while pages:
+                items, _ = self.__page_items(pages.popleft().result(), data_key, list_key)
+                start_index = next(start_indexes, None)
+                if start_index is not None:
+                    pages.append(executor.submit(method, size=page_size, start_index=start_index, **kwargs))
+                if not items:
+                    break
+                yield from items
+        finally:
+            for page in pages:
+                page.cancel()
+            executor.shutdown(wait=False)
+
+    def __iter_key_pool_sites(self, page_size, search_text="", sort_property="", sort_order="ASC", status=None):
+        url = url_join(self.baseurl, "sites", "list")
+        params = {'size': page_size, 'sortOrder': sort_order, 'status': status}
+        if search_text:
+            params['searchText'] = search_text
+        if sort_property:
+            params['sortProperty'] = sort_property
+        seen = set()
+        for api_key in self.key_pool.api_keys:
+            start_index = 0
+            while True:
+                self.key_pool.consume(api_key)
+                response = self.__http_request('sites', url, dict(params, api_key=api_key, startIndex=start_index))
+                items, count = self.__page_items(self.__response_wrapper(response, endpoint='sites'), 'sites', 'site')
+                for site in items:
+                    if site.get('id') not in seen:
+                        seen.add(site.get('id'))
+                        yield site
+                start_index += len(items)
+                if not items or start_index >= count:
+                    break
+
+    @staticmethod
+    def __page_items(response, data_key, list_key):
+        data = response.data if response.status_code == 200 else None
+        if type(data) is not dict or type(data.get(data_key)) is not dict:
+            raise SolarEdgeInterfaceException('Unable to list {}'.format(data_key), response.status_code,
+                                              response.text)
+        return data[data_key].get(list_key) or [], int(data[data_key].get('count') or 0)
 
-    @functools.lru_cache()
+    @lru_cache_metrics('site_details')
     def get_site_details(self, site_id):
         """
         Returns site details for `site_id` such as name, location, status, etc.
@@ -123,14 +339,18 @@ class SolarEdgeAPI:
         * _site_id_ (int) required - The site identifier to retrieve data for.
 
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
-        url = url_join(BASEURL, "site", site_id, "details")
+        snapshot_response = self.__snapshot_response('site_details', site_id, 'details')
+        if snapshot_response is not None:
+            return snapshot_response
+        url = url_join(self.baseurl, "site", site_id, "details")
         params = {
             'api_key': self.api_key
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_details', url, params, site_id=site_id)
 
-    @functools.lru_cache()
+    @lru_cache_metrics('site_timezone')
     def get_site_timezone(self, site_id, tempfile_cache_use=True):
         """
         Returns site timezone for `site_id` - returns from local tempfile cache to prevent repeated requests.  This
@@ -140,30 +360,48 @@ class SolarEdgeAPI:
         * _site_id_ (int) required - The site identifier to retrieve data for.
 
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
         if ',' in str(site_id):
             return None
+        if self.fleet_snapshot is not None:
+            tz = self.fleet_snapshot.timezone(site_id)
+            if tz is not None:
+                self.metrics.increment('site_timezone.snapshot', METRIC_CACHE_HITS)
+                return tz
         if tempfile_cache_use:
             temp_filename = os.path.join(tempfile.gettempdir(), '{}.cache'.format(NAME))
-            with shelve.open(temp_filename) as cached:
-                key = '{}.timezone'.format(str(site_id).strip())
-                logger.debug('get_site_timezone; cache key={}'.format(key))
-                if key not in cached:
-                    logger.debug('get_site_timezone; value not cached, adding to cache file {}'.format(temp_filename))
-                    response = http_request(url_join(BASEURL, "site", site_id, "details"), {'api_key': self.api_key})
-                    response.data = json_decode(response.text)
-                    cached[key] = response.data['details']['location']['timeZone']
-                else:
-                    logger.debug('get_site_timezone; value from cache file {}'.format(temp_filename))
-                tz = cached[key]
+            key = '{}.timezone'.format(str(site_id).strip())
+            if self.baseurl != BASEURL:
+                key = '{}|{}'.format(self.baseurl, key)
+            logger.debug('get_site_timezone; cache key={}'.format(key))
+            with self.tempfile_cache_lock, shelve.open(temp_filename) as cached:
+                tz = cached.get(key)
+            if tz is None:
+                logger.debug('get_site_timezone; value not cached, adding to cache file {}'.format(temp_filename))
+                self.metrics.increment('site_timezone.tempfile', METRIC_CACHE_MISSES)
+                tz = self.__request_site_timezone(site_id)
+                with self.tempfile_cache_lock, shelve.open(temp_filename) as cached:
+                    cached[key] = tz
+            else:
+                logger.debug('get_site_timezone; value from cache file {}'.format(temp_filename))
+                self.metrics.increment('site_timezone.tempfile', METRIC_CACHE_HITS)
         else:
             logger.debug('get_site_timezone; no cache use')
-            response = http_request(url_join(BASEURL, "site", site_id, "details"), {'api_key': self.api_key})
-            response.data = json_decode(response.text)
-            tz = response.data['details']['location']['timeZone']
+            tz = self.__request_site_timezone(site_id)
         return tz
 
-    @functools.lru_cache()
+    def __request_site_timezone(self, site_id):
+        response = self.__request('site_timezone', url_join(self.baseurl, "site", site_id, "details"),
+                                  {'api_key': self.api_key}, site_id=site_id, parse_response=False)
+        response.data = json_decode(response.body)
+        try:
+            return response.data['details']['location']['timeZone']
+        except (KeyError, TypeError):
+            raise SolarEdgeInterfaceException('Unable to obtain the timezone for site_id {}'.format(site_id),
+                                              response.status_code, response.text)
+
+    @lru_cache_metrics('site_data_period')
     def get_site_data_period(self, site_id):
         """
         Returns the start-date and end-date of energy production at the site(s).
@@ -173,12 +411,16 @@ class SolarEdgeAPI:
         int value or a list of int values to retrieve data in "bulk-mode"
 
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
-        url = url_join(BASEURL, url_join_site_ids(site_id), 'dataPeriod')
+        snapshot_response = self.__snapshot_response('site_data_period', site_id, 'dataPeriod')
+        if snapshot_response is not None:
+            return snapshot_response
+        url = url_join(self.baseurl, url_join_site_ids(site_id), 'dataPeriod')
         params = {
             'api_key': self.api_key
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_data_period', url, params, site_id=site_id)
 
     def get_site_energy(self, site_id, start_date, end_date, time_unit="DAY"):
         """
@@ -193,14 +435,14 @@ class SolarEdgeAPI:
         * _end_date_ (str) required - must be in format YYYY-MM-DD
         * _time_unit_ (str) default: `DAY` - Permitted values are: QUARTER_OF_AN_HOUR, HOUR, DAY, WEEK, MONTH, YEAR
         """
-        url = url_join(BASEURL, url_join_site_ids(site_id), 'energy')
+        url = url_join(self.baseurl, url_join_site_ids(site_id), 'energy')
         params = {
             'api_key': self.api_key,
             'startDate': start_date,
             'endDate': end_date,
             'timeUnit': time_unit
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__ranged_request('site_energy', url, params, site_id=site_id)
 
     def get_site_time_frame_energy(self, site_id, start_date, end_date):
         """
@@ -214,13 +456,13 @@ class SolarEdgeAPI:
         * _start_date_ (str) required - must be in format YYYY-MM-DD
         * _end_date_ (str) required - must be in format YYYY-MM-DD
         """
-        url = url_join(BASEURL, url_join_site_ids(site_id), 'timeFrameEnergy')
+        url = url_join(self.baseurl, url_join_site_ids(site_id), 'timeFrameEnergy')
         params = {
             'api_key': self.api_key,
             'startDate': start_date,
             'endDate': end_date
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_time_frame_energy', url, params, site_id=site_id)
 
     def get_site_overview(self, site_id):
         """
@@ -230,11 +472,11 @@ class SolarEdgeAPI:
         * _site_id_ (int or list) required - The site identifier(s) to retrieve data for, may be provided as a single
         int value or a list of int values to retrieve data in "bulk-mode"
         """
-        url = url_join(BASEURL, url_join_site_ids(site_id), 'overview')
+        url = url_join(self.baseurl, url_join_site_ids(site_id), 'overview')
         params = {
             'api_key': self.api_key
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_overview', url, params, site_id=site_id)
 
     def get_site_power(self, site_id, start_time, end_time):
         """
@@ -246,13 +488,13 @@ class SolarEdgeAPI:
         * _start_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
         * _end_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
         """
-        url = url_join(BASEURL, url_join_site_ids(site_id), 'power')
+        url = url_join(self.baseurl, url_join_site_ids(site_id), 'power')
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
             'endTime': end_time
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__ranged_request('site_power', url, params, site_id=site_id)
 
     def get_site_power_details(self, site_id, start_time, end_time, meters=None):
         """
@@ -267,7 +509,7 @@ class SolarEdgeAPI:
         * _meters_ (str) default: - If this value is omitted all meter readings are returned. The following values are
         permitted separated by comma: Production, Consumption, SelfConsumption, FeedIn, Purchased
         """
-        url = url_join(BASEURL, "site", site_id, "powerDetails")
+        url = url_join(self.baseurl, "site", site_id, "powerDetails")
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
@@ -275,7 +517,7 @@ class SolarEdgeAPI:
         }
         if meters:
             params['meters'] = meters
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__ranged_request('site_power_details', url, params, site_id=site_id)
 
     def get_site_energy_details(self, site_id, start_time, end_time, meters=None, time_unit="DAY"):
         """
@@ -291,7 +533,7 @@ class SolarEdgeAPI:
         are permitted separated by comma: Production, Consumption, SelfConsumption, FeedIn, Purchased
         * _time_unit_ (str) default: `DAY` - Permitted values are: QUARTER_OF_AN_HOUR, HOUR, DAY, WEEK, MONTH, YEAR
         """
-        url = url_join(BASEURL, "site", site_id, "energyDetails")
+        url = url_join(self.baseurl, "site", site_id, "energyDetails")
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
@@ -300,7 +542,131 @@ class SolarEdgeAPI:
         }
         if meters:
             params['meters'] = meters
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__ranged_request('site_energy_details', url, params, site_id=site_id)
+
+    def get_site_energy_rollup(self, site_id, start_time, end_time, time_units=None, meters=None):
+        """
+        Site energy of each meter for several time units from a single QUARTER_OF_AN_HOUR `get_site_energy_details`
+        request; the coarser time units are derived locally with DST-correct day boundaries in the site timezone and
+        the virtual meters (SelfConsumption, FeedIn, Purchased) are derived when not returned.  Returns a dict of
+        `{time_unit: DataFrame}` with one column per meter in Wh.
+
+        _parameters_
+        * _site_id_ (int) required - The site identifier to retrieve data for.
+        * _start_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
+        * _end_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss, at most one month after start_time
+        * _time_units_ (list) default: QUARTER_OF_AN_HOUR, HOUR, DAY, MONTH - the time units to derive.
+        * _meters_ (str) default: None - as `get_site_energy_details`, if omitted all meters.
+        """
+        from solaredge_interface.utils.rollup import rollup
+
+        response = self.get_site_energy_details(site_id, start_time, end_time, meters=meters,
+                                                time_unit='QUARTER_OF_AN_HOUR')
+        if response.status_code != 200 or not response.data:
+            raise SolarEdgeInterfaceException('Unable to obtain energy details for site_id {}'.format(site_id),
+                                              response.status_code, response.text)
+        with self.metrics.timer('site_energy_rollup', METRIC_PHASE_PREFIX + 'rollup'):
+            return rollup(response.data, time_units=time_units, tz=self.get_site_timezone(site_id))
+
+    def export_site_data(self, sink, endpoint, site_id, start_time, end_time, time_unit=None, meters=None,
+                         parallel=PARALLEL_DEFAULT):
+        """
+        Stream the power or energy values of one or more sites over a long timeframe into `sink` without holding the
+        whole result in memory.  The timeframe is split into the longest windows the API permits, each (site, window)
+        is requested concurrently and its values are handed to the sink as soon as it completes, the sink writes them
+        to disk once its memory limit is reached.  At most `2 * parallel` responses are held at any time.  Rows are
+        `site_id, meter, date, value` for the `*_details` endpoints and `site_id, date, value` otherwise, and are
+        written in completion order.  Returns the number of rows exported.
+
+        _parameters_
+        * _sink_ (Sink or str) required - a `solaredge_interface.utils.sink.Sink`, or a .csv, .ndjson or .parquet
+        filename to write to.
+        * _endpoint_ (str) required - site_power, site_power_details, site_energy or site_energy_details.
+        * _site_id_ (int, str or list) required - the site identifier(s), a list or comma separated values.
+        * _start_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss or YYYY-MM-DD
+        * _end_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss or YYYY-MM-DD
+        * _time_unit_ (str) default: None - as the endpoint, not used by site_power and site_power_details.
+        * _meters_ (str) default: None - as the `*_details` endpoints, if omitted all meters.
+        * _parallel_ (int) default: `3` - maximum number of concurrent requests.
+        """
+        if endpoint not in SEGMENT_ENDPOINTS:
+            raise SolarEdgeInterfaceException('Unable to export endpoint {}, use one of: {}'.format(
+                endpoint, ', '.join(SEGMENT_ENDPOINTS.keys())))
+        if not hasattr(sink, 'write'):
+            from solaredge_interface.utils.sink import open_sink
+            with open_sink(sink) as file_sink:
+                return self.export_site_data(file_sink, endpoint, site_id, start_time, end_time, time_unit=time_unit,
+                                             meters=meters, parallel=parallel)
+
+        data_key, per_meter, dates, default_time_unit = SEGMENT_ENDPOINTS[endpoint]
+        time_unit = time_unit or default_time_unit
+        if type(site_id) is not list:
+            site_id = str(site_id).split(',')
+        site_ids = [str(item).strip() for item in site_id if str(item).strip()]
+        start, end = self.__export_datetime(start_time), self.__export_datetime(end_time, end=True)
+        if dates:
+            start, end = start.replace(hour=0, minute=0, second=0), end.replace(hour=23, minute=59, second=59)
+        windows = time_windows(start, end, EXPORT_WINDOWS.get(time_unit))
+
+        def request_window(export_site_id, window):
+            url = url_join(self.baseurl, 'site', export_site_id, data_key)
+            params = {'api_key': self.api_key}
+            if dates:
+                params['startDate'], params['endDate'] = [item.strftime(FORMAT_DATE_STRING) for item in window]
+            else:
+                params['startTime'], params['endTime'] = [item.strftime(FORMAT_DATETIME_STRING) for item in window]
+            if endpoint != 'site_power' and endpoint != 'site_power_details':
+                params['timeUnit'] = time_unit
+            if meters and per_meter:
+                params['meters'] = meters
+            return self.__request(endpoint, url, params, site_id=export_site_id, parse_response=False)
+
+        jobs = iter([(export_site_id, window) for export_site_id in site_ids for window in windows])
+        logger.debug('export-site-data; {} {} sites, {} windows'.format(endpoint, len(site_ids), len(windows)))
+        rows = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(parallel))) as executor:
+            pending = {}
+            while True:
+                for job in itertools.islice(jobs, max(0, 2 * max(1, int(parallel)) - len(pending))):
+                    pending[executor.submit(request_window, *job)] = job
+                if not pending:
+                    break
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    export_site_id, window = pending.pop(future)
+                    response = future.result()
+                    data = json_decode(response.body) if response.status_code == 200 else None
+                    if not data or data_key not in data:
+                        raise SolarEdgeInterfaceException('Unable to export {} for site_id {} from {} to {}'.format(
+                            endpoint, export_site_id, *window), response.status_code, response.text)
+                    columns = self.__export_columns(export_site_id, data[data_key], per_meter)
+                    rows += len(columns['date'])
+                    sink.write(columns)
+                    del response, data, columns
+        sink.flush()
+        return rows
+
+    @staticmethod
+    def __export_datetime(value, end=False):
+        try:
+            return datetime.datetime.strptime(str(value), FORMAT_DATETIME_STRING)
+        except ValueError:
+            value = datetime.datetime.strptime(str(value), FORMAT_DATE_STRING)
+            return value.replace(hour=23, minute=59, second=59) if end else value
+
+    @staticmethod
+    def __export_columns(site_id, data, per_meter):
+        meters = (data.get('meters') or []) if per_meter else [data]
+        columns = collections.OrderedDict([('site_id', []), ('meter', []), ('date', []), ('value', [])])
+        for meter in meters:
+            values = meter.get('values') or []
+            columns['site_id'].extend([int(site_id) if site_id.isdigit() else site_id] * len(values))
+            columns['meter'].extend([meter.get('type')] * len(values))
+            columns['date'].extend([item.get('date') for item in values])
+            columns['value'].extend([item.get('value') for item in values])
+        if not per_meter:
+            del columns['meter']
+        return columns
 
     def get_site_current_power_flow(self, site_id):
         """
@@ -310,11 +676,11 @@ class SolarEdgeAPI:
         _parameters_
         * _site_id_ (int) required - The site identifier to retrieve data for.
         """
-        url = url_join(BASEURL, "site", site_id, "currentPowerFlow")
+        url = url_join(self.baseurl, "site", site_id, "currentPowerFlow")
         params = {
             'api_key': self.api_key
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_current_power_flow', url, params, site_id=site_id)
 
     def get_site_storage_data(self, site_id, start_time, end_time, serials=None):
         """
@@ -327,7 +693,7 @@ class SolarEdgeAPI:
         * _serials_ (list) default: None - Return data only for specific battery serial numbers; If omitted, the
         response includes all the batteries at the site.
         """
-        url = url_join(BASEURL, "site", site_id, "storageData")
+        url = url_join(self.baseurl, "site", site_id, "storageData")
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
@@ -335,7 +701,7 @@ class SolarEdgeAPI:
         }
         if serials:
             params['serials'] = serials
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_storage_data', url, params, site_id=site_id)
 
     # def get_site_image(self, site_id, name=None, max_width=None, max_height=None, hash=None):
     #     pass
@@ -354,18 +720,18 @@ class SolarEdgeAPI:
         values: `Metrics`, `Imperial` note these values are case sensitive. If system_units is not specified, the user
         system units are used.
         """
-        url = url_join(BASEURL, "site", site_id, "envBenefits")
+        url = url_join(self.baseurl, "site", site_id, "envBenefits")
         params = {
             'api_key': self.api_key,
         }
         if system_units:
             params['systemUnits'] = system_units
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_environmental_benefits', url, params, site_id=site_id)
 
     # def get_site_equipment_list(self, site_id):
     #     pass
 
-    @functools.lru_cache()
+    @lru_cache_metrics('site_inventory')
     def get_site_inventory(self, site_id):
         """
         Get the inventory of SolarEdge equipment at the site, including inverters/SMIs, batteries, meters,  gateways
@@ -375,12 +741,16 @@ class SolarEdgeAPI:
         * _site_id_ (int) required - The site identifier to retrieve data for.
 
         Uses Least-Recently-Used caching strategy to reduce calls to API backend and speed re-occurring function calls.
+        Pass `cache=False` to bypass the cache for one call.
         """
-        url = url_join(BASEURL, "site", site_id, "inventory")
+        snapshot_response = self.__snapshot_response('site_inventory', site_id, 'inventory')
+        if snapshot_response is not None:
+            return snapshot_response
+        url = url_join(self.baseurl, "site", site_id, "inventory")
         params = {
             'api_key': self.api_key
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_inventory', url, params, site_id=site_id)
 
     def get_site_equipment_data(self, site_id, start_time, end_time, serial_number):
         """
@@ -392,13 +762,91 @@ class SolarEdgeAPI:
         * _end_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
         * _serial_number_ (str) required - The inverter short serial number, eg 12345678-90
         """
-        url = url_join(BASEURL, "equipment", site_id, serial_number, "data")
+        url = url_join(self.baseurl, "equipment", site_id, serial_number, "data")
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
             'endTime': end_time
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_equipment_data', url, params, site_id=site_id)
+
+    def get_site_inverter_data(self, site_id, start_time, end_time, serial_numbers=None, parallel=PARALLEL_DEFAULT,
+                               fleet_index=None):
+        """
+        Get the inverter data of every inverter at the site for a given timeframe as one long-format result keyed by
+        inverter serial number and date.  The inverters are discovered from the site inventory and the timeframe is
+        split into one week windows that are requested concurrently; the merged `.data` is
+        `{'inverterData': {'count': ..., 'serialNumbers': [...], 'telemetries': [...]}}` with a `serialNumber` in each
+        telemetry, and `.pandas` is indexed by `(serialNumber, date)`.
+
+        _parameters_
+        * _site_id_ (int) required - The site identifier to retrieve data for.
+        * _start_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
+        * _end_time_ (str) required - must be in format YYYY-MM-DD hh:mm:ss
+        * _serial_numbers_ (list) default: None - the inverter serial numbers, if None all inverters at the site.
+        * _parallel_ (int) default: `3` - maximum number of concurrent requests.
+        * _fleet_index_ (FleetIndex) default: None - index used to look up the inverters without an inventory request.
+        """
+        if serial_numbers is None:
+            serial_numbers = self.__site_inverters(site_id, fleet_index)
+        elif type(serial_numbers) is str:
+            serial_numbers = [item.strip() for item in serial_numbers.split(',') if item.strip()]
+        if not serial_numbers:
+            raise SolarEdgeInterfaceException('No inverters found for site_id {}'.format(site_id))
+
+        windows = time_windows(datetime.datetime.strptime(str(start_time), FORMAT_DATETIME_STRING),
+                               datetime.datetime.strptime(str(end_time), FORMAT_DATETIME_STRING), EQUIPMENT_DATA_WINDOW)
+
+        def request_window(serial_number, window):
+            url = url_join(self.baseurl, "equipment", site_id, serial_number, "data")
+            params = {
+                'api_key': self.api_key,
+                'startTime': window[0].strftime(FORMAT_DATETIME_STRING),
+                'endTime': window[1].strftime(FORMAT_DATETIME_STRING),
+            }
+            return self.__request('site_equipment_data', url, params, site_id=site_id, parse_response=False)
+
+        jobs = [(serial_number, window) for serial_number in serial_numbers for window in windows]
+        logger.debug('site-inverter-data; {} inverters, {} windows'.format(len(serial_numbers), len(windows)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(parallel))) as executor:
+            responses = list(executor.map(lambda job: request_window(*job), jobs))
+
+        telemetries = []
+        for (serial_number, _), response in zip(jobs, responses):
+            if response.status_code != 200:
+                return self.__response_wrapper(response, endpoint='site_inverter_data', site_id=site_id)
+            data = json_decode(response.body) or {}
+            for telemetry in (data.get('data') or {}).get('telemetries') or []:
+                telemetries.append(dict({'serialNumber': serial_number}, **telemetry))
+
+        data = {'inverterData': {
+            'count': len(telemetries),
+            'serialNumbers': serial_numbers,
+            'telemetries': telemetries,
+        }}
+        elapsed = sum([item.elapsed or datetime.timedelta(0) for item in responses], datetime.timedelta(0))
+        response = Response(url=responses[0].url, status_code=200, headers=responses[0].headers, elapsed=elapsed,
+                            size=sum([item.size or 0 for item in responses]))
+
+        def tabulator(data):
+            from solaredge_interface.utils.pandas import records_to_pandas
+            return records_to_pandas(data['inverterData']['telemetries'], index=['serialNumber', 'date'])
+
+        return self.__response_wrapper(response, endpoint='site_inverter_data', site_id=site_id, tabulator=tabulator,
+                                       data=data)
+
+    def __site_inverters(self, site_id, fleet_index=None):
+        if fleet_index is not None:
+            serial_numbers = fleet_index.inverters(site_id)
+            if not serial_numbers:
+                fleet_index.refresh(site_ids=[site_id])
+                serial_numbers = fleet_index.inverters(site_id)
+            return serial_numbers
+        response = self.get_site_inventory(site_id)
+        if response.status_code != 200 or not response.data:
+            raise SolarEdgeInterfaceException('Unable to obtain inventory for site_id {}'.format(site_id),
+                                              response.status_code, response.text)
+        return [item['SN'] for item in (response.data.get('Inventory') or {}).get('inverters') or [] if 'SN' in item]
 
     def get_site_equipment_change_log(self, site_id, serial_number):
         """
@@ -409,11 +857,11 @@ class SolarEdgeAPI:
         * _site_id_ (int) required - The site identifier to retrieve data for.
         * _serial_number_ (str) required - Inverter, battery, optimizer or gateway short serial number.
         """
-        url = url_join(BASEURL, "equipment", site_id, serial_number, "changeLog")
+        url = url_join(self.baseurl, "equipment", site_id, serial_number, "changeLog")
         params = {
             'api_key': self.api_key,
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_equipment_change_log', url, params, site_id=site_id)
 
     def get_site_meters(self, site_id, start_time, end_time, meters=None):
         """
@@ -427,7 +875,7 @@ class SolarEdgeAPI:
         readings are returned.  Valid values: Production, Consumption,
          FeedIn, Purchased.
         """
-        url = url_join(BASEURL, "site", site_id, "meters")
+        url = url_join(self.baseurl, "site", site_id, "meters")
         params = {
             'api_key': self.api_key,
             'startTime': start_time,
@@ -435,7 +883,7 @@ class SolarEdgeAPI:
         }
         if meters:
             params['meters'] = meters
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_meters', url, params, site_id=site_id)
 
     def get_site_equipment_sensors(self, site_id):
         """
@@ -444,57 +892,369 @@ class SolarEdgeAPI:
         _parameters_
         * _site_id_ (int) required - The site identifier to retrieve data for.
         """
-        url = url_join(BASEURL, "equipment", site_id, "sensors")
+        url = url_join(self.baseurl, "equipment", site_id, "sensors")
         params = {
             'api_key': self.api_key,
         }
-        return self.__response_wrapper(http_request(url, params), site_id=site_id)
+        return self.__request('site_equipment_sensors', url, params, site_id=site_id)
 
     def get_version_current(self):
         """
         Return the most updated version number in <major.minor.revision> format.
         """
-        url = url_join(BASEURL, "version", "current")
+        url = url_join(self.baseurl, "version", "current")
         params = {
             'api_key': self.api_key,
         }
-        return self.__response_wrapper(http_request(url, params))
+        return self.__request('version_current', url, params)
 
     def get_version_supported(self):
         """
         Return a list of supported version numbers in <major.minor.revision> format
         """
-        url = url_join(BASEURL, "version", "supported")
+        url = url_join(self.baseurl, "version", "supported")
         params = {
             'api_key': self.api_key,
         }
-        return self.__response_wrapper(http_request(url, params))
-
-    def __response_wrapper(self, response, site_id=None, parse_response=True, pandas_column_trim=None):
-        if parse_response:
-            response.data = json_decode(response.text)
-            if response.data:
-                if self.datetime_response:
-                    try:
-                        data_to_datetime
-                    except NameError:
-                        logger.debug('from solaredge_interface.utils.timedates import data_to_datetime')
-                        from solaredge_interface.utils.timedates import data_to_datetime
-                    response.data = data_to_datetime(data=response.data)
-
-                if site_id:
-                    try:
-                        set_datetime_tzinfo
-                    except NameError:
-                        logger.debug('from solaredge_interface.utils.timedates import set_datetime_tzinfo')
-                        from solaredge_interface.utils.timedates import set_datetime_tzinfo
-                    response.data = set_datetime_tzinfo(data=response.data, tz=self.get_site_timezone(site_id))
-
-                if self.pandas_response:
-                    try:
-                        data_to_pandas
-                    except NameError:
-                        logger.debug('solaredge_interface.utils.pandas import data_to_pandas')
-                        from solaredge_interface.utils.pandas import data_to_pandas
-                    response.pandas = data_to_pandas(data=response.data, prefix_to_remove=pandas_column_trim)
+        return self.__request('version_supported', url, params)
+
+    def __session(self):
+        if self.session is None:
+            with self.session_lock:
+                if self.session is None:
+                    self.session = http_session()
+        return self.session
+
+    def discover_key_pool(self):
+        """
+        Page through the sites reachable by every api_key in the key pool so that requests are routed to a key that
+        can reach the site; called automatically before the first request when the pool holds more than one key.
+        """
+        if self.key_pool is None:
+            return
+        with self.key_pool_lock:
+            if self.key_pool.discovered:
+                return
+            url = url_join(self.baseurl, "sites", "list")
+            for api_key in self.key_pool.api_keys:
+                start_index = 0
+                while True:
+                    params = {'api_key': api_key, 'size': 100, 'startIndex': start_index}
+                    self.key_pool.consume(api_key)
+                    response = self.__http_request('sites', url, params)
+                    if response.status_code != 200:
+                        logger.warning('key-pool; unable to list sites for api_key ending {}, http-status={}'.format(
+                            api_key[-4:], response.status_code))
+                        break
+                    sites = (json_decode(response.body) or {}).get('sites') or {}
+                    site_ids = [site['id'] for site in sites.get('site') or [] if 'id' in site]
+                    self.key_pool.add_sites(api_key, site_ids)
+                    start_index += len(site_ids)
+                    if not site_ids or start_index >= int(sites.get('count') or 0):
+                        break
+            self.key_pool.discovered = True
+
+    async def call_async(self, method, *args, **kwargs):
+        """
+        Awaitable wrapper that runs any `get_*` method, given by name or as a bound method, on the event loop's
+        default executor; identical concurrent calls from coroutines and threads share a single request.
+
+        ```python
+        >>> responses = await asyncio.gather(*[api.call_async('get_site_overview', 1234567) for _ in range(10)])
+        ```
+        """
+        import asyncio
+
+        if type(method) is str:
+            method = getattr(self, method)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(method, *args, **kwargs))
+
+    def __ranged_request(self, endpoint, url, params, site_id=None):
+        if self.segment_cache is None or not self.segment_cache.supports(endpoint, site_id, params.get('timeUnit')):
+            return self.__request(endpoint, url, params, site_id=site_id)
+
+        def fetch(gap_params):
+            return self.__request(endpoint, url, gap_params, site_id=site_id, parse_response=False)
+
+        response = self.segment_cache.get(endpoint, site_id, params, fetch, tz=self.get_site_timezone(site_id),
+                                          baseurl=self.baseurl)
+        return self.__response_wrapper(response, endpoint=endpoint, site_id=site_id)
+
+    def __snapshot_response(self, endpoint, site_id, kind):
+        if self.fleet_snapshot is None or type(site_id) is list or ',' in str(site_id):
+            return None
+        body = self.fleet_snapshot.body(site_id, kind)
+        if body is None:
+            return None
+        self.metrics.increment(endpoint + '.snapshot', METRIC_CACHE_HITS)
+        response = Response(url=None, status_code=200, elapsed=datetime.timedelta(0), content=body, encoding='utf-8',
+                            size=len(body))
+        return self.__response_wrapper(response, endpoint=endpoint, site_id=site_id)
+
+    def __request(self, endpoint, url, params, site_id=None, parse_response=True):
+        key = (endpoint, url, tuple(sorted([(k, str(v)) for k, v in params.items()])), parse_response)
+        response, shared = self.single_flight.do(key, self.__request_flight, endpoint, url, params, site_id,
+                                                 parse_response)
+        if shared:
+            self.metrics.increment(endpoint, METRIC_COALESCED)
+        return response
+
+    def __request_flight(self, endpoint, url, params, site_id, parse_response):
+        if self.key_pool is None:
+            response = self.__http_request(endpoint, url, params)
+        else:
+            response = self.__key_pool_request(endpoint, url, params, site_id)
+        if not parse_response:
+            return response
+        return self.__response_wrapper(response, endpoint=endpoint, site_id=site_id)
+
+    def __http_request(self, endpoint, url, params):
+        if self.circuit_breaker is not None:
+            return self.__circuit_breaker_request(endpoint, url, params)
+        with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'http'):
+            response = http_request(url, params, retries=self.retries, session=self.__session(),
+                                    decode_text=not self.bytes_decode)
+        return self.__http_response_metrics(endpoint, response)
+
+    def __http_response_metrics(self, endpoint, response):
+        self.metrics.increment(endpoint, METRIC_REQUESTS)
+        if response.retries:
+            self.metrics.increment(endpoint, METRIC_RETRIES, response.retries)
+        if response.elapsed is not None:
+            self.metrics.observe(endpoint, METRIC_REQUEST_LATENCY, response.elapsed.total_seconds())
+        if response.size is not None:
+            self.metrics.observe(endpoint, METRIC_RESPONSE_BYTES, response.size)
+        return response
+
+    def __circuit_breaker_request(self, endpoint, url, params):
+        key = StaleCache.key(url, params)
+        if not self.circuit_breaker.allow():
+            self.metrics.increment(endpoint, METRIC_CIRCUIT_OPEN)
+            response = self.__stale_response(endpoint, url, params, key)
+            if response is None:
+                raise CircuitBreakerException('Circuit open after repeated SolarEdge API failures, retry in {:.0f}s'
+                                              .format(self.circuit_breaker.retry_after()), url)
+            return response
+        try:
+            with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'http'):
+                response = http_request(url, params, retries=self.retries, session=self.__session(),
+                                        decode_text=not self.bytes_decode)
+        except OSError:  # requests connection errors and timeouts
+            self.circuit_breaker.record_failure()
+            response = self.__stale_response(endpoint, url, params, key)
+            if response is None:
+                raise
+            return response
+        except Exception:
+            # any other failure (eg a replay transport without a recording) must still release a half-open probe
+            self.circuit_breaker.record_failure()
+            raise
+        self.__http_response_metrics(endpoint, response)
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure()
+            return self.__stale_response(endpoint, url, params, key) or response
+        self.circuit_breaker.record_success()
+        if response.status_code == 200:
+            self.stale_cache.put(key, response)
         return response
+
+    def __stale_response(self, endpoint, url, params, key):
+        response = self.stale_cache.get(key)
+        if response is None:
+            return None
+        logger.debug('circuit-breaker; {} serving stale response, age {:.1f}s'.format(endpoint, response.stale_age))
+        self.metrics.increment(endpoint, METRIC_STALE)
+        with self.revalidating_lock:
+            if key in self.revalidating:
+                return response
+            self.revalidating.add(key)
+        threading.Thread(target=self.__revalidate, args=(endpoint, url, params, key), daemon=True).start()
+        return response
+
+    def __revalidate(self, endpoint, url, params, key):
+        try:
+            time.sleep(self.circuit_breaker.retry_after())
+            if self.circuit_breaker.allow():
+                logger.debug('circuit-breaker; {} revalidating in the background'.format(endpoint))
+                response = http_request(url, params, session=self.__session(), decode_text=not self.bytes_decode)
+                self.__http_response_metrics(endpoint, response)
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                    if response.status_code == 200:
+                        self.stale_cache.put(key, response)
+        except Exception as e:
+            self.circuit_breaker.record_failure()
+            logger.debug('circuit-breaker; {} revalidation failed: {}'.format(endpoint, e))
+        finally:
+            with self.revalidating_lock:
+                self.revalidating.discard(key)
+
+    def __key_pool_request(self, endpoint, url, params, site_id):
+        if len(self.key_pool) > 1 and not self.key_pool.discovered:
+            self.discover_key_pool()
+        if type(site_id) is list:
+            site_id = ','.join([str(item) for item in site_id])
+        site_ids = [item.strip() for item in str(site_id).split(',') if item.strip()] if site_id is not None else []
+
+        bulk_path = '/{}/'.format(url_join_site_ids(site_ids))
+        if len(site_ids) > 1 and bulk_path in url:
+            groups = self.key_pool.partition(site_ids)
+            if len(groups) > 1:
+                logger.debug('key-pool; {} bulk request split across {} api_keys'.format(endpoint, len(groups)))
+                responses = []
+                for group in groups.values():
+                    group_url = url.replace(bulk_path, '/{}/'.format(url_join('sites', ','.join(group))))
+                    responses.append(self.__key_pool_request_key(endpoint, group_url, params, group))
+                return self.__merge_bulk_responses(responses)
+        return self.__key_pool_request_key(endpoint, url, params, site_ids)
+
+    def __key_pool_request_key(self, endpoint, url, params, site_ids):
+        response = None
+        for _ in range(len(self.key_pool)):
+            try:
+                api_key = self.key_pool.acquire(site_ids)
+            except KeyPoolException:
+                if response is None:
+                    raise
+                return response
+            response = self.__http_request(endpoint, url, dict(params, api_key=api_key))
+            if response.status_code != 429:
+                break
+            self.key_pool.rate_limited(api_key)
+        return response
+
+    @staticmethod
+    def __merge_bulk_responses(responses):
+        for response in responses:
+            if response.status_code != 200:
+                return response
+        response = responses[0]
+        response.text = json.dumps(merge_bulk_data([json_decode(item.body) for item in responses]))
+        response.size = sum([item.size or 0 for item in responses])
+        return response
+
+    def __response_wrapper(self, response, endpoint=None, site_id=None, parse_response=True, pandas_column_trim=None,
+                           tabulator=None, data=None):
+        # data - already JSON decoded data of a response built here rather than fetched, it has no body to decode
+        if not parse_response:
+            return response
+        decoder = functools.partial(self.__decode_data, endpoint=endpoint, site_id=site_id, data=data)
+        if self.process_pool and self.pandas_response and not self.slim_response and tabulator is None \
+                and data is None and (response.size or 0) >= PROCESS_POOL_MIN_BYTES:
+            response = self.__response_postprocess(response, decoder, endpoint=endpoint, site_id=site_id,
+                                                   pandas_column_trim=pandas_column_trim)
+            if self.typed_response and response.data:
+                self.__model_response(response, response.data, decoder, endpoint=endpoint)
+            return response
+
+        if not self.pandas_response:
+            tabulator = None
+        else:
+            tabulator = functools.partial(self.__tabulate_data, endpoint=endpoint, site_id=site_id,
+                                          tabulator=tabulator, pandas_column_trim=pandas_column_trim)
+        modeler = functools.partial(self.__model_data, endpoint=endpoint) if self.typed_response else None
+        if self.slim_response:
+            return SlimResponse(response, decoder=decoder, tabulator=tabulator, modeler=modeler)
+
+        decoded = decoder(response.body)
+        if decoded and tabulator is not None:
+            response.pandas = tabulator(decoded)
+        if decoded and modeler is not None and data is None:
+            self.__model_response(response, decoded, decoder, endpoint=endpoint)
+        else:
+            if decoded and modeler is not None:
+                response.model = modeler(decoded)
+            response.data = decoded
+        return response
+
+    def __model_response(self, response, data, decoder, endpoint=None):
+        # with a model the decoded data is not kept, `.data` is decoded from the body on first access and kept
+        response.model = self.__model_data(data, endpoint=endpoint)
+        if response.model is None:
+            response.data = data
+        else:
+            response.data, response.decoder = None, decoder
+
+    def __process_pool(self):
+        if not isinstance(self.process_pool, concurrent.futures.Executor):
+            with self.process_pool_lock:
+                if not isinstance(self.process_pool, concurrent.futures.Executor):
+                    max_workers = None if self.process_pool is True else int(self.process_pool)
+                    self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        return self.process_pool
+
+    def __response_postprocess(self, response, decoder, endpoint=None, site_id=None, pandas_column_trim=None):
+        from solaredge_interface.utils.postprocess import postprocess, columns_to_dataframe
+
+        if type(site_id) is list:
+            site_id = ','.join([str(item) for item in site_id])
+        tz = self.get_site_timezone(site_id) if site_id else None
+        with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'process_pool'):
+            columns = self.__process_pool().submit(
+                postprocess, response.body, datetime_response=self.datetime_response, tz=tz,
+                pandas_response=self.pandas_response, pandas_column_trim=pandas_column_trim,
+                pandas_datetime64=self.pandas_datetime64, pandas_bulk_long=self.pandas_bulk_long
+            ).result()
+            if columns is not None:
+                response.pandas = columns_to_dataframe(columns)
+        # only the DataFrame comes back from the worker, `.data` is decoded in-process on first access
+        response.decoder = decoder
+        return response
+
+    def __decode_data(self, body, endpoint=None, site_id=None, data=None):
+        if data is None:
+            with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'json_decode'):
+                data = json_decode(body)
+        if data:
+            if self.datetime_response:
+                try:
+                    data_to_datetime
+                except NameError:
+                    logger.debug('from solaredge_interface.utils.timedates import data_to_datetime')
+                    from solaredge_interface.utils.timedates import data_to_datetime
+                with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'data_to_datetime'):
+                    data = data_to_datetime(data=data)
+
+            # with pandas_datetime64 the timezone is applied once per column of .pandas instead of once per value
+            if site_id and not (self.pandas_response and self.pandas_datetime64):
+                try:
+                    set_datetime_tzinfo
+                except NameError:
+                    logger.debug('from solaredge_interface.utils.timedates import set_datetime_tzinfo')
+                    from solaredge_interface.utils.timedates import set_datetime_tzinfo
+                if type(site_id) is list:
+                    site_id = ','.join([str(item) for item in site_id])
+                tz = self.get_site_timezone(site_id)
+                with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'set_datetime_tzinfo'):
+                    data = set_datetime_tzinfo(data=data, tz=tz)
+        return data
+
+    def __model_data(self, data, endpoint=None):
+        with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'data_to_model'):
+            return data_to_model(data)
+
+    def __tabulate_data(self, data, endpoint=None, site_id=None, tabulator=None, pandas_column_trim=None):
+        if tabulator is None:
+            try:
+                data_to_pandas
+            except NameError:
+                logger.debug('solaredge_interface.utils.pandas import data_to_pandas')
+                from solaredge_interface.utils.pandas import data_to_pandas
+            from solaredge_interface.utils.pandas import bulk_data_key, bulk_to_pandas
+            if self.pandas_bulk_long and bulk_data_key(data):
+                tabulator = bulk_to_pandas
+            else:
+                tabulator = functools.partial(data_to_pandas, prefix_to_remove=pandas_column_trim)
+        with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'data_to_pandas'):
+            dataframe = tabulator(data)
+        if self.pandas_datetime64:
+            from solaredge_interface.utils.pandas import localize_pandas
+            if type(site_id) is list:
+                site_id = ','.join([str(item) for item in site_id])
+            tz = self.get_site_timezone(site_id) if site_id else None
+            with self.metrics.timer(endpoint, METRIC_PHASE_PREFIX + 'localize_pandas'):
+                dataframe = localize_pandas(dataframe, tz=tz)
+        return dataframe
@@ -0,0 +1,447 @@
+
+import math
+import array
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+NAN = math.nan
+
+
+class Site(object):
+    """
+    Typed record of a site as listed by `get_sites()` and `get_site_details()`.
+    """
+
+    __slots__ = ['id', 'name', 'account_id', 'status', 'peak_power', 'last_update_time', 'installation_date',
+                 'pto_date', 'notes', 'type', 'timezone', 'country', 'city']
+
+    def __init__(self, data):
+        """
+        _parameters_
+        * _data_ (dict) required - a decoded site from the `sites.site` list or `details` response.
+        """
+        location = data.get('location') or {}
+        self.id = data.get('id')
+        self.name = data.get('name')
+        self.account_id = data.get('accountId')
+        self.status = data.get('status')
+        self.peak_power = data.get('peakPower')
+        self.last_update_time = data.get('lastUpdateTime')
+        self.installation_date = data.get('installationDate')
+        self.pto_date = data.get('ptoDate')
+        self.notes = data.get('notes')
+        self.type = data.get('type')
+        self.timezone = location.get('timeZone')
+        self.country = location.get('country')
+        self.city = location.get('city')
+
+    def __repr__(self):
+        return '<Site id={} name={!r} status={}>'.format(self.id, self.name, self.status)
+
+
+class Account(object):
+    """
+    Typed record of an account as listed by `get_accounts()`.
+    """
+
+    __slots__ = ['id', 'name', 'parent_id']
+
+    def __init__(self, data):
+        self.id = data.get('id')
+        self.name = data.get('name')
+        self.parent_id = data.get('parentId')
+
+    def __repr__(self):
+        return '<Account id={} name={!r}>'.format(self.id, self.name)
+
+
+class DataPeriod(object):
+    """
+    Typed start and end date of the energy production of a site from `get_site_data_period()`.
+    """
+
+    __slots__ = ['start_date', 'end_date']
+
+    def __init__(self, data):
+        self.start_date = data.get('startDate')
+        self.end_date = data.get('endDate')
+
+    def __repr__(self):
+        return '<DataPeriod start_date={} end_date={}>'.format(self.start_date, self.end_date)
+
+
+class TimeSeries(object):
+    """
+    Typed power or energy values of one meter (or of the site); `dates` is a list and `values` a float `array` with
+    NaN for missing values, which hold a value in 8 bytes rather than a `{'date': ..., 'value': ...}` dict.
+    """
+
+    __slots__ = ['type', 'time_unit', 'unit', 'measured_by', 'dates', 'values']
+
+    def __init__(self, data, time_unit=None, unit=None, meter_type=None):
+        """
+        _parameters_
+        * _data_ (dict) required - a decoded `{'values': [...]}` item, eg the `power` data or a `meters` list item.
+        * _time_unit_ (str) default: None - the time unit when not in `data`.
+        * _unit_ (str) default: None - the unit when not in `data`.
+        * _meter_type_ (str) default: None - the meter type when not in `data`.
+        """
+        items = data.get('values') or []
+        self.type = data.get('type') or data.get('meterType') or meter_type
+        self.time_unit = data.get('timeUnit') or time_unit
+        self.unit = data.get('unit') or unit
+        self.measured_by = data.get('measuredBy')
+        self.dates = [item.get('date') for item in items]
+        self.values = float_array([item.get('value') for item in items])
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        return zip(self.dates, self.values)
+
+    def __repr__(self):
+        return '<TimeSeries type={} time_unit={} unit={} values={}>'.format(self.type, self.time_unit, self.unit,
+                                                                           len(self))
+
+
+class MeterSeries(object):
+    """
+    Typed values of every meter from `get_site_power_details()`, `get_site_energy_details()` or `get_site_meters()`;
+    `meters` maps each meter type to its `TimeSeries`.
+    """
+
+    __slots__ = ['time_unit', 'unit', 'meters']
+
+    def __init__(self, data):
+        self.time_unit = data.get('timeUnit')
+        self.unit = data.get('unit')
+        self.meters = {}
+        for meter in data.get('meters') or []:
+            series = TimeSeries(meter, time_unit=self.time_unit, unit=self.unit)
+            self.meters[series.type] = series
+
+    def __getitem__(self, meter_type):
+        return self.meters[meter_type]
+
+    def __repr__(self):
+        return '<MeterSeries time_unit={} unit={} meters={}>'.format(self.time_unit, self.unit, list(self.meters))
+
+
+class TimeFrameEnergy(object):
+    """
+    Typed energy produced over a timeframe from `get_site_time_frame_energy()`.
+    """
+
+    __slots__ = ['energy', 'unit', 'measured_by', 'start_lifetime_energy', 'end_lifetime_energy']
+
+    def __init__(self, data):
+        self.energy = data.get('energy')
+        self.unit = data.get('unit')
+        self.measured_by = data.get('measuredBy')
+        self.start_lifetime_energy = (data.get('startLifetimeEnergy') or {}).get('energy')
+        self.end_lifetime_energy = (data.get('endLifetimeEnergy') or {}).get('energy')
+
+    def __repr__(self):
+        return '<TimeFrameEnergy energy={} unit={}>'.format(self.energy, self.unit)
+
+
+class Overview(object):
+    """
+    Typed site overview from `get_site_overview()`; energy values in Wh and the current power in W.
+    """
+
+    __slots__ = ['last_update_time', 'lifetime_energy', 'lifetime_revenue', 'last_year_energy', 'last_month_energy',
+                 'last_day_energy', 'current_power', 'measured_by']
+
+    def __init__(self, data):
+        self.last_update_time = data.get('lastUpdateTime')
+        self.lifetime_energy = (data.get('lifeTimeData') or {}).get('energy')
+        self.lifetime_revenue = (data.get('lifeTimeData') or {}).get('revenue')
+        self.last_year_energy = (data.get('lastYearData') or {}).get('energy')
+        self.last_month_energy = (data.get('lastMonthData') or {}).get('energy')
+        self.last_day_energy = (data.get('lastDayData') or {}).get('energy')
+        self.current_power = (data.get('currentPower') or {}).get('power')
+        self.measured_by = data.get('measuredBy')
+
+    def __repr__(self):
+        return '<Overview last_update_time={} current_power={}>'.format(self.last_update_time, self.current_power)
+
+
+class PowerFlowElement(object):
+    """
+    Typed status and power of one element (grid, load, PV or storage) of a `PowerFlow`.
+    """
+
+    __slots__ = ['status', 'current_power', 'charge_level', 'critical']
+
+    def __init__(self, data):
+        self.status = data.get('status')
+        self.current_power = data.get('currentPower')
+        self.charge_level = data.get('chargeLevel')
+        self.critical = data.get('critical')
+
+    def __repr__(self):
+        return '<PowerFlowElement status={} current_power={}>'.format(self.status, self.current_power)
+
+
+class PowerFlow(object):
+    """
+    Typed current power flow from `get_site_current_power_flow()`; the `grid`, `load`, `pv` and `storage` elements are
+    None when not present at the site and `connections` is a list of `(from, to)` tuples.
+    """
+
+    __slots__ = ['unit', 'update_refresh_rate', 'connections', 'grid', 'load', 'pv', 'storage']
+
+    def __init__(self, data):
+        self.unit = data.get('unit')
+        self.update_refresh_rate = data.get('updateRefreshRate')
+        self.connections = [(item.get('from'), item.get('to')) for item in data.get('connections') or []]
+        self.grid, self.load, self.pv, self.storage = [
+            PowerFlowElement(data[key]) if data.get(key) else None for key in ('GRID', 'LOAD', 'PV', 'STORAGE')
+        ]
+
+    def __repr__(self):
+        return '<PowerFlow unit={} connections={}>'.format(self.unit, self.connections)
+
+
+class Telemetries(object):
+    """
+    Typed telemetries in columnar form; `dates` is a list and `columns` maps each field to a float `array` (NaN for
+    missing values) when all of its values are numbers, else to a list.  Nested fields such as `L1Data.acVoltage` are
+    flattened with a `.` separator.
+    """
+
+    __slots__ = ['dates', 'columns']
+
+    def __init__(self, items, date_key='date'):
+        """
+        _parameters_
+        * _items_ (list) required - the decoded telemetry dicts.
+        * _date_key_ (str) default: `date` - the key of the telemetry timestamp.
+        """
+        self.dates = [None] * len(items)
+        columns = {}  # field: list of values, in the order the fields are first seen
+        for index, item in enumerate(items):
+            for name, value in flatten(item).items():
+                if name == date_key:
+                    self.dates[index] = value
+                    continue
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = [None] * len(items)
+                column[index] = value
+        self.columns = {}
+        for name, values in columns.items():
+            numeric = all([value is None or (type(value) in (int, float)) for value in values])
+            self.columns[name] = float_array(values) if numeric else values
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __repr__(self):
+        return '<Telemetries count={} columns={}>'.format(len(self), list(self.columns))
+
+
+class Battery(object):
+    """
+    Typed battery and its `Telemetries` from `get_site_storage_data()`.
+    """
+
+    __slots__ = ['serial_number', 'model_number', 'nameplate', 'telemetries']
+
+    def __init__(self, data):
+        self.serial_number = data.get('serialNumber')
+        self.model_number = data.get('modelNumber')
+        self.nameplate = data.get('nameplate')
+        self.telemetries = Telemetries(data.get('telemetries') or [], date_key='timeStamp')
+
+    def __repr__(self):
+        return '<Battery serial_number={} telemetries={}>'.format(self.serial_number, len(self.telemetries))
+
+
+class Equipment(object):
+    """
+    Typed item of a site `Inventory`.
+    """
+
+    __slots__ = ['name', 'manufacturer', 'model', 'serial_number', 'firmware_version']
+
+    def __init__(self, data):
+        self.name = data.get('name') or data.get('id')
+        self.manufacturer = data.get('manufacturer')
+        self.model = data.get('model')
+        self.serial_number = data.get('SN') or data.get('serialNumber')
+        self.firmware_version = data.get('firmwareVersion') or data.get('cpuVersion')
+
+    def __repr__(self):
+        return '<Equipment name={!r} serial_number={}>'.format(self.name, self.serial_number)
+
+
+class Inventory(object):
+    """
+    Typed site inventory from `get_site_inventory()`; a list of `Equipment` for each kind of equipment.
+    """
+
+    __slots__ = ['inverters', 'batteries', 'meters', 'sensors', 'gateways']
+
+    def __init__(self, data):
+        for name in self.__slots__:
+            setattr(self, name, [Equipment(item) for item in data.get(name) or []])
+
+    def __repr__(self):
+        return '<Inventory inverters={} batteries={} meters={}>'.format(len(self.inverters), len(self.batteries),
+                                                                        len(self.meters))
+
+
+class EnvironmentalBenefits(object):
+    """
+    Typed environmental benefits from `get_site_environmental_benefits()`.
+    """
+
+    __slots__ = ['units', 'co2', 'so2', 'nox', 'trees_planted', 'light_bulbs']
+
+    def __init__(self, data):
+        emissions = data.get('gasEmissionSaved') or {}
+        self.units = emissions.get('units')
+        self.co2 = emissions.get('co2')
+        self.so2 = emissions.get('so2')
+        self.nox = emissions.get('nox')
+        self.trees_planted = data.get('treesPlanted')
+        self.light_bulbs = data.get('lightBulbs')
+
+    def __repr__(self):
+        return '<EnvironmentalBenefits co2={} units={}>'.format(self.co2, self.units)
+
+
+class ChangeLogEntry(object):
+    """
+    Typed equipment replacement from `get_site_equipment_change_log()`.
+    """
+
+    __slots__ = ['serial_number', 'part_number', 'date']
+
+    def __init__(self, data):
+        self.serial_number = data.get('serialNumber')
+        self.part_number = data.get('partNumber')
+        self.date = data.get('date')
+
+    def __repr__(self):
+        return '<ChangeLogEntry serial_number={} date={}>'.format(self.serial_number, self.date)
+
+
+class Sensor(object):
+    """
+    Typed sensor from `get_site_equipment_sensors()`.
+    """
+
+    __slots__ = ['connected_to', 'name', 'measurement', 'type']
+
+    def __init__(self, data, connected_to=None):
+        self.connected_to = connected_to
+        self.name = data.get('name')
+        self.measurement = data.get('measurement')
+        self.type = data.get('type')
+
+    def __repr__(self):
+        return '<Sensor name={!r} connected_to={!r}>'.format(self.name, self.connected_to)
+
+
+def float_array(values):
+    """
+    Returns `values` as a float `array` with NaN in place of None.
+    """
+    return array.array('d', [NAN if value is None else value for value in values])
+
+
+def flatten(item, prefix=''):
+    """
+    Returns the nested dict `item` as a flat dict with `.` separated keys.
+    """
+    flat = {}
+    for key, value in item.items():
+        if type(value) is dict:
+            flat.update(flatten(value, prefix='{}{}.'.format(prefix, key)))
+        else:
+            flat['{}{}'.format(prefix, key)] = value
+    return flat
+
+
+def inverter_telemetries(data):
+    """
+    Returns `{serial_number: Telemetries}` for the merged `get_site_inverter_data()` response, grouping the
+    telemetries by their `serialNumber` in one pass.
+    """
+    groups = {serial_number: [] for serial_number in data.get('serialNumbers') or []}
+    for item in data.get('telemetries') or []:
+        group = groups.get(item.get('serialNumber'))
+        if group is not None:
+            group.append(item)
+    return {serial_number: Telemetries(items) for serial_number, items in groups.items()}
+
+
+def bulk_models(items, item_key, model):
+    """
+    Returns `{site_id: model}` for the `siteEnergyList` items of a bulk-mode response.
+    """
+    return {item.get('siteId'): model(item.get(item_key) or {}) for item in items or []}
+
+
+def bulk_time_series(data, item_key):
+    """
+    Returns `{site_id: TimeSeries}` for the items of a bulk-mode `get_site_energy()` or `get_site_power()` response.
+    """
+    return bulk_models(data.get('siteEnergyList'), item_key,
+                       lambda item: TimeSeries(item, time_unit=data.get('timeUnit'), unit=data.get('unit')))
+
+
+MODELS = {
+    # data key: builder of the model from the value of the data key
+    'accounts': lambda data: [Account(item) for item in data.get('list') or []],
+    'sites': lambda data: [Site(item) for item in data.get('site') or []],
+    'details': Site,
+    'dataPeriod': DataPeriod,
+    'energy': TimeSeries,
+    'power': TimeSeries,
+    'timeFrameEnergy': TimeFrameEnergy,
+    'overview': Overview,
+    'powerDetails': MeterSeries,
+    'energyDetails': MeterSeries,
+    'meterEnergyDetails': MeterSeries,
+    'siteCurrentPowerFlow': PowerFlow,
+    'storageData': lambda data: [Battery(item) for item in data.get('batteries') or []],
+    'envBenefits': EnvironmentalBenefits,
+    'Inventory': Inventory,
+    'data': lambda data: Telemetries(data.get('telemetries') or []),
+    'inverterData': inverter_telemetries,
+    'ChangeLog': lambda data: [ChangeLogEntry(item) for item in data.get('list') or []],
+    'SiteSensors': lambda data: [Sensor(sensor, connected_to=item.get('connectedTo'))
+                                 for item in data.get('list') or [] for sensor in item.get('sensors') or []],
+    'version': lambda data: data.get('release'),
+    'supported': lambda data: [item.get('release') for item in data or []],
+    'datePeriodList': lambda data: bulk_models(data.get('siteEnergyList'), 'dataPeriod', DataPeriod),
+    'sitesEnergy': lambda data: bulk_time_series(data, 'energyValues'),
+    'powerDateValuesList': lambda data: bulk_time_series(data, 'powerDataValueSeries'),
+    'timeFrameEnergyList': lambda data: bulk_models(data.get('timeFrameEnergyList'), 'timeFrameEnergy',
+                                                    TimeFrameEnergy),
+    'sitesOverviews': lambda data: bulk_models(data.get('siteEnergyList'), 'siteOverview', Overview),
+}
+
+
+def data_to_model(data):
+    """
+    Returns the typed model of the decoded response `data` of any `SolarEdgeAPI` endpoint; eg a `Site` for
+    `get_site_details()`, a `TimeSeries` for `get_site_power()` or `{site_id: TimeSeries}` for a bulk-mode
+    `get_site_energy()`.  Returns None when the data is empty or not a known response.
+    """
+    if type(data) is not dict or len(data) != 1:
+        return None
+    key, value = next(iter(data.items()))
+    if key not in MODELS or value is None:
+        return None
+    return MODELS[key](value)
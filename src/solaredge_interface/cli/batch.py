@@ -0,0 +1,193 @@
+
+import os
+import re
+import csv
+import sys
+import json
+import logging
+import inspect
+import concurrent.futures
+
+from solaredge_interface import __http_request_parallel__ as PARALLEL_DEFAULT
+from solaredge_interface.utils import arg_helper
+from solaredge_interface.utils.json import JSONEncoderDateTime
+from solaredge_interface.utils.output import render_output
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_COMMAND_KEYS = ['command', 'subcommand']
+BATCH_COMMANDS = [  # the sub-commands that may be run from a manifest, each calls SolarEdgeAPI.get_<command>
+    'accounts', 'sites', 'site_details', 'site_data_period', 'site_energy', 'site_time_frame_energy', 'site_overview',
+    'site_power', 'site_power_details', 'site_energy_details', 'site_current_power_flow', 'site_storage_data',
+    'site_environmental_benefits', 'site_inventory', 'site_equipment_data', 'site_inverter_data',
+    'site_equipment_change_log', 'site_meters', 'site_equipment_sensors', 'version_current', 'version_supported',
+]
+
+
+class BatchException(SolarEdgeInterfaceException):
+    pass
+
+
+class BatchJob:
+    """
+    A single manifest row; the sub-command name, an optional site_id and the sub-command options.  A list of site_id
+    values is joined with ',' the same way as the command-line takes multiple sites.
+    """
+
+    index = None
+    command = None
+    site_id = None
+    options = None
+
+    def __init__(self, index, command, site_id=None, options=None):
+        self.index = index
+        self.command = command
+        if isinstance(site_id, (list, tuple)):
+            site_id = ','.join([str(item) for item in site_id])
+        self.site_id = site_id
+        self.options = options or {}
+
+    @property
+    def name(self):
+        name = '{:04d}-{}'.format(self.index, self.command)
+        if self.site_id:
+            name = '{}-{}'.format(name, re.sub(r'[^0-9A-Za-z]+', '_', str(self.site_id)))
+        return name
+
+
+def load_manifest(filename):
+    """
+    Load a batch manifest from a YAML, JSON or CSV file and return a list of `BatchJob`.
+
+    YAML and JSON manifests are a list of rows (or a dict with a `jobs` list) where each row has a `command` (or
+    `subcommand`), an optional `site_id` and either an `options` dict or the options as additional keys.  CSV
+    manifests use a header row with `command` and `site_id` columns and one column per option; empty cells are
+    ignored.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    with open(filename, 'r', newline='') as f:
+        if extension in ['.yaml', '.yml']:
+            try:
+                import yaml
+            except ImportError:
+                raise BatchException('YAML manifests require the PyYAML package, install with: pip install pyyaml')
+            rows = yaml.safe_load(f)
+        elif extension == '.json':
+            rows = json.load(f)
+        elif extension == '.csv':
+            rows = [{k: v for k, v in row.items() if k and v not in (None, '')} for row in csv.DictReader(f)]
+        else:
+            raise BatchException('Unknown manifest file type, use .yaml, .yml, .json or .csv', filename)
+
+    if type(rows) is dict and 'jobs' in rows:
+        rows = rows['jobs']
+    if type(rows) is not list:
+        raise BatchException('Manifest must contain a list of jobs', filename)
+
+    jobs = []
+    for index, row in enumerate(rows):
+        if type(row) is not dict:
+            raise BatchException('Manifest row {} is not a mapping'.format(index))
+        row = dict(row)
+        command = None
+        for key in MANIFEST_COMMAND_KEYS:
+            command = row.pop(key, None) or command
+        if not command:
+            raise BatchException('Manifest row {} has no command'.format(index))
+        site_id = row.pop('site_id', None)
+        options = row.pop('options', None) or {}
+        options.update(row)
+        jobs.append(BatchJob(index=index, command=str(command).strip(), site_id=site_id, options=options))
+    return jobs
+
+
+def job_kwargs(api, job, config):
+    """
+    Returns the `(method, kwargs)` for `job` applying the same default values as the equivalent sub-command.
+    """
+    if job.command not in BATCH_COMMANDS:
+        raise BatchException('Unknown batch command: {}'.format(job.command))
+    method = getattr(api, 'get_{}'.format(job.command))
+
+    parameters = inspect.signature(method).parameters
+    kwargs = dict(job.options)
+    unknown = [key for key in kwargs if key not in parameters]
+    if unknown:
+        raise BatchException('Unknown option(s) for {}: {}'.format(job.command, ', '.join(unknown)))
+
+    if 'site_id' in parameters:
+        kwargs['site_id'] = str(job.site_id) if job.site_id is not None else None
+        kwargs = arg_helper.site_id(kwargs, config=config)
+    if 'end_date' in parameters:
+        kwargs = arg_helper.end_date(kwargs)
+        kwargs = arg_helper.start_date(kwargs, delta_days=-7)
+    if 'end_time' in parameters:
+        kwargs = arg_helper.end_time(kwargs)
+        kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
+    if job.command == 'site_inverter_data':
+        # the batch --parallel already bounds the requests in flight, a fan-out per job would multiply it
+        kwargs['parallel'] = 1
+    return method, kwargs
+
+
+def run_job(api, job, config):
+    method, kwargs = job_kwargs(api, job, config)
+    logger.debug('batch-job; {} {}'.format(job.name, kwargs))
+    return method(**kwargs)
+
+
+def run_batch(api, jobs, config, output_format, parallel=PARALLEL_DEFAULT, output_dir=None, ndjson=None):
+    """
+    Run all `jobs` through the shared `api` instance with at most `parallel` jobs in flight and stream each result as
+    it completes, either to a per-job file in `output_dir` or as a line of NDJSON to the `ndjson` file object.
+
+    Returns the number of failed jobs.
+    """
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    failed = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(parallel))) as executor:
+        futures = {executor.submit(run_job, api, job, config): job for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            job = futures[future]
+            record = {'index': job.index, 'command': job.command, 'site_id': job.site_id, 'options': job.options}
+            try:
+                response = future.result()
+            except Exception as e:
+                if not isinstance(e, (SolarEdgeInterfaceException, OSError, ValueError)):
+                    raise
+                failed += 1
+                logger.warning('batch-job {} failed: {}'.format(job.name, e))
+                record['error'] = str(e)
+                response = None
+            else:
+                record['status_code'] = response.status_code
+                if response.status_code != 200:
+                    failed += 1
+
+            if output_dir and response is not None:
+                extension = 'csv' if str(output_format).lower() == 'csv' else 'json'
+                filename = os.path.join(output_dir, '{}.{}'.format(job.name, extension))
+                with open(filename, 'w') as f:
+                    f.write(render_output(response, output_format=output_format))
+                    f.write('\n')
+                record['filename'] = filename
+            if ndjson is not None:
+                if response is not None and not output_dir:
+                    data = getattr(response, 'data', None)
+                    record['data'] = data if data is not None else response.text
+                ndjson.write(json.dumps(record, cls=JSONEncoderDateTime))
+                ndjson.write('\n')
+                ndjson.flush()
+            del futures[future], response
+
+    return failed
+
+
+def open_ndjson(filename):
+    if filename in (None, '-'):
+        return sys.stdout
+    return open(filename, 'w')
@@ -1,20 +1,25 @@
 
 import sys
+import time
 import click
 import logging
 import warnings
+import contextlib
 
 from solaredge_interface import __version__ as VERSION
 from solaredge_interface import __env_api_key__ as ENV_API_KEY
 from solaredge_interface import __output_format_default__ as OUTPUT_FORMAT_DEFAULT
+from solaredge_interface import __http_request_parallel__ as PARALLEL_DEFAULT
 from solaredge_interface.utils import arg_helper
-from solaredge_interface.utils.output import format_output
-from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils import output
 from solaredge_interface.cli.config import Config
 from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
 
 solaredge_api = None
 solaredge_cli_config = None
+solaredge_profile = None
+
+CLI_IMPORTED = (time.perf_counter(), time.process_time())  # --profile totals origin when the process start is unknown
 
 
 @click.group()
@@ -23,8 +28,18 @@ solaredge_cli_config = None
 @click.option('-v', '--verbose', is_flag=True, help='Verbose logging messages (debug level).')
 @click.option('-q', '--quiet', is_flag=True, help='Quiet mode, with priority over --verbose')
 @click.option('-W', '--disable-warnings', is_flag=True, help='Disable Python warnings.')
+@click.option('--baseurl', help='Override the SolarEdge API base URL, eg a local mock server')
+@click.option('--transport', help='requests (default), http2, or record:DIR, replay:DIR, auto:DIR to record or replay '
+                                   'responses in DIR')
+@click.option('--fleet-snapshot', help='Serve site details, timezones, inventory and data periods from this fleet '
+                                        'snapshot file, see the fleet_snapshot command')
+@click.option('--bulk-long', is_flag=True, help='Tabulate csv and pandas output of multi-site (bulk-mode) requests '
+                                                'in long format with site_id and timestamp columns.')
+@click.option('--profile', is_flag=True, help='Print a per-phase wall and CPU timing table to stderr on exit.')
+@click.option('--profile-stats', help='Write cProfile stats of the main thread to this file, implies --profile')
 @click.version_option(VERSION)
-def solaredge_interface(config, format, verbose, quiet, disable_warnings):
+def solaredge_interface(config, format, verbose, quiet, disable_warnings, baseurl, transport, fleet_snapshot, bulk_long,
+                        profile, profile_stats):
     """
     The solaredge-interface provides a command-line interface to interact with the Python SolarEdgeAPI module which
     itself calls the SolarEdge public API endpoints at https://monitoringapi.solaredge.com making it even easier to
@@ -55,8 +70,15 @@ def solaredge_interface(config, format, verbose, quiet, disable_warnings):
 
     global solaredge_api
     global solaredge_cli_config
+    global solaredge_profile
+
+    if profile or profile_stats:
+        solaredge_profile = profile_start(ctx, profile_stats)
+    else:
+        solaredge_profile = None
 
-    solaredge_cli_config = Config(session_config_file=config)
+    with profile_phase('config'):
+        solaredge_cli_config = Config(session_config_file=config)
     if not solaredge_cli_config.api_key:
         raise SolarEdgeInterfaceException('SolarEdge api_key value not supplied.  See documentation to set this '
                                           'using the {} environment variable or using configuration file(s).'
@@ -66,7 +88,101 @@ def solaredge_interface(config, format, verbose, quiet, disable_warnings):
     elif solaredge_cli_config.format is None:
         solaredge_cli_config.format = OUTPUT_FORMAT_DEFAULT
 
-    solaredge_api = SolarEdgeAPI(api_key=solaredge_cli_config.api_key, datetime_response=True, pandas_response=True)
+    with profile_phase('api_init'):
+        # imported here rather than at module level so --help and --version do not pay for the API module imports
+        from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+
+        solaredge_api = SolarEdgeAPI(
+            api_key=solaredge_cli_config.api_key,
+            datetime_response=True,
+            pandas_response=str(solaredge_cli_config.format).lower() in output.PANDAS_OUTPUT_FORMATS,
+            baseurl=baseurl or solaredge_cli_config.baseurl,
+            metrics=solaredge_profile,
+            transport=transport,
+            fleet_snapshot=fleet_snapshot,
+            pandas_bulk_long=bulk_long
+        )
+
+
+def profile_start(ctx, profile_stats=None):
+    """
+    Returns the `ProfileCollector` for --profile with the `startup` phase recorded, and registers printing of the
+    timing table (and writing of the cProfile stats) when the command completes.  The startup and total wall and CPU
+    seconds both count from the process start; when the process start time is unavailable the startup phase is
+    omitted and the totals count from the import of this module.
+    """
+    from solaredge_interface.utils.metrics import ProfileCollector, process_elapsed
+
+    collector = ProfileCollector()
+    elapsed = process_elapsed()
+    if elapsed is not None:
+        wall_origin, cpu_origin = time.perf_counter() - elapsed, 0.0
+        collector.add_phase('startup', elapsed, time.process_time())
+    else:
+        wall_origin, cpu_origin = CLI_IMPORTED
+    profiler = None
+    if profile_stats:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def profile_finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_stats)
+        total = (time.perf_counter() - wall_origin, time.process_time() - cpu_origin)
+        click.echo(collector.profile_table(total=total), err=True)
+        if profile_stats:
+            click.echo('cProfile stats written to {}'.format(profile_stats), err=True)
+
+    ctx.call_on_close(profile_finish)
+    return collector
+
+
+def profile_phase(name):
+    """
+    Context manager timing the block as phase `name` when --profile is used.
+    """
+    if solaredge_profile is None:
+        return contextlib.nullcontext()
+    return solaredge_profile.phase(name)
+
+
+def format_output(response, output_format):
+    with profile_phase('output'):
+        output.format_output(response=response, output_format=output_format)
+
+
+def multi_site_arguments(command):
+    """
+    Decorator adding the SITE_ID... argument and the --site_ids_file and --parallel options of per-site sub-commands
+    that accept many sites.
+    """
+    command = click.option('--parallel', help='Maximum concurrent sites (default: {})'.format(PARALLEL_DEFAULT),
+                           type=int, default=PARALLEL_DEFAULT)(command)
+    command = click.option('--site_ids_file', type=click.Path(exists=True, dir_okay=False),
+                           help='File of site_ids, separated by commas, spaces or new lines')(command)
+    return click.argument('site_id', nargs=-1)(command)
+
+
+def format_sites_output(method, kwargs):
+    """
+    Output `method` for the `site_id` list of `kwargs`; one site is output as-is while several are fetched
+    concurrently and output merged with each item (or row) tagged with its `site_id`.
+    """
+    from solaredge_interface.cli.multisite import run_sites, MultiSiteException
+
+    site_ids, parallel = kwargs.pop('site_id'), kwargs.pop('parallel')
+    if len(site_ids) == 1:
+        format_output(response=method(site_id=site_ids[0], **kwargs), output_format=solaredge_cli_config.format)
+        return
+    if solaredge_api.session is None:
+        from solaredge_interface.utils.http_request import http_session
+        solaredge_api.session = http_session(pool_size=max(1, parallel))
+    response = run_sites(method, site_ids, parallel=parallel, **kwargs)
+    format_output(response=response, output_format=solaredge_cli_config.format)
+    if response.failed:
+        raise MultiSiteException('{} of {} sites failed'.format(response.failed, len(site_ids)))
 
 
 @solaredge_interface.command('accounts')
@@ -105,16 +221,13 @@ def get_sites(**kwargs):
 
 
 @solaredge_interface.command('site_details')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 def get_site_details(**kwargs):
     """
     Get site details; name, location, status, etc.
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
-    format_output(
-        response=solaredge_api.get_site_details(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
+    format_sites_output(solaredge_api.get_site_details, kwargs)
 
 
 @solaredge_interface.command('site_data_period')
@@ -196,7 +309,7 @@ def get_site_power(**kwargs):
 
 
 @solaredge_interface.command('site_power_details')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 @click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--meters', help='Production, Consumption, SelfConsumption, FeedIn, Purchased', default=None)
@@ -204,17 +317,14 @@ def get_site_power_details(**kwargs):
     """
     Detailed site power measurements from meters
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
     kwargs = arg_helper.end_time(kwargs)
     kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
-    format_output(
-        response=solaredge_api.get_site_power_details(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    format_sites_output(solaredge_api.get_site_power_details, kwargs)
 
 
 @solaredge_interface.command('site_energy_details')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 @click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--meters', help='Production, Consumption, SelfConsumption, FeedIn, Purchased', default=None)
@@ -223,30 +333,24 @@ def get_site_energy_details(**kwargs):
     """
     Detailed site energy measurements from meters
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
     kwargs = arg_helper.end_time(kwargs)
     kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
-    format_output(
-        response=solaredge_api.get_site_energy_details(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    format_sites_output(solaredge_api.get_site_energy_details, kwargs)
 
 
 @solaredge_interface.command('site_current_power_flow')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 def get_site_current_power_flow(**kwargs):
     """
     Current power flow between all elements of the site
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
-    format_output(
-        response=solaredge_api.get_site_current_power_flow(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
+    format_sites_output(solaredge_api.get_site_current_power_flow, kwargs)
 
 
 @solaredge_interface.command('site_storage_data')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 @click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--serials', help='If omitted, returns all batteries at site', default=None)
@@ -254,40 +358,31 @@ def get_site_storage_data(**kwargs):
     """
     Detailed storage information from batteries
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
     kwargs = arg_helper.end_time(kwargs)
     kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
-    format_output(
-        response=solaredge_api.get_site_storage_data(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    format_sites_output(solaredge_api.get_site_storage_data, kwargs)
 
 
 @solaredge_interface.command('site_environmental_benefits')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 @click.option('--system_units', help='Metrics, Imperial - case sensitive', default=None)
 def get_site_environmental_benefits(**kwargs):
     """
     Environmental benefits based on site energy production
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
-    format_output(
-        response=solaredge_api.get_site_environmental_benefits(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
+    format_sites_output(solaredge_api.get_site_environmental_benefits, kwargs)
 
 
 @solaredge_interface.command('site_inventory')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 def get_site_inventory(**kwargs):
     """
     Inventory of SolarEdge equipment at the site
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
-    format_output(
-        response=solaredge_api.get_site_inventory(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
+    format_sites_output(solaredge_api.get_site_inventory, kwargs)
 
 
 @solaredge_interface.command('site_equipment_data')
@@ -308,6 +403,26 @@ def get_site_equipment_data(**kwargs):
     )
 
 
+@solaredge_interface.command('site_inverter_data')
+@click.argument('site_id', required=False)
+@click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
+@click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
+@click.option('--serial_numbers', help='Comma separated inverter serial numbers, default all inverters at the site')
+@click.option('--parallel', help='Maximum concurrent requests (default: {})'.format(PARALLEL_DEFAULT), type=int,
+              default=PARALLEL_DEFAULT)
+def get_site_inverter_data(**kwargs):
+    """
+    Inverter data for every inverter at a site in one result
+    """
+    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
+    kwargs = arg_helper.end_time(kwargs)
+    kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
+    format_output(
+        response=solaredge_api.get_site_inverter_data(**kwargs),
+        output_format=solaredge_cli_config.format
+    )
+
+
 @solaredge_interface.command('site_equipment_change_log')
 @click.argument('site_id', required=False)
 @click.option('--serial_number', help='The inverter short serial number', required=True)
@@ -323,7 +438,7 @@ def get_site_equipment_change_log(**kwargs):
 
 
 @solaredge_interface.command('site_meters')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 @click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
 @click.option('--meters', help='Production, Consumption, SelfConsumption, FeedIn, Purchased', default=None)
@@ -331,26 +446,103 @@ def get_site_meters(**kwargs):
     """
     Meter lifetime energy, metadata and connection detail
     """
-    kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
     kwargs = arg_helper.end_time(kwargs)
     kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
-    format_output(
-        response=solaredge_api.get_site_meters(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    format_sites_output(solaredge_api.get_site_meters, kwargs)
 
 
 @solaredge_interface.command('site_equipment_sensors')
-@click.argument('site_id', required=False)
+@multi_site_arguments
 def get_site_equipment_sensors(**kwargs):
     """
     Sensors in the site and connections
     """
+    kwargs = arg_helper.site_ids(kwargs, config=solaredge_cli_config)
+    format_sites_output(solaredge_api.get_site_equipment_sensors, kwargs)
+
+
+@solaredge_interface.command('export')
+@click.argument('endpoint', type=click.Choice(['site_power', 'site_power_details', 'site_energy',
+                                               'site_energy_details']))
+@click.argument('filename')
+@click.argument('site_id', required=False)
+@click.option('--start_time', help='Default 7 days ago, else format "YYYY-MM-DD hh:mm:ss"')
+@click.option('--end_time', help='Default now time, else format "YYYY-MM-DD hh:mm:ss"')
+@click.option('--time_unit', help='QUARTER_OF_AN_HOUR, HOUR, DAY, WEEK, MONTH, YEAR (default: as the endpoint)')
+@click.option('--meters', help='Production, Consumption, SelfConsumption, FeedIn, Purchased', default=None)
+@click.option('--sink_format', help='csv, ndjson or parquet (default: from the filename extension)', default=None)
+@click.option('--memory_limit', help='Megabytes of rows held in memory before writing (default: 32)', type=float,
+              default=32)
+@click.option('--parallel', help='Maximum concurrent requests (default: {})'.format(PARALLEL_DEFAULT), type=int,
+              default=PARALLEL_DEFAULT)
+def export(**kwargs):
+    """
+    Stream power or energy values of one or more sites to a file
+
+    The SITE_ID may be comma separated, the timeframe is split into the longest windows the API permits and rows are
+    written to FILENAME as each window completes so long timeframes are not held in memory.
+    """
+    from solaredge_interface.utils.sink import open_sink
+
     kwargs = arg_helper.site_id(kwargs, config=solaredge_cli_config)
-    format_output(
-        response=solaredge_api.get_site_equipment_sensors(**kwargs),
-        output_format=solaredge_cli_config.format
-    )
+    kwargs = arg_helper.end_time(kwargs)
+    kwargs = arg_helper.start_time(kwargs, delta_time=-(3600*24*7))
+    filename = kwargs.pop('filename')
+    sink_format, memory_limit = kwargs.pop('sink_format'), kwargs.pop('memory_limit')
+    with open_sink(filename, sink_format=sink_format, memory_limit=int(memory_limit * 1024 * 1024)) as sink:
+        rows = solaredge_api.export_site_data(sink, **kwargs)
+    output.output_json({'export': {'endpoint': kwargs['endpoint'], 'filename': filename, 'rows': rows}})
+
+
+@solaredge_interface.command('fleet_snapshot')
+@click.argument('filename')
+@click.argument('site_id', required=False)
+def fleet_snapshot(filename, site_id):
+    """
+    Write a fleet metadata snapshot file for --fleet-snapshot
+
+    Holds the details, timezone, inventory and data period of every site of the api_key, or only of the comma
+    separated SITE_ID values, in a memory-mapped file that later commands read without requests.
+    """
+    from solaredge_interface.api.FleetSnapshot import FleetSnapshot
+
+    site_ids = [item.strip() for item in site_id.split(',') if item.strip()] if site_id else None
+    with FleetSnapshot.export(solaredge_api, filename, site_ids=site_ids) as snapshot:
+        output.output_json({'fleet_snapshot': {'filename': filename, 'sites': len(snapshot)}})
+
+
+@solaredge_interface.command('batch')
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--parallel', help='Maximum number of jobs in flight (default: {})'.format(PARALLEL_DEFAULT),
+              default=PARALLEL_DEFAULT, type=int)
+@click.option('--output_dir', help='Write each job result to its own file in this directory', default=None)
+@click.option('--ndjson', default=None,
+              help='Write job results as NDJSON to this file, "-" for stdout (default without --output_dir)')
+def batch(manifest, parallel, output_dir, ndjson):
+    """
+    Run many queries from a YAML, JSON or CSV manifest in one process
+
+    Each manifest row names a sub-command (eg site_energy), an optional site_id and the sub-command options.  All
+    jobs share one connection pool and response caches, and results are streamed as each job completes.
+    """
+    from solaredge_interface.cli.batch import load_manifest, run_batch, open_ndjson
+    from solaredge_interface.utils.http_request import http_session
+
+    jobs = load_manifest(manifest)
+    if solaredge_api.session is None:
+        solaredge_api.session = http_session(pool_size=max(1, parallel))
+    if ndjson is None and not output_dir:
+        ndjson = '-'
+    ndjson_file = open_ndjson(ndjson) if ndjson else None
+    try:
+        failed = run_batch(solaredge_api, jobs, config=solaredge_cli_config, output_format=solaredge_cli_config.format,
+                           parallel=parallel, output_dir=output_dir, ndjson=ndjson_file)
+    finally:
+        if ndjson_file is not None and ndjson_file is not sys.stdout:
+            ndjson_file.close()
+    if failed:
+        raise SolarEdgeInterfaceException('{} of {} batch jobs failed'.format(failed, len(jobs)))
 
 
 @solaredge_interface.command('version_current')
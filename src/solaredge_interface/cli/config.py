@@ -7,6 +7,7 @@ import configparser
 from solaredge_interface import __env_api_key__ as ENV_API_KEY
 from solaredge_interface import __env_site_id__ as ENV_SITE_ID
 from solaredge_interface import __env_output_format__ as ENV_OUTPUT_FORMAT
+from solaredge_interface import __env_api_baseurl__ as ENV_API_BASEURL
 from solaredge_interface import __config_file_user__ as CONFIG_FILE_USER
 from solaredge_interface import __config_file_system__ as CONFIG_FILE_SYSTEM
 from solaredge_interface import __config_section_name__ as CONFIG_SECTION_NAME
@@ -41,6 +42,8 @@ class Config:
                 env_name = ENV_SITE_ID
             elif item == 'format':
                 env_name = ENV_OUTPUT_FORMAT
+            elif item == 'baseurl':
+                env_name = ENV_API_BASEURL
             else:
                 raise ConfigException('Unknown configuration attribute requested.', item)
 
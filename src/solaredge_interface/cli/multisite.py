@@ -0,0 +1,78 @@
+import json
+import logging
+import concurrent.futures
+
+from solaredge_interface import __http_request_parallel__ as PARALLEL_DEFAULT
+from solaredge_interface.utils.json import JSONEncoderDateTime
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+
+logger = logging.getLogger(__name__)
+
+
+class MultiSiteException(SolarEdgeInterfaceException):
+    pass
+
+
+class MultiSiteResponse:
+    """
+    The merged responses of a per-site method called for several sites; `data` is a list with one item per site
+    tagged with its `site_id`, and `pandas` is the concatenated DataFrames with a leading `site_id` column.
+    """
+
+    data = None
+    pandas = None
+    failed = None
+
+    def __init__(self, site_ids, responses):
+        """
+        _parameters_
+        * _site_ids_ (list) required - the site_id of each response.
+        * _responses_ (list) required - the per-site responses (or the exception raised), in `site_ids` order.
+        """
+        self.data = []
+        self.failed = 0
+        frames = []
+        for site_id, response in zip(site_ids, responses):
+            site_id = int(site_id) if str(site_id).isdigit() else site_id
+            if isinstance(response, Exception):
+                self.failed += 1
+                logger.warning('multi-site; site_id={} failed: {}'.format(site_id, response))
+                self.data.append({'site_id': site_id, 'error': str(response)})
+                continue
+            data = getattr(response, 'data', None)
+            if response.status_code != 200 or type(data) is not dict:
+                self.failed += 1
+                logger.warning('multi-site; site_id={} failed with status {}'.format(site_id, response.status_code))
+                self.data.append({'site_id': site_id, 'error': response.text, 'status_code': response.status_code})
+                continue
+            self.data.append(dict({'site_id': site_id}, **data))
+            frame = getattr(response, 'pandas', None)
+            if frame is not None:
+                frame = frame.copy()
+                frame.insert(0, 'site_id', site_id)
+                frames.append(frame)
+        if frames:
+            import pandas as pd  # imported on first use to keep command-line startup fast
+            self.pandas = pd.concat(frames)
+
+    @property
+    def text(self):
+        return json.dumps(self.data, cls=JSONEncoderDateTime)
+
+
+def run_sites(method, site_ids, parallel=PARALLEL_DEFAULT, **kwargs):
+    """
+    Call the per-site `method(site_id=..., **kwargs)` for every one of `site_ids` with at most `parallel` calls in
+    flight and return the merged `MultiSiteResponse`; a site that fails does not stop the others.
+    """
+    def request_site(site_id):
+        try:
+            return method(site_id=site_id, **kwargs)
+        except (SolarEdgeInterfaceException, OSError, ValueError) as e:
+            return e
+
+    logger.debug('multi-site; {} sites, parallel={}'.format(len(site_ids), parallel))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(parallel))) as executor:
+        responses = list(executor.map(request_site, site_ids))
+    return MultiSiteResponse(site_ids, responses)
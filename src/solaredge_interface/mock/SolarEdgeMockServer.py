@@ -0,0 +1,643 @@
+
+import re
+import json
+import time
+import random
+import logging
+import datetime
+import threading
+import collections
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from solaredge_interface.mock import series
+from solaredge_interface.utils.timedates import FORMAT_DATE_STRING, FORMAT_DATETIME_STRING
+
+logger = logging.getLogger(__name__)
+
+MOCK_TIMEZONES = ['Australia/Sydney', 'Europe/Berlin', 'America/Los_Angeles', 'Asia/Jerusalem', 'Australia/Perth']
+MOCK_VERSION = '1.0.0'
+
+# maximum request period per endpoint and time unit, as documented by SolarEdge
+PERIOD_LIMITS = {
+    ('energy', 'QUARTER_OF_AN_HOUR'): datetime.timedelta(days=31),
+    ('energy', 'HOUR'): datetime.timedelta(days=31),
+    ('energy', 'DAY'): datetime.timedelta(days=366),
+    ('energyDetails', 'QUARTER_OF_AN_HOUR'): datetime.timedelta(days=31),
+    ('energyDetails', 'HOUR'): datetime.timedelta(days=31),
+    ('energyDetails', 'DAY'): datetime.timedelta(days=366),
+    ('power', None): datetime.timedelta(days=31),
+    ('powerDetails', None): datetime.timedelta(days=31),
+    ('meters', None): datetime.timedelta(days=31),
+    ('storageData', None): datetime.timedelta(days=7),
+    ('data', None): datetime.timedelta(days=7),
+}
+
+
+class MockHTTPError(Exception):
+
+    def __init__(self, status_code, message):
+        super().__init__(status_code, message)
+        self.status_code = status_code
+        self.message = message
+
+
+class MockSite:
+    """
+    A synthetic SolarEdge site; identity, location and equipment are derived deterministically from its `index`.
+    """
+
+    def __init__(self, index, site_id, account_id):
+        self.index = index
+        self.id = site_id
+        self.account_id = account_id
+        self.name = 'Mock Site {}'.format(index + 1)
+        self.timezone = MOCK_TIMEZONES[index % len(MOCK_TIMEZONES)]
+        self.peak_power = round(3.0 + 12.0 * series.noise(site_id, 3), 2)
+        self.installation_date = datetime.datetime(2018, 1, 1) + datetime.timedelta(
+            days=int(700 * series.noise(site_id, 4)))
+        self.inverters = ['7F{:06d}-{:02d}'.format(site_id % 1000000, n + 1)
+                          for n in range(1 + int(self.peak_power // 6))]
+        self.batteries = ['BT{:06d}-01'.format(site_id % 1000000)] if index % 3 == 0 else []
+        self.meters = ['MT{:06d}-01'.format(site_id % 1000000)]
+
+    def now(self):
+        """
+        Current local (naive) time at the site.
+        """
+        from pytz import timezone
+        return datetime.datetime.now(tz=timezone(self.timezone)).replace(tzinfo=None)
+
+    def details(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'accountId': self.account_id,
+            'status': 'Active',
+            'peakPower': self.peak_power,
+            'lastUpdateTime': self.now().strftime(FORMAT_DATE_STRING),
+            'installationDate': self.installation_date.strftime(FORMAT_DATE_STRING),
+            'ptoDate': None,
+            'notes': '',
+            'type': 'Optimizers & Inverters',
+            'location': {
+                'country': 'Mockland',
+                'city': 'Mock City',
+                'address': '{} Mock Street'.format(self.index + 1),
+                'address2': '',
+                'zip': '{:04d}'.format(1000 + self.index),
+                'timeZone': self.timezone,
+                'countryCode': 'MK',
+            },
+            'primaryModule': {'manufacturerName': 'MockSolar', 'modelName': 'MS-330', 'maximumPower': 330.0},
+            'uris': {
+                'DETAILS': '/site/{}/details'.format(self.id),
+                'DATA_PERIOD': '/site/{}/dataPeriod'.format(self.id),
+                'OVERVIEW': '/site/{}/overview'.format(self.id),
+            },
+            'publicSettings': {'isPublic': False},
+        }
+
+
+class SolarEdgeMockServer:
+    """
+    Local stand-in for the SolarEdge monitoring API that implements every endpoint used by `SolarEdgeAPI`, including
+    the bulk `/sites/a,b,c/` paths, and serves synthetic but realistic time series for any requested window.  Use it
+    to load-test client tooling without spending API quota by pointing the client at `baseurl`.
+
+    ```python
+    >>> with SolarEdgeMockServer(sites=25, latency=0.05, max_concurrency=3) as server:
+    ...     api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    ...     api.get_site_power(server.site_ids[0], '2020-12-01 00:00:00', '2020-12-02 00:00:00')
+    ```
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, sites=10, site_id_start=1000001, account_id=100, latency=0.0,
+                 latency_jitter=0.0, error_rate=0.0, rate_limit_rate=0.0, daily_quota=None, max_concurrency=None,
+                 enforce_period_limits=True, seed=None, api_keys=None):
+        """
+        _parameters_
+        * _host_ (str) default: `127.0.0.1` - address to listen on.
+        * _port_ (int) default: `0` - port to listen on, 0 selects a free port.
+        * _sites_ (int) default: `10` - number of synthetic sites available.
+        * _site_id_start_ (int) default: `1000001` - site_id of the first synthetic site.
+        * _account_id_ (int) default: `100` - account id reported for the sites.
+        * _latency_ (float) default: `0.0` - seconds added to every response.
+        * _latency_jitter_ (float) default: `0.0` - up to this many random seconds added on top of `latency`.
+        * _error_rate_ (float) default: `0.0` - fraction of requests answered with a 500 error.
+        * _rate_limit_rate_ (float) default: `0.0` - fraction of requests answered with a 429 error.
+        * _daily_quota_ (int) default: None - requests allowed per api_key before every request is answered with 429.
+        * _max_concurrency_ (int) default: None - concurrent requests allowed per api_key, above which requests are
+        answered with 429; the SolarEdge API itself allows 3.
+        * _enforce_period_limits_ (bool) default: True - reject time windows longer than the documented maximums.
+        * _seed_ (int) default: None - seed for the random latency, error and rate-limit simulation.
+        * _api_keys_ (dict) default: None - map of api_key to the list of site_ids it may access, other api_key values
+        are rejected; if None any api_key may access every site.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.daily_quota = daily_quota
+        self.max_concurrency = max_concurrency
+        self.enforce_period_limits = enforce_period_limits
+        self.random = random.Random(seed)
+        self.api_keys = {k: [int(v) for v in site_ids] for k, site_ids in api_keys.items()} if api_keys else None
+        self.sites = collections.OrderedDict()
+        for index in range(sites):
+            site = MockSite(index, site_id_start + index, account_id)
+            self.sites[site.id] = site
+        self.lock = threading.Lock()
+        self.active = collections.Counter()
+        self.quota_used = collections.Counter()
+        self.stats = collections.Counter()
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def site_ids(self):
+        return list(self.sites.keys())
+
+    @property
+    def baseurl(self):
+        return 'http://{}:{}'.format(self.host, self.port)
+
+    def start(self):
+        """
+        Start serving requests from a background thread.
+        """
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='solaredge-mock-server', daemon=True)
+        self.thread.start()
+        logger.debug('mock-server; listening on {}'.format(self.baseurl))
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def serve_forever(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.handler_class())
+        self.port = self.httpd.server_address[1]
+        logger.info('mock-server; listening on {}'.format(self.baseurl))
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status_code, body = server.handle(self.path)
+                payload = body.encode('utf-8')
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json;charset=UTF-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug('mock-server; ' + format % args)
+
+        return Handler
+
+    def handle(self, path):
+        """
+        Returns `(status_code, body)` for the request `path`, applying the latency, quota, concurrency, rate-limit and
+        error simulation before routing.
+        """
+        url = urlparse(path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        api_key = params.get('api_key')
+        with self.lock:
+            self.stats['requests'] += 1
+        if not api_key or (self.api_keys is not None and api_key not in self.api_keys):
+            return self.error(403, 'Invalid token')
+
+        with self.lock:
+            rejected = None
+            if self.max_concurrency and self.active[api_key] >= self.max_concurrency:
+                rejected = 'Too many concurrent requests'
+            elif self.daily_quota is not None and self.quota_used[api_key] >= self.daily_quota:
+                rejected = 'Daily request quota exceeded'
+            else:
+                self.active[api_key] += 1
+                self.quota_used[api_key] += 1
+                self.stats['max_concurrency'] = max(self.stats['max_concurrency'], sum(self.active.values()))
+        if rejected:
+            return self.error(429, rejected)
+        try:
+            if self.latency or self.latency_jitter:
+                time.sleep(self.latency + self.random.random() * self.latency_jitter)
+            if self.rate_limit_rate and self.random.random() < self.rate_limit_rate:
+                return self.error(429, 'Too many requests')
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error(500, 'Internal server error')
+            try:
+                data = self.route([part for part in url.path.split('/') if part], params)
+            except MockHTTPError as e:
+                return self.error(e.status_code, e.message)
+            with self.lock:
+                self.stats['status_200'] += 1
+            return 200, json.dumps(data, separators=(',', ':'))
+        finally:
+            with self.lock:
+                self.active[api_key] -= 1
+
+    def error(self, status_code, message):
+        with self.lock:
+            self.stats['status_{}'.format(status_code)] += 1
+        return status_code, json.dumps({'String': message})
+
+    def route(self, parts, params):
+        if parts == ['accounts', 'list']:
+            return self.accounts(params)
+        if parts == ['sites', 'list']:
+            return self.sites_list(params)
+        if parts == ['version', 'current']:
+            return {'version': {'release': MOCK_VERSION}}
+        if parts == ['version', 'supported']:
+            return {'supported': [{'release': '0.9.5'}, {'release': MOCK_VERSION}]}
+        if len(parts) == 3 and parts[0] in ('site', 'sites'):
+            sites = self.lookup_sites(parts[1], params)
+            endpoint = parts[2]
+            if parts[0] == 'sites' or len(sites) > 1:
+                if endpoint not in BULK_ENDPOINTS:
+                    raise MockHTTPError(404, 'Not found')
+                return BULK_ENDPOINTS[endpoint](self, sites, params)
+            if endpoint not in SITE_ENDPOINTS:
+                raise MockHTTPError(404, 'Not found')
+            return SITE_ENDPOINTS[endpoint](self, sites[0], params)
+        if len(parts) == 3 and parts[0] == 'equipment' and parts[2] == 'sensors':
+            return self.equipment_sensors(self.lookup_sites(parts[1], params)[0], params)
+        if len(parts) == 4 and parts[0] == 'equipment':
+            site = self.lookup_sites(parts[1], params)[0]
+            if parts[2] not in site.inverters + site.batteries + site.meters:
+                raise MockHTTPError(403, 'Invalid serial number')
+            if parts[3] == 'data':
+                return self.equipment_data(site, parts[2], params)
+            if parts[3] == 'changeLog':
+                return self.equipment_change_log(site, parts[2], params)
+        raise MockHTTPError(404, 'Not found')
+
+    def visible_sites(self, params):
+        if self.api_keys is None:
+            return list(self.sites.values())
+        return [self.sites[site_id] for site_id in self.api_keys[params['api_key']] if site_id in self.sites]
+
+    def lookup_sites(self, value, params):
+        visible = [site.id for site in self.visible_sites(params)]
+        sites = []
+        for site_id in value.split(','):
+            if not re.match(r'^[0-9]+$', site_id) or int(site_id) not in visible:
+                raise MockHTTPError(403, 'Not authorized to access site {}'.format(site_id))
+            sites.append(self.sites[int(site_id)])
+        return sites
+
+    def window(self, params, endpoint, time_unit=None, dates=False):
+        keys = ('startDate', 'endDate') if dates else ('startTime', 'endTime')
+        formats = FORMAT_DATE_STRING if dates else FORMAT_DATETIME_STRING
+        try:
+            start = datetime.datetime.strptime(params[keys[0]], formats)
+            end = datetime.datetime.strptime(params[keys[1]], formats)
+        except (KeyError, ValueError):
+            raise MockHTTPError(400, '{} and {} must be provided in format {}'.format(keys[0], keys[1], formats))
+        if dates:
+            end = end.replace(hour=23, minute=59, second=59)
+        if end < start:
+            raise MockHTTPError(400, '{} must be after {}'.format(keys[1], keys[0]))
+        limit = PERIOD_LIMITS.get((endpoint, time_unit)) or PERIOD_LIMITS.get((endpoint, None))
+        if self.enforce_period_limits and limit and end - start > limit:
+            raise MockHTTPError(403, '{} API is limited to a {} day period'.format(endpoint, limit.days))
+        return start, end
+
+    @staticmethod
+    def time_unit(params, default='DAY'):
+        time_unit = params.get('timeUnit', default)
+        if time_unit not in series.TIME_UNITS:
+            raise MockHTTPError(400, 'Invalid timeUnit {}'.format(time_unit))
+        return time_unit
+
+    @staticmethod
+    def meters(params, default=('Production', 'Consumption', 'SelfConsumption', 'FeedIn', 'Purchased')):
+        if not params.get('meters'):
+            return list(default)
+        return [meter.strip() for meter in params['meters'].split(',') if meter.strip()]
+
+    def paginate(self, items, params):
+        size = min(int(params.get('size', 100)), 100)
+        start_index = int(params.get('startIndex', 0))
+        return items[start_index:start_index + size]
+
+    def accounts(self, params):
+        accounts = [{
+            'id': self.sites[self.site_ids[0]].account_id if self.sites else 100,
+            'name': 'Mock Account',
+            'location': {'country': 'Mockland', 'city': 'Mock City', 'address': '1 Mock Street', 'zip': '1000'},
+            'companyWebSite': '',
+            'contactPerson': 'Mock Contact',
+            'email': 'mock@example.com',
+            'phoneNumber': '',
+            'faxNumber': '',
+            'notes': '',
+            'parentId': None,
+        }]
+        return {'accounts': {'count': len(accounts), 'list': self.paginate(accounts, params)}}
+
+    def sites_list(self, params):
+        sites = [site.details() for site in self.visible_sites(params)]
+        search_text = params.get('searchText', '').lower()
+        if search_text:
+            sites = [site for site in sites if search_text in site['name'].lower()]
+        if params.get('sortOrder', 'ASC').upper() == 'DESC':
+            sites.reverse()
+        return {'sites': {'count': len(sites), 'site': self.paginate(sites, params)}}
+
+    def site_details(self, site, params):
+        return {'details': site.details()}
+
+    def site_data_period(self, site, params):
+        return {'dataPeriod': self.data_period(site)}
+
+    def data_period(self, site):
+        return {
+            'startDate': site.installation_date.strftime(FORMAT_DATE_STRING),
+            'endDate': site.now().strftime(FORMAT_DATE_STRING),
+        }
+
+    def site_energy(self, site, params):
+        time_unit = self.time_unit(params)
+        start, end = self.window(params, 'energy', time_unit, dates=True)
+        return {'energy': {
+            'timeUnit': time_unit,
+            'unit': 'Wh',
+            'measuredBy': 'INVERTER',
+            'values': series.energy_values(site.index, start, end, site.peak_power, time_unit, now=site.now()),
+        }}
+
+    def site_time_frame_energy(self, site, params):
+        start, end = self.window(params, 'timeFrameEnergy', dates=True)
+        energy = sum(item['value'] or 0.0 for item in series.energy_values(
+            site.index, start, end, site.peak_power, 'DAY', now=site.now()))
+        return {'timeFrameEnergy': {
+            'energy': round(energy, 3),
+            'unit': 'Wh',
+            'measuredBy': 'INVERTER',
+            'startLifetimeEnergy': {'date': start.strftime(FORMAT_DATE_STRING), 'energy': 0.0, 'unit': 'Wh'},
+            'endLifetimeEnergy': {'date': end.strftime(FORMAT_DATE_STRING), 'energy': round(energy, 3), 'unit': 'Wh'},
+        }}
+
+    def site_overview(self, site, params):
+        now = site.now()
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        last_day = sum(item['value'] or 0.0 for item in series.energy_values(
+            site.index, day, now, site.peak_power, 'DAY', now=now))
+        return {'overview': {
+            'lastUpdateTime': now.strftime(FORMAT_DATETIME_STRING),
+            'lifeTimeData': {'energy': round(1000.0 * site.peak_power * 4.2 * (now - site.installation_date).days, 3),
+                             'revenue': 0.0},
+            'lastYearData': {'energy': round(1000.0 * site.peak_power * 4.2 * now.timetuple().tm_yday, 3)},
+            'lastMonthData': {'energy': round(1000.0 * site.peak_power * 4.2 * now.day, 3)},
+            'lastDayData': {'energy': round(last_day, 3)},
+            'currentPower': {'power': series.production_power(site.index, now, site.peak_power)},
+            'measuredBy': 'INVERTER',
+        }}
+
+    def site_power(self, site, params):
+        start, end = self.window(params, 'power')
+        return {'power': {
+            'timeUnit': 'QUARTER_OF_AN_HOUR',
+            'unit': 'W',
+            'measuredBy': 'INVERTER',
+            'values': series.power_values(site.index, start, end, site.peak_power, now=site.now()),
+        }}
+
+    def site_power_details(self, site, params):
+        start, end = self.window(params, 'powerDetails')
+        return {'powerDetails': {
+            'timeUnit': 'QUARTER_OF_AN_HOUR',
+            'unit': 'W',
+            'meters': [
+                {'type': meter, 'values': series.power_values(site.index, start, end, site.peak_power, meter,
+                                                              now=site.now())}
+                for meter in self.meters(params)
+            ],
+        }}
+
+    def site_energy_details(self, site, params):
+        time_unit = self.time_unit(params)
+        start, end = self.window(params, 'energyDetails', time_unit)
+        return {'energyDetails': {
+            'timeUnit': time_unit,
+            'unit': 'Wh',
+            'meters': [
+                {'type': meter, 'values': series.energy_values(site.index, start, end, site.peak_power, time_unit,
+                                                               meter, now=site.now())}
+                for meter in self.meters(params)
+            ],
+        }}
+
+    def site_current_power_flow(self, site, params):
+        power = series.meter_power(site.index, site.now(), site.peak_power)
+        return {'siteCurrentPowerFlow': {
+            'updateRefreshRate': 3,
+            'unit': 'kW',
+            'connections': [{'from': 'PV', 'to': 'Load'}, {'from': 'GRID', 'to': 'Load'}],
+            'GRID': {'status': 'Active', 'currentPower': round(power['Purchased'] / 1000.0, 3)},
+            'LOAD': {'status': 'Active', 'currentPower': round(power['Consumption'] / 1000.0, 3)},
+            'PV': {'status': 'Active' if power['Production'] else 'Idle',
+                   'currentPower': round(power['Production'] / 1000.0, 3)},
+        }}
+
+    def site_storage_data(self, site, params):
+        start, end = self.window(params, 'storageData')
+        now = site.now()
+        serials = [serial.strip() for serial in params.get('serials', '').split(',') if serial.strip()]
+        batteries = []
+        for serial in [serial for serial in site.batteries if not serials or serial in serials]:
+            telemetries = []
+            for dt in series.quarter_hours(start, min(end, now)):
+                power = series.meter_power(site.index, dt, site.peak_power)
+                charge = round(min(power['FeedIn'], 5000.0) - min(power['Purchased'], 5000.0), 3)
+                telemetries.append({
+                    'timeStamp': dt.strftime(FORMAT_DATETIME_STRING),
+                    'power': charge,
+                    'batteryState': 3 if charge > 0 else 4,
+                    'lifeTimeEnergyCharged': 0.0,
+                    'lifeTimeEnergyDischarged': 0.0,
+                    'fullPackEnergyAvailable': 13500.0,
+                    'internalTemp': round(20.0 + 10.0 * series.noise(site.id, dt.toordinal()), 1),
+                    'ACGridCharging': 0.0,
+                    'stateOfCharge': round(100.0 * series.noise(site.id, dt.toordinal(), dt.hour), 1),
+                })
+            batteries.append({'nameplate': 13500.0, 'serialNumber': serial, 'modelNumber': 'MOCK-BAT-13.5',
+                              'telemetryCount': len(telemetries), 'telemetries': telemetries})
+        return {'storageData': {'batteryCount': len(batteries), 'batteries': batteries}}
+
+    def site_environmental_benefits(self, site, params):
+        energy = 1000.0 * site.peak_power * 4.2 * (site.now() - site.installation_date).days
+        imperial = params.get('systemUnits') == 'Imperial'
+        factor = 2.20462 if imperial else 1.0
+        return {'envBenefits': {
+            'gasEmissionSaved': {'units': 'lb' if imperial else 'kg', 'co2': round(energy * 0.0007 * factor, 3),
+                                 'so2': round(energy * 0.000001 * factor, 3),
+                                 'nox': round(energy * 0.0000005 * factor, 3)},
+            'treesPlanted': round(energy * 0.00002, 3),
+            'lightBulbs': round(energy / 1000.0, 3),
+        }}
+
+    def site_inventory(self, site, params):
+        return {'Inventory': {
+            'meters': [{'name': 'Production Meter', 'manufacturer': 'MockMeter', 'model': 'MM-1', 'firmwareVersion':
+                        '1.0', 'connectedSolaredgeDeviceSN': site.inverters[0], 'type': 'Production',
+                        'form': 'physical', 'SN': serial} for serial in site.meters],
+            'sensors': [{'connectedSolaredgeDeviceSN': site.inverters[0], 'id': 'SENSOR 1',
+                         'connectedTo': 'Inverter 1', 'category': 'IRRADIANCE', 'type': 'Plane of array irradiance'}],
+            'gateways': [],
+            'batteries': [{'name': 'Battery 1', 'manufacturer': 'MockBattery', 'model': 'MOCK-BAT-13.5',
+                           'firmwareVersion': '1.0', 'connectedInverterSn': site.inverters[0],
+                           'nameplateCapacity': 13500.0, 'SN': serial} for serial in site.batteries],
+            'inverters': [{'name': 'Inverter {}'.format(n + 1), 'manufacturer': 'SolarEdge',
+                           'model': 'SE{}K'.format(int(site.peak_power // len(site.inverters)) + 1),
+                           'communicationMethod': 'ETHERNET', 'dsp1Version': '1.0.0', 'dsp2Version': '2.0.0',
+                           'cpuVersion': '3.0.0', 'SN': serial, 'connectedOptimizers': 20}
+                          for n, serial in enumerate(site.inverters)],
+        }}
+
+    def site_meters(self, site, params):
+        time_unit = self.time_unit(params)
+        start, end = self.window(params, 'meters')
+        meters = self.meters(params, default=('Production', 'Consumption', 'FeedIn', 'Purchased'))
+        return {'meterEnergyDetails': {
+            'timeUnit': time_unit,
+            'unit': 'Wh',
+            'meters': [{
+                'meterSerialNumber': '{}-{}'.format(site.meters[0], meter),
+                'connectedSolaredgeDeviceSN': site.inverters[0],
+                'model': 'MM-1',
+                'meterType': meter,
+                'values': series.energy_values(site.index, start, end, site.peak_power, time_unit, meter,
+                                               now=site.now()),
+            } for meter in meters],
+        }}
+
+    def equipment_sensors(self, site, params):
+        return {'SiteSensors': {'count': 1, 'list': [{
+            'connectedTo': 'Inverter 1',
+            'count': 1,
+            'sensors': [{'name': 'SENSOR 1', 'measurement': 'SensorGlobalHorizontalIrradiance', 'type': 'IRRADIANCE'}],
+        }]}}
+
+    def equipment_data(self, site, serial, params):
+        start, end = self.window(params, 'data')
+        share = 1.0 / len(site.inverters)
+        telemetries = []
+        for dt in series.quarter_hours(start, min(end, site.now())):
+            power = series.production_power(site.index, dt, site.peak_power) * share
+            voltage = round(230.0 + 5.0 * series.noise(site.id, dt.toordinal(), dt.hour * 4 + dt.minute // 15), 2)
+            telemetries.append({
+                'date': dt.strftime(FORMAT_DATETIME_STRING),
+                'totalActivePower': round(power, 3),
+                'dcVoltage': round(380.0 + 20.0 * series.noise(site.id, dt.toordinal()), 2) if power else None,
+                'groundFaultResistance': 11000.0,
+                'powerLimit': 100.0,
+                'totalEnergy': round(1000.0 * site.peak_power * share * 4.2 *
+                                     (dt - site.installation_date).days, 3),
+                'temperature': round(25.0 + power / 400.0, 2),
+                'inverterMode': 'MPPT' if power else 'SLEEPING',
+                'operationMode': 0,
+                'L1Data': {
+                    'acCurrent': round(power / voltage, 3),
+                    'acVoltage': voltage,
+                    'acFrequency': 50.0,
+                    'apparentPower': round(power, 3),
+                    'activePower': round(power, 3),
+                    'reactivePower': 0.0,
+                    'cosPhi': 1.0,
+                },
+            })
+        return {'data': {'count': len(telemetries), 'telemetries': telemetries}}
+
+    def equipment_change_log(self, site, serial, params):
+        return {'ChangeLog': {'count': 1, 'list': [{
+            'serialNumber': serial,
+            'partNumber': 'MOCK-PART-1',
+            'date': site.installation_date.strftime(FORMAT_DATE_STRING),
+        }]}}
+
+    def bulk_data_period(self, sites, params):
+        return {'datePeriodList': {'count': len(sites), 'siteEnergyList': [
+            {'siteId': site.id, 'dataPeriod': self.data_period(site)} for site in sites
+        ]}}
+
+    def bulk_energy(self, sites, params):
+        time_unit = self.time_unit(params)
+        start, end = self.window(params, 'energy', time_unit, dates=True)
+        return {'sitesEnergy': {'timeUnit': time_unit, 'unit': 'Wh', 'count': len(sites), 'siteEnergyList': [
+            {'siteId': site.id, 'energyValues': {
+                'measuredBy': 'INVERTER',
+                'values': series.energy_values(site.index, start, end, site.peak_power, time_unit, now=site.now())
+            }} for site in sites
+        ]}}
+
+    def bulk_time_frame_energy(self, sites, params):
+        return {'timeFrameEnergyList': {'count': len(sites), 'timeFrameEnergyList': [
+            {'siteId': site.id, 'timeFrameEnergy': self.site_time_frame_energy(site, params)['timeFrameEnergy']}
+            for site in sites
+        ]}}
+
+    def bulk_overview(self, sites, params):
+        return {'sitesOverviews': {'count': len(sites), 'siteEnergyList': [
+            {'siteId': site.id, 'siteOverview': self.site_overview(site, params)['overview']} for site in sites
+        ]}}
+
+    def bulk_power(self, sites, params):
+        start, end = self.window(params, 'power')
+        return {'powerDateValuesList': {'timeUnit': 'QUARTER_OF_AN_HOUR', 'unit': 'W', 'count': len(sites),
+                                        'siteEnergyList': [
+            {'siteId': site.id, 'powerDataValueSeries': {
+                'measuredBy': 'INVERTER',
+                'values': series.power_values(site.index, start, end, site.peak_power, now=site.now())
+            }} for site in sites
+        ]}}
+
+
+SITE_ENDPOINTS = {
+    'details': SolarEdgeMockServer.site_details,
+    'dataPeriod': SolarEdgeMockServer.site_data_period,
+    'energy': SolarEdgeMockServer.site_energy,
+    'timeFrameEnergy': SolarEdgeMockServer.site_time_frame_energy,
+    'overview': SolarEdgeMockServer.site_overview,
+    'power': SolarEdgeMockServer.site_power,
+    'powerDetails': SolarEdgeMockServer.site_power_details,
+    'energyDetails': SolarEdgeMockServer.site_energy_details,
+    'currentPowerFlow': SolarEdgeMockServer.site_current_power_flow,
+    'storageData': SolarEdgeMockServer.site_storage_data,
+    'envBenefits': SolarEdgeMockServer.site_environmental_benefits,
+    'inventory': SolarEdgeMockServer.site_inventory,
+    'meters': SolarEdgeMockServer.site_meters,
+}
+
+BULK_ENDPOINTS = {
+    'dataPeriod': SolarEdgeMockServer.bulk_data_period,
+    'energy': SolarEdgeMockServer.bulk_energy,
+    'timeFrameEnergy': SolarEdgeMockServer.bulk_time_frame_energy,
+    'overview': SolarEdgeMockServer.bulk_overview,
+    'power': SolarEdgeMockServer.bulk_power,
+}
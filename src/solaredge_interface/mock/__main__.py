@@ -0,0 +1,60 @@
+"""
+Run a local SolarEdge API stand-in server -
+
+    $ python -m solaredge_interface.mock --port 8080 --sites 100 --latency 0.2 --max-concurrency 3
+    $ SOLAREDGE_API_BASEURL=http://127.0.0.1:8080 solaredge-interface sites
+"""
+
+import sys
+import logging
+import argparse
+
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m solaredge_interface.mock',
+                                     description='Local SolarEdge API stand-in server with synthetic data.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--sites', type=int, default=10, help='Number of synthetic sites (default: 10)')
+    parser.add_argument('--site-id-start', type=int, default=1000001, help='First synthetic site_id')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='Random seconds added on top of latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--daily-quota', type=int, default=None, help='Requests allowed per api_key')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='Concurrent requests allowed per api_key')
+    parser.add_argument('--no-period-limits', action='store_true', help='Allow any time window length')
+    parser.add_argument('--api-key', action='append', default=None, metavar='API_KEY:SITE_ID,...',
+                        help='An api_key and the comma separated site_ids it may access, may be repeated; other '
+                             'api_key values are rejected (default: any api_key may access every site)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for the simulation')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='[%(levelname)s|%(asctime)s|%(name)s]: %(message)s')
+
+    api_keys = None
+    if args.api_key:
+        api_keys = {}
+        for value in args.api_key:
+            api_key, _, site_ids = value.partition(':')
+            api_keys[api_key] = [int(site_id) for site_id in site_ids.split(',') if site_id.strip()]
+
+    server = SolarEdgeMockServer(
+        host=args.host, port=args.port, sites=args.sites, site_id_start=args.site_id_start, latency=args.latency,
+        latency_jitter=args.latency_jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        daily_quota=args.daily_quota, max_concurrency=args.max_concurrency,
+        enforce_period_limits=not args.no_period_limits, seed=args.seed, api_keys=api_keys,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
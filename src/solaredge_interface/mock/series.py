@@ -0,0 +1,117 @@
+
+import math
+import datetime
+
+from solaredge_interface.utils.timedates import FORMAT_DATETIME_STRING, period_start
+
+QUARTER_OF_AN_HOUR = datetime.timedelta(minutes=15)
+TIME_UNITS = ['QUARTER_OF_AN_HOUR', 'HOUR', 'DAY', 'WEEK', 'MONTH', 'YEAR']
+
+
+def noise(*seed):
+    """
+    Deterministic pseudo-random value in the range [0, 1) derived from the integer `seed` values.
+    """
+    value = 2166136261
+    for item in seed:
+        value = ((value ^ (int(item) & 0xffffffff)) * 16777619) & 0xffffffff
+    value ^= value >> 13
+    value = (value * 0x5bd1e995) & 0xffffffff
+    value ^= value >> 15
+    return value / 4294967296.0
+
+
+def daylight(dt):
+    """
+    Returns the (sunrise, sunset) hour for the day of `dt` on a simple seasonal curve.
+    """
+    day_of_year = dt.timetuple().tm_yday
+    season = math.cos(2 * math.pi * (day_of_year - 172) / 365.25)
+    return 6.5 - 1.0 * season, 18.0 + 1.5 * season
+
+
+def production_power(site, dt, peak_power):
+    """
+    Synthetic PV production power (W) for the `site` index at local time `dt` for a system of `peak_power` (kW); a
+    clear-sky bell curve shaped by the season and a per-day and per-quarter-hour cloud factor.
+    """
+    sunrise, sunset = daylight(dt)
+    hour = dt.hour + dt.minute / 60.0
+    if hour <= sunrise or hour >= sunset:
+        return 0.0
+    shape = math.sin(math.pi * (hour - sunrise) / (sunset - sunrise)) ** 2
+    day_clouds = 0.35 + 0.65 * noise(site, dt.toordinal())
+    quarter_clouds = 0.8 + 0.2 * noise(site, dt.toordinal(), dt.hour * 4 + dt.minute // 15)
+    return round(peak_power * 1000.0 * 0.85 * shape * day_clouds * quarter_clouds, 3)
+
+
+def consumption_power(site, dt):
+    """
+    Synthetic household consumption power (W) with a base load, morning and evening peaks and noise.
+    """
+    hour = dt.hour + dt.minute / 60.0
+    base = 350.0 + 250.0 * noise(site, 1)
+    peaks = 900.0 * math.exp(-((hour - 7.5) ** 2) / 2.0) + 1800.0 * math.exp(-((hour - 19.0) ** 2) / 4.0)
+    return round(base + peaks * (0.6 + 0.8 * noise(site, dt.toordinal(), dt.hour * 4 + dt.minute // 15, 2)), 3)
+
+
+def meter_power(site, dt, peak_power):
+    """
+    Returns the power (W) of each physical and virtual meter at `dt` as a dict keyed by SolarEdge meter type.
+    """
+    production = production_power(site, dt, peak_power)
+    consumption = consumption_power(site, dt)
+    return {
+        'Production': production,
+        'Consumption': consumption,
+        'SelfConsumption': min(production, consumption),
+        'FeedIn': round(max(production - consumption, 0.0), 3),
+        'Purchased': round(max(consumption - production, 0.0), 3),
+    }
+
+
+def quarter_hours(start, end):
+    """
+    Yields every quarter-hour aligned timestamp from `start` up to and including `end`.
+    """
+    dt = start.replace(minute=start.minute - start.minute % 15, second=0, microsecond=0)
+    if dt < start:
+        dt += QUARTER_OF_AN_HOUR
+    while dt <= end:
+        yield dt
+        dt += QUARTER_OF_AN_HOUR
+
+
+def power_values(site, start, end, peak_power, meter='Production', now=None):
+    """
+    Returns the SolarEdge style `[{'date': ..., 'value': ...}]` quarter-hour power values of `meter` between `start`
+    and `end`; values later than `now` are returned as None as the SolarEdge API does.
+    """
+    values = []
+    for dt in quarter_hours(start, end):
+        value = None if now and dt > now else meter_power(site, dt, peak_power)[meter]
+        values.append({'date': dt.strftime(FORMAT_DATETIME_STRING), 'value': value})
+    return values
+
+
+def energy_values(site, start, end, peak_power, time_unit='DAY', meter='Production', now=None):
+    """
+    Returns the SolarEdge style `[{'date': ..., 'value': ...}]` energy values (Wh) of `meter` between `start` and
+    `end` aggregated into `time_unit` periods; periods that begin later than `now` are returned as None.
+    """
+    periods = {}
+    order = []
+    for dt in quarter_hours(start, end):
+        key = period_start(dt, time_unit)
+        if key not in periods:
+            periods[key] = 0.0
+            order.append(key)
+        if now and dt > now:
+            continue
+        periods[key] += meter_power(site, dt, peak_power)[meter] / 4.0
+    return [
+        {
+            'date': key.strftime(FORMAT_DATETIME_STRING),
+            'value': None if now and key > now else round(periods[key], 3)
+        } for key in order
+    ]
@@ -20,6 +20,27 @@ def site_id(kwargs, config):
     return kwargs
 
 
+def site_ids(kwargs, config):
+    """
+    Resolve the `site_id` values (each may be comma separated) and the `site_ids_file` of a multi-site sub-command
+    into the `site_id` list, defaulting to the configured site_id.
+    """
+    values = []
+    for value in kwargs.get('site_id') or []:
+        values.extend([item.strip() for item in str(value).split(',') if item.strip()])
+    site_ids_file = kwargs.pop('site_ids_file', None)
+    if site_ids_file:
+        values.extend(load_site_ids(site_ids_file))
+    if not values and config.site_id is not None:
+        values = [item.strip() for item in str(config.site_id).split(',') if item.strip()]
+    if not values:
+        raise SolarEdgeInterfaceException('Must provide a "site_id" input value.  See documentation to set via command '
+                                          'line argument or using the {} environment variable.'.format(ENV_SITE_ID))
+    kwargs['site_id'] = list(dict.fromkeys(values))
+    logger.debug('site_ids: {}'.format(kwargs['site_id']))
+    return kwargs
+
+
 def end_date(kwargs):
     if 'end_date' not in kwargs.keys() or kwargs['end_date'] is None:
         kwargs['end_date'] = datestring_current()
@@ -46,3 +67,15 @@ def start_time(kwargs, delta_time=-(3600*24*7)):
         kwargs['start_time'] = timestring_seconds_delta(kwargs['end_time'], delta=delta_time)
     logger.debug('start_time: {}'.format(kwargs['start_time']))
     return kwargs
+
+
+def load_site_ids(filename):
+    """
+    Returns the site_ids in `filename`, separated by commas, whitespace or new lines; `#` starts a comment.
+    """
+    site_ids = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            site_ids.extend([item for item in line.replace(',', ' ').split() if item])
+    return site_ids
@@ -0,0 +1,48 @@
+
+import logging
+import threading
+import functools
+
+from solaredge_interface.utils.metrics import METRIC_CACHE_HITS, METRIC_CACHE_MISSES
+
+
+logger = logging.getLogger(__name__)
+
+
+def lru_cache_metrics(endpoint, maxsize=128):
+    """
+    Drop-in replacement for `functools.lru_cache()` on SolarEdgeAPI methods that additionally reports a cache hit
+    or miss for `endpoint` to the `metrics` sink of the instance the method is called on.  Calling the method with
+    `cache=False` bypasses the cache for that call and reports a miss; the cached entry is left unchanged.
+    """
+
+    local = threading.local()
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        def uncached(*args, **kwargs):
+            local.miss = True
+            return func(*args, **kwargs)
+
+        cached = functools.lru_cache(maxsize=maxsize)(uncached)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, cache=True, **kwargs):
+            previous = getattr(local, 'miss', False)
+            local.miss = False
+            try:
+                result = cached(self, *args, **kwargs) if cache else uncached(self, *args, **kwargs)
+                miss = local.miss
+            finally:
+                local.miss = previous
+            metrics = getattr(self, 'metrics', None)
+            if metrics is not None:
+                metrics.increment(endpoint, METRIC_CACHE_MISSES if miss else METRIC_CACHE_HITS)
+            return result
+
+        wrapper.cache_info = cached.cache_info
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+
+    return decorator
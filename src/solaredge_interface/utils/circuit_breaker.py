@@ -0,0 +1,135 @@
+import copy
+import time
+import logging
+import threading
+import collections
+
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_BREAKER_THRESHOLD = 5  # consecutive failures that open the circuit
+CIRCUIT_BREAKER_RESET = 30.0  # seconds the circuit stays open before one probe request is let through
+STALE_CACHE_MAX_KEYS = 256
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CircuitBreakerException(SolarEdgeInterfaceException):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the SolarEdge API is unavailable.  After `failure_threshold` consecutive failures
+    (connection errors, timeouts or 5xx responses) the circuit opens and requests are rejected without waiting on the
+    network; after `reset_timeout` seconds one probe request is let through (half-open), its success closes the
+    circuit again and its failure re-opens it.
+    """
+
+    failure_threshold = None
+    reset_timeout = None
+    state = None
+    failures = None
+
+    def __init__(self, failure_threshold=CIRCUIT_BREAKER_THRESHOLD, reset_timeout=CIRCUIT_BREAKER_RESET):
+        """
+        _parameters_
+        * _failure_threshold_ (int) default: `5` - consecutive failures that open the circuit.
+        * _reset_timeout_ (float) default: `30.0` - seconds the circuit stays open before a probe request.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns True if a request may be made now; when the open circuit has waited `reset_timeout` the first caller
+        becomes the half-open probe and all others are rejected until it completes.
+        """
+        with self.lock:
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_OPEN and time.monotonic() - self.opened >= self.reset_timeout:
+                logger.debug('circuit-breaker; half-open, letting a probe request through')
+                self.state = CIRCUIT_HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self):
+        """
+        Returns the seconds until the open circuit lets a probe request through, 0 if it is not open.
+        """
+        with self.lock:
+            if self.state != CIRCUIT_OPEN:
+                return 0.0
+            return max(0.0, self.opened + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CIRCUIT_CLOSED:
+                logger.debug('circuit-breaker; closed')
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CIRCUIT_OPEN:
+                    logger.warning('circuit-breaker; open after {} consecutive failures'.format(self.failures))
+                self.state = CIRCUIT_OPEN
+                self.opened = time.monotonic()
+
+
+class StaleCache:
+    """
+    The last successful response of each request, served with its age while the circuit is open or the API fails.
+    """
+
+    max_keys = None
+
+    def __init__(self, max_keys=STALE_CACHE_MAX_KEYS):
+        """
+        _parameters_
+        * _max_keys_ (int) default: `256` - the number of requests held, the least recently used is dropped first.
+        """
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+
+    @staticmethod
+    def key(url, params):
+        """
+        Returns the cache key of a request, ignoring the `api_key` so any key of a pool may serve it.
+        """
+        return url, tuple(sorted([(k, str(v)) for k, v in (params or {}).items() if k != 'api_key']))
+
+    def put(self, key, response):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), copy.copy(response))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_keys:
+                self.entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns a copy of the held response with `stale_age` set to its age in seconds, or None.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored, response = entry
+        response = copy.copy(response)
+        response.stale_age = time.monotonic() - stored
+        return response
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -1,15 +1,26 @@
 
+import time
 import logging
-import requests
 from solaredge_interface import __http_request_user_agent__ as USER_AGENT
 from solaredge_interface import __http_request_timeout__ as REQUESTS_TIMEOUT
+from solaredge_interface.utils.json import json_decode
 
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+RETRY_BACKOFF = 0.5
+SLIM_RESPONSE_UNSET = object()  # marks SlimResponse data and pandas not yet built
+
 
 class Response(object):
-    url = request = headers = cookies = status_code = elapsed = text = None
+    url = request = headers = cookies = status_code = elapsed = content = encoding = size = None
+    retries = 0
+    stale_age = None  # seconds since a stale response was fetched, see `CircuitBreaker`
+    model = None  # typed model of the data, see `SolarEdgeAPI` typed_response
+    decoder = None  # decodes `data` from the body on first access when it was not decoded up front
+    _text = None
+    _data = None
 
     def __init__(self, **attrs):
         for k in attrs:
@@ -23,8 +34,172 @@ class Response(object):
     def __set__(self, name, value):
         setattr(self, name, value)
 
+    @property
+    def text(self):
+        if self._text is None and self.content is not None:
+            self._text = response_text(self.content, self.encoding)
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self.content = None
+
+    @property
+    def body(self):
+        """
+        The raw body bytes when available, else the body text; both may be passed directly to `json_decode()`.
+        """
+        return self.content if self.content is not None else self.text
+
+    @property
+    def data(self):
+        # concurrent first access may decode twice, each caller still gets a complete result
+        if self._data is None and self.decoder is not None:
+            self._data = self.decoder(self.body)
+            self.decoder = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+
+class SlimResponse(object):
+    """
+    Compact response with `__slots__` and no cookies; `data` is decoded from `body` by the `decoder` on first access,
+    `pandas` is built from `data` by the `tabulator` on first access, and `model` by the `modeler` from the decoded
+    body without keeping the decoded `data`.  Call `release()` once parsed to drop the raw body and `request` so that
+    long-lived (eg cached) responses hold only the parsed data.
+    """
+
+    __slots__ = ['url', 'request', 'headers', 'status_code', 'elapsed', 'content', 'encoding', 'size', 'retries',
+                 'stale_age', 'decoder', 'tabulator', 'modeler', '_text', '_data', '_pandas', '_model']
+
+    def __init__(self, response, decoder=None, tabulator=None, modeler=None):
+        """
+        _parameters_
+        * _response_ (Response) required - the response to take the url, status, headers and body from.
+        * _decoder_ (callable) default: None - `decoder(body)` returns the `data`, if None the body is JSON decoded.
+        * _tabulator_ (callable) default: None - `tabulator(data)` returns the `pandas` DataFrame, if None `pandas` is
+        None.
+        * _modeler_ (callable) default: None - `modeler(data)` returns the typed `model`, if None `model` is None.
+        """
+        self.url = response.url
+        self.request = response.request
+        self.headers = response.headers
+        self.status_code = response.status_code
+        self.elapsed = response.elapsed
+        self.content = response.content
+        self.encoding = response.encoding
+        self._text = None if response.content is not None else response.text
+        self.size = response.size
+        self.retries = response.retries
+        self.stale_age = response.stale_age
+        self.decoder = decoder
+        self.tabulator = tabulator
+        self.modeler = modeler
+        self._data = self._pandas = self._model = SLIM_RESPONSE_UNSET
+
+    def __str__(self):
+        return str(self.text)
+
+    @property
+    def text(self):
+        if self._text is None and self.content is not None:
+            self._text = response_text(self.content, self.encoding)
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self.content = None
+
+    @property
+    def body(self):
+        return self.content if self.content is not None else self._text
+
+    @property
+    def data(self):
+        # concurrent first access may decode twice, each caller still gets a complete result
+        if self._data is SLIM_RESPONSE_UNSET:
+            self._data = self.decoder(self.body) if self.decoder is not None else json_decode(self.body)
+            self.decoder = None
+        return self._data
 
-def http_request(url, params=None, headers=None, timeout=REQUESTS_TIMEOUT):
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def pandas(self):
+        if self._pandas is SLIM_RESPONSE_UNSET:
+            data = self.data
+            self._pandas = self.tabulator(data) if self.tabulator is not None and data else None
+            self.tabulator = None
+        return self._pandas
+
+    @pandas.setter
+    def pandas(self, value):
+        self._pandas = value
+
+    @property
+    def model(self):
+        if self._model is SLIM_RESPONSE_UNSET:
+            # the model is built from the decoded body without keeping the decoded data unless it already is
+            data = self._data
+            if data is SLIM_RESPONSE_UNSET:
+                data = self.decoder(self.body) if self.decoder is not None else json_decode(self.body)
+            self._model = self.modeler(data) if self.modeler is not None and data else None
+            self.modeler = None
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    def release(self):
+        """
+        Decode `data` (if not already decoded) and then drop the raw body and `request`; returns the response.
+        """
+        _ = self.data
+        self.text = None
+        self.request = None
+        return self
+
+
+def response_text(content, encoding=None):
+    """
+    Decode the response body `content` bytes; JSON bodies are UTF-8 when the response does not declare a charset.
+    """
+    return content.decode(encoding or 'utf-8', errors='replace')
+
+
+def http_session(pool_size=10):
+    """
+    Returns a `requests.Session` whose connection pool keeps up to `pool_size` connections alive per host so that
+    repeated and concurrent requests re-use connections rather than re-connecting for every request.
+    """
+    import requests  # imported on first use to keep command-line startup fast
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def http_request(url, params=None, headers=None, timeout=REQUESTS_TIMEOUT, retries=0, retry_backoff=RETRY_BACKOFF,
+                 session=None, decode_text=True):
+    """
+    Make an http GET request, retrying up to `retries` times on connection errors, timeouts and 429/5xx responses.
+
+    With `decode_text=False` the response keeps the raw body bytes as `.content` and `.text` is only decoded when it
+    is accessed, which avoids holding a str copy of large bodies; pass `.body` to `json_decode()` in either case.
+
+    The `session` may be a `requests.Session` or any `solaredge_interface.utils.transport.Transport`.
+    """
+    import requests  # imported on first use to keep command-line startup fast
 
     if type(params) is dict:
         for key in params:
@@ -37,7 +212,23 @@ def http_request(url, params=None, headers=None, timeout=REQUESTS_TIMEOUT):
     else:
         headers = {'user-agent': USER_AGENT}
 
-    r = requests.get(url, params=params, headers=headers, timeout=timeout)
+    attempt = 0
+    while True:
+        try:
+            if session is not None:
+                r = session.get(url, params=params, headers=headers, timeout=timeout)
+            else:
+                r = requests.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, ConnectionError, TimeoutError) as e:
+            if attempt >= retries:
+                raise
+            logger.debug('http-request; retry={} after {}'.format(attempt + 1, e.__class__.__name__))
+        else:
+            if r.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                break
+            logger.debug('http-request; retry={} after http-status={}'.format(attempt + 1, r.status_code))
+        time.sleep(retry_backoff * (2 ** attempt))
+        attempt += 1
 
     response = Response(
         url=r.url,
@@ -45,9 +236,15 @@ def http_request(url, params=None, headers=None, timeout=REQUESTS_TIMEOUT):
         headers=r.headers,
         cookies=r.cookies,
         status_code=r.status_code,
-        text=r.text,
+        encoding=r.encoding,
         elapsed=r.elapsed,
+        size=len(r.content),
+        retries=attempt,
     )
+    if decode_text:
+        response.text = r.text
+    else:
+        response.content = r.content
     logger.debug('http-response; url={}'.format(r.url))
     logger.debug('http-response; http-status={}'.format(r.status_code))
     return response
@@ -7,6 +7,7 @@ from solaredge_interface.utils.timedates import datetime_to_string, FORMAT_DATET
 
 logger = logging.getLogger(__name__)
 DATA_PARSE_ERROR_LOGGER = False
+BYTES_LOADS = None  # resolved on the first bytes decode, see json_bytes_loads()
 
 
 class JSONEncoderDateTime(json.JSONEncoder):
@@ -18,10 +19,28 @@ class JSONEncoderDateTime(json.JSONEncoder):
             return json.JSONEncoder.default(self, obj)
 
 
+def json_bytes_loads():
+    """
+    Returns the function used to decode bytes bodies; `orjson.loads` when the optional orjson package is installed as
+    it parses bytes directly without building an intermediate str, else `json.loads`.
+    """
+    global BYTES_LOADS
+    if BYTES_LOADS is None:
+        try:
+            import orjson
+            BYTES_LOADS = orjson.loads
+        except ImportError:
+            BYTES_LOADS = json.loads
+    return BYTES_LOADS
+
+
 def json_decode(string, error_logger=DATA_PARSE_ERROR_LOGGER):
     try:
-        data = json.loads(string)
-    except json.decoder.JSONDecodeError:
+        if type(string) is bytes:
+            data = json_bytes_loads()(string)
+        else:
+            data = json.loads(string)
+    except (json.decoder.JSONDecodeError, UnicodeDecodeError):
         if error_logger:
             logger.error('Unable to JSON decode: {}'.format(string[0:255]))
         data = None
@@ -0,0 +1,226 @@
+
+import os
+import time
+import logging
+import threading
+import contextlib
+import collections
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_REQUEST_LATENCY = 'request_latency'
+METRIC_RESPONSE_BYTES = 'response_bytes'
+METRIC_REQUESTS = 'requests'
+METRIC_RETRIES = 'retries'
+METRIC_CACHE_HITS = 'cache_hits'
+METRIC_CACHE_MISSES = 'cache_misses'
+METRIC_COALESCED = 'coalesced'
+METRIC_CIRCUIT_OPEN = 'circuit_open'
+METRIC_STALE = 'stale'
+METRIC_PHASE_PREFIX = 'phase.'
+
+
+def process_elapsed():
+    """
+    Returns the wall-clock seconds since the current process started, read from `/proc` on Linux or with `psutil` when
+    it is installed, or None when the process start time is not available.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            stat = f.read()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(stat[stat.rindex(')') + 2:].split()[19])  # field 22, starttime in clock ticks after boot
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return max(0.0, time.time() - psutil.Process().create_time())
+
+
+class MetricsSink(object):
+    """
+    Base metrics sink that discards everything; subclass this (or provide any object with the same `increment`,
+    `observe` and `timer` methods) to route SolarEdgeAPI metrics into your own monitoring system.
+    """
+
+    def increment(self, endpoint, name, value=1):
+        """
+        Increment the counter `name` for `endpoint` by `value`.
+        """
+        pass
+
+    def observe(self, endpoint, name, value):
+        """
+        Record a single histogram observation `value` for the metric `name` at `endpoint`.
+        """
+        pass
+
+    @contextlib.contextmanager
+    def timer(self, endpoint, name):
+        """
+        Context manager that observes the wall-clock seconds spent inside the block as `name` for `endpoint`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(endpoint, name, time.perf_counter() - start)
+
+
+class Histogram(object):
+    """
+    Summary of observed values; count, total, min and max with a fixed set of upper-bound buckets.
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets', 'bucket_counts')
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        for index, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.bucket_counts[index] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.bucket_counts)),
+        }
+
+
+class MetricsCollector(MetricsSink):
+    """
+    The default in-process metrics sink; keeps per-endpoint counters and histogram summaries in memory.
+    """
+
+    # seconds for timings, bytes for sizes
+    TIMING_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    BYTES_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = collections.defaultdict(lambda: collections.defaultdict(int))
+        self.histograms = collections.defaultdict(dict)
+
+    def increment(self, endpoint, name, value=1):
+        with self.lock:
+            self.counters[endpoint][name] += value
+
+    def observe(self, endpoint, name, value):
+        with self.lock:
+            histogram = self.histograms[endpoint].get(name)
+            if histogram is None:
+                buckets = self.BYTES_BUCKETS if name == METRIC_RESPONSE_BYTES else self.TIMING_BUCKETS
+                histogram = self.histograms[endpoint][name] = Histogram(buckets)
+            histogram.add(value)
+
+    def counter(self, endpoint, name):
+        with self.lock:
+            return self.counters.get(endpoint, {}).get(name, 0)
+
+    def histogram(self, endpoint, name):
+        with self.lock:
+            histogram = self.histograms.get(endpoint, {}).get(name)
+            return histogram.summary() if histogram else None
+
+    def summary(self):
+        """
+        Returns a dict of `{endpoint: {'counters': {...}, 'histograms': {...}}}` for all recorded metrics.
+        """
+        with self.lock:
+            endpoints = sorted(set(self.counters.keys()) | set(self.histograms.keys()))
+            return {
+                endpoint: {
+                    'counters': dict(self.counters.get(endpoint, {})),
+                    'histograms': {k: v.summary() for k, v in self.histograms.get(endpoint, {}).items()},
+                } for endpoint in endpoints
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class ProfileCollector(MetricsCollector):
+    """
+    A `MetricsCollector` that also totals the wall-clock and CPU seconds of every phase, the post-processing phases
+    timed by `SolarEdgeAPI` as well as any phase timed with `phase()`, for the `--profile` command-line option.  CPU
+    seconds are those of the thread running the phase.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.phases = collections.OrderedDict()  # phase: [calls, wall seconds, cpu seconds]
+
+    @contextlib.contextmanager
+    def timer(self, endpoint, name):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            self.observe(endpoint, name, wall)
+            self.add_phase(name[len(METRIC_PHASE_PREFIX):] if name.startswith(METRIC_PHASE_PREFIX) else name, wall, cpu)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager that adds the wall-clock and CPU seconds spent inside the block to phase `name`.
+        """
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add_phase(self, name, wall, cpu, calls=1):
+        with self.lock:
+            phase = self.phases.setdefault(name, [0, 0.0, 0.0])
+            phase[0] += calls
+            phase[1] += wall
+            phase[2] += cpu
+
+    def profile_table(self, total=None):
+        """
+        Returns the phases as a text table of calls, wall and CPU seconds in the order they first ran, with a final
+        `total` row when `total` is a `(wall, cpu)` tuple.
+        """
+        with self.lock:
+            rows = [(name, calls, wall, cpu) for name, (calls, wall, cpu) in self.phases.items()]
+        if total is not None:
+            rows.append(('total', 1, total[0], total[1]))
+        width = max([len('phase')] + [len(row[0]) for row in rows])
+        lines = ['{:<{w}}  {:>6}  {:>10}  {:>10}'.format('phase', 'calls', 'wall_s', 'cpu_s', w=width)]
+        for name, calls, wall, cpu in rows:
+            lines.append('{:<{w}}  {:>6d}  {:>10.4f}  {:>10.4f}'.format(name, calls, wall, cpu, w=width))
+        return '\n'.join(lines)
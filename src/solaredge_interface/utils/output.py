@@ -7,30 +7,48 @@ from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdge
 
 logger = logging.getLogger(__name__)
 
+PANDAS_OUTPUT_FORMATS = ['pandas', 'csv']  # output formats that require the response .pandas DataFrame
+
 
 def format_output(response, output_format=OUTPUT_FORMAT_DEFAULT):
+    print(render_output(response, output_format=output_format))
+
+
+def render_output(response, output_format=OUTPUT_FORMAT_DEFAULT):
     if type(output_format) is str:
         output_format = output_format.lower()
     if hasattr(response, 'data') and response.data and output_format == 'json':
-        output_json(response.data)
+        return render_json(response.data)
     elif hasattr(response, 'pandas') and response.pandas is not None and output_format == 'pandas':
-        output_pandas(response.pandas)
+        return render_pandas(response.pandas)
     elif hasattr(response, 'pandas') and response.pandas is not None and output_format == 'csv':
-        output_csv(response.pandas)
+        return render_csv(response.pandas)
     elif output_format not in ['json', 'pandas', 'csv']:
         raise SolarEdgeInterfaceException('Unknown output format requested: {}'.format(output_format))
     else:
         logging.warning('response.data is not available for output formatting, raw response data is provided')
-        print(response.text)
+        return str(response.text)
+
+
+def render_json(data, indent='  '):
+    return json.dumps(data, cls=JSONEncoderDateTime, indent=indent)
+
+
+def render_pandas(pandas_dataframe):
+    return render_json(json.loads(pandas_dataframe.to_json()))
+
+
+def render_csv(pandas_dataframe):
+    return pandas_dataframe.to_csv()
 
 
 def output_json(data):
-    print(json.dumps(data, cls=JSONEncoderDateTime, indent='  '))
+    print(render_json(data))
 
 
 def output_pandas(pandas_dataframe):
-    output_json(json.loads(pandas_dataframe.to_json()))
+    print(render_pandas(pandas_dataframe))
 
 
 def output_csv(pandas_dataframe):
-    print(pandas_dataframe.to_csv())
+    print(render_csv(pandas_dataframe))
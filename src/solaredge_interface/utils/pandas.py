@@ -1,8 +1,25 @@
 
 import re
+import logging
+import datetime
 import collections
+import numpy as np
 import pandas as pd
 
+from solaredge_interface.utils.timedates import FORMAT_DATE_STRING, FORMAT_DATETIME_STRING, \
+    DICT_KEY_CONTAIN_CONVERT_DATETIME
+
+logger = logging.getLogger(__name__)
+
+BULK_DATA_KEYS = {
+    # bulk data key: (per-site list key, per-site item key, metric of the values series or None, timestamp key)
+    'sitesEnergy': ('siteEnergyList', 'energyValues', 'energy', None),
+    'powerDateValuesList': ('siteEnergyList', 'powerDataValueSeries', 'power', None),
+    'sitesOverviews': ('siteEnergyList', 'siteOverview', None, 'lastUpdateTime'),
+    'timeFrameEnergyList': ('timeFrameEnergyList', 'timeFrameEnergy', None, None),
+    'datePeriodList': ('siteEnergyList', 'dataPeriod', None, None),
+}
+
 
 def data_to_pandas(data, sep='.', prefix_to_remove=None):
     column_names, data_table = tabelize_data(
@@ -84,3 +101,137 @@ def tabelize_data(data, sep='.', prefix_remove=None):
         previous_group_index_key = group_index_key
 
     return column_names, data_table
+
+
+def records_to_pandas(records, index=None, sep='.'):
+    dataframe = pd.json_normalize(records, sep=sep)
+    if index and len(dataframe.index) > 0:
+        dataframe = dataframe.set_index(index)
+    return dataframe
+
+
+def localize_pandas(dataframe, tz=None, sep='.', ambiguous='infer', nonexistent='shift_forward'):
+    """
+    Convert every date or time column (and index level) of `dataframe` into a timezone aware `datetime64` column using
+    one vectorised `tz_localize` (naive values) or `tz_convert` (timezone aware values) per column.
+
+    _parameters_
+    * _tz_ (str) default: None - the timezone, if None naive values are left as naive `datetime64`.
+    * _ambiguous_ (str) default: `infer` - how DST-ambiguous local times are resolved, `infer` uses the order of the
+    values and falls back to `NaT` when the order does not resolve them; `NaT` and `raise` are also accepted.
+    * _nonexistent_ (str) default: `shift_forward` - how local times skipped by a DST transition are handled.
+    """
+    index_names = [name for name in dataframe.index.names if name is not None and is_datetime_column(name, sep)]
+    if index_names:
+        names = list(dataframe.index.names)
+        dataframe = localize_pandas(dataframe.reset_index(), tz=tz, sep=sep, ambiguous=ambiguous,
+                                    nonexistent=nonexistent)
+        return dataframe.set_index(names)
+
+    for column in dataframe.columns:
+        if not is_datetime_column(column, sep):
+            continue
+        values = to_datetime64(dataframe[column])
+        if values is None:
+            continue
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert(tz) if tz else values
+        elif tz:
+            try:
+                values = values.dt.tz_localize(tz, ambiguous=ambiguous, nonexistent=nonexistent)
+            except ValueError as e:
+                if ambiguous != 'infer':
+                    raise
+                logger.warning('localize-pandas; {} unable to infer DST ambiguous times, setting them to NaT: {}'
+                               .format(column, e))
+                values = values.dt.tz_localize(tz, ambiguous='NaT', nonexistent=nonexistent)
+        dataframe[column] = values
+    return dataframe
+
+
+def is_datetime_column(name, sep='.'):
+    name = str(name).split(sep)[-1].lower()
+    return any(pattern in name for pattern in DICT_KEY_CONTAIN_CONVERT_DATETIME)
+
+
+def to_datetime64(values):
+    """
+    Returns the `values` series as `datetime64` or None if the values are not datetimes or date/datetime strings.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    present = values.dropna()
+    if present.empty:
+        return None
+    first = present.iloc[0]
+    if isinstance(first, datetime.datetime):
+        if first.tzinfo is not None:
+            zone = getattr(first.tzinfo, 'zone', None)
+            converted = pd.to_datetime(values, utc=True)
+            return converted.dt.tz_convert(zone) if zone else converted
+        return pd.to_datetime(values)
+    if not isinstance(first, str):
+        return None
+    for datetime_format in [FORMAT_DATETIME_STRING, FORMAT_DATE_STRING]:
+        converted = pd.to_datetime(values, format=datetime_format, errors='coerce')
+        if converted.notna().sum() == len(present.index):
+            return converted
+    return None
+
+
+def bulk_data_key(data):
+    """
+    Returns the key of the bulk-mode (multi-site) response in `data`, or None if `data` is not a bulk-mode response.
+    """
+    if type(data) is not dict or len(data) != 1:
+        return None
+    key = next(iter(data))
+    if key in BULK_DATA_KEYS and type(data[key]) is dict and BULK_DATA_KEYS[key][0] in data[key]:
+        return key
+    return None
+
+
+def bulk_to_pandas(data, sep='.'):
+    """
+    Returns a bulk-mode (multi-site) response as a long-format DataFrame with one row per site and timestamp; explicit
+    `site_id` and `timestamp` columns are followed by one column per metric, eg `energy` for `/sites/{ids}/energy` or
+    `lifeTimeData.energy`, `currentPower.power`... for `/sites/{ids}/overview`.  Value series are concatenated from the
+    per-site arrays in one pass rather than flattened into one wide row per list index.
+    """
+    key = bulk_data_key(data)
+    if key is None:
+        raise ValueError('Unable to normalise data, expected a decoded bulk-mode response')
+    list_key, item_key, metric, timestamp_key = BULK_DATA_KEYS[key]
+    items = data[key].get(list_key) or []
+
+    if metric is not None:
+        site_ids, timestamps, values = [], [], []
+        for item in items:
+            series = (item.get(item_key) or {}).get('values') or []
+            site_ids.append(np.full(len(series), item.get('siteId'), dtype=object))
+            timestamps.append(np.fromiter((value.get('date') for value in series), dtype=object, count=len(series)))
+            values.append(np.fromiter((value.get('value') for value in series), dtype=object, count=len(series)))
+        columns = collections.OrderedDict([
+            ('site_id', np.concatenate(site_ids) if site_ids else np.array([], dtype=object)),
+            ('timestamp', np.concatenate(timestamps) if timestamps else np.array([], dtype=object)),
+            (metric, np.concatenate(values) if values else np.array([], dtype=object)),
+        ])
+    else:
+        rows = [flatten_data(item.get(item_key) or {}, sep=sep) for item in items]
+        names = []
+        for row in rows:
+            names.extend([name for name in row if name not in names and name != timestamp_key])
+        columns = collections.OrderedDict([
+            ('site_id', np.array([item.get('siteId') for item in items], dtype=object)),
+            ('timestamp', np.array([row.get(timestamp_key) for row in rows], dtype=object)),
+        ])
+        for name in names:
+            columns[name] = np.array([row.get(name) for row in rows], dtype=object)
+
+    dataframe = pd.DataFrame(columns).infer_objects()
+    timestamps = to_datetime64(dataframe['timestamp'])
+    if timestamps is not None:
+        dataframe['timestamp'] = timestamps
+    elif dataframe['timestamp'].isna().all():
+        dataframe['timestamp'] = pd.to_datetime(dataframe['timestamp'])
+    return dataframe
@@ -0,0 +1,54 @@
+import logging
+
+from solaredge_interface.utils.json import json_decode
+
+
+logger = logging.getLogger(__name__)
+
+
+def postprocess(body, datetime_response=False, tz=None, pandas_response=False, pandas_column_trim=None,
+                pandas_datetime64=False, pandas_bulk_long=False):
+    """
+    Decode a response `body` and apply the datetime, timezone and pandas post-processing of `SolarEdgeAPI`; runs in a
+    worker process and returns only the `.pandas` DataFrame in the compact columnar form of `dataframe_to_columns()`,
+    or None.  The decoded data is not returned so that only the columns are pickled back; `SolarEdgeAPI` decodes
+    `.data` in-process when it is first accessed.
+    """
+    data = json_decode(body)
+    columns = None
+    if data and pandas_response:
+        if datetime_response:
+            from solaredge_interface.utils.timedates import data_to_datetime
+            data = data_to_datetime(data=data)
+        if tz and not pandas_datetime64:
+            from solaredge_interface.utils.timedates import set_datetime_tzinfo
+            data = set_datetime_tzinfo(data=data, tz=tz)
+        from solaredge_interface.utils.pandas import data_to_pandas, bulk_data_key, bulk_to_pandas, localize_pandas
+        if pandas_bulk_long and bulk_data_key(data):
+            dataframe = bulk_to_pandas(data)
+        else:
+            dataframe = data_to_pandas(data=data, prefix_to_remove=pandas_column_trim)
+        if pandas_datetime64:
+            dataframe = localize_pandas(dataframe, tz=tz)
+        columns = dataframe_to_columns(dataframe)
+    return columns
+
+
+def dataframe_to_columns(dataframe):
+    """
+    Returns `dataframe` as `(index, column_names, arrays)`; each column is a typed array (eg int64 values with one
+    timezone for `datetime64` columns) which pickles far smaller and faster than a DataFrame of Python objects.
+    """
+    return dataframe.index, list(dataframe.columns), [dataframe.iloc[:, i].array for i in range(dataframe.shape[1])]
+
+
+def columns_to_dataframe(columns):
+    """
+    Rebuild the DataFrame returned by `dataframe_to_columns()`.
+    """
+    import pandas as pd
+
+    index, column_names, arrays = columns
+    dataframe = pd.DataFrame({i: array for i, array in enumerate(arrays)}, index=index)
+    dataframe.columns = column_names
+    return dataframe
@@ -0,0 +1,128 @@
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+
+from solaredge_interface.utils.timedates import FORMAT_DATETIME_STRING
+
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FREQUENCIES = {
+    'QUARTER_OF_AN_HOUR': '15min',
+    'HOUR': 'h',
+    'DAY': 'D',
+    'WEEK': 'W-MON',
+    'MONTH': 'MS',
+    'YEAR': 'YS',
+}
+ROLLUP_TIME_UNITS_DEFAULT = ['QUARTER_OF_AN_HOUR', 'HOUR', 'DAY', 'MONTH']
+QUARTER_OF_AN_HOUR_HOURS = 0.25
+VIRTUAL_METERS = ['SelfConsumption', 'FeedIn', 'Purchased']
+
+
+def values_to_series(values, tz=None, name=None):
+    """
+    Returns the SolarEdge `[{'date': ..., 'value': ...}]` list as a float `pd.Series` with a timezone aware index;
+    `date` strings are localized to `tz` with DST-ambiguous local times resolved from their order.
+    """
+    dates = [item.get('date') for item in values]
+    series = pd.Series([item.get('value') for item in values], dtype='float64', name=name)
+    if dates and isinstance(dates[0], datetime.datetime) and dates[0].tzinfo is not None:
+        zone = tz or getattr(dates[0].tzinfo, 'zone', None) or dates[0].tzinfo
+        series.index = pd.DatetimeIndex(pd.to_datetime(dates, utc=True)).tz_convert(zone)
+        return series
+    index = pd.DatetimeIndex(pd.to_datetime([str(date) for date in dates], format=FORMAT_DATETIME_STRING))
+    if tz is not None:
+        try:
+            index = index.tz_localize(tz, ambiguous='infer', nonexistent='shift_forward')
+        except (ValueError, TypeError) as e:
+            logger.warning('rollup; unable to infer DST ambiguous times, dropping them: {}'.format(e))
+            index = index.tz_localize(tz, ambiguous='NaT', nonexistent='shift_forward')
+    series.index = index
+    return series[series.index.notna()]
+
+
+def data_to_frame(data, tz=None):
+    """
+    Returns `(frame, kind)` from the decoded data (or a response with `.data`) of `get_site_power`,
+    `get_site_power_details`, `get_site_energy` or `get_site_energy_details`, where `frame` has one column per meter
+    and `kind` is `power` (W) or `energy` (Wh).
+    """
+    data = getattr(data, 'data', data)
+    if type(data) is not dict:
+        raise ValueError('Unable to rollup data, expected a decoded power or energy response')
+    for key, kind in [('power', 'power'), ('energy', 'energy')]:
+        if key in data:
+            series = values_to_series(data[key].get('values') or [], tz=tz, name='Production')
+            return series.to_frame(), kind
+    for key, kind in [('powerDetails', 'power'), ('energyDetails', 'energy')]:
+        if key in data:
+            columns = [
+                values_to_series(meter.get('values') or [], tz=tz, name=meter.get('type'))
+                for meter in data[key].get('meters') or []
+            ]
+            frame = pd.concat(columns, axis=1) if columns else pd.DataFrame()
+            return frame.sort_index(), kind
+    raise ValueError('Unable to rollup data, no power, powerDetails, energy or energyDetails values found')
+
+
+def power_to_energy(frame, hours=QUARTER_OF_AN_HOUR_HOURS):
+    """
+    Integrate quarter-hour power (W) into the energy (Wh) of each quarter-hour period.
+    """
+    return frame * hours
+
+
+def add_virtual_meters(frame):
+    """
+    Add the SelfConsumption, FeedIn and Purchased virtual meters (when absent) computed from the Production and
+    Consumption meters of each period; must be applied to the finest resolution before any rollup.
+    """
+    if 'Production' not in frame.columns or 'Consumption' not in frame.columns:
+        return frame
+    frame = frame.copy()
+    production, consumption = frame['Production'], frame['Consumption']
+    virtual = {
+        'SelfConsumption': np.minimum(production, consumption),
+        'FeedIn': (production - consumption).clip(lower=0),
+        'Purchased': (consumption - production).clip(lower=0),
+    }
+    for meter in VIRTUAL_METERS:
+        if meter not in frame.columns:
+            frame[meter] = virtual[meter]
+    return frame
+
+
+def rollup_frame(frame, time_unit):
+    """
+    Sum the quarter-hour energy `frame` into `time_unit` periods labelled by their local start time; day and coarser
+    boundaries follow the index timezone so DST days have 23 or 25 hours.  Periods without any values are NaN.
+    """
+    if time_unit not in ROLLUP_FREQUENCIES:
+        raise ValueError('Unknown time_unit: {}'.format(time_unit))
+    if frame.empty:
+        return frame
+    return frame.resample(ROLLUP_FREQUENCIES[time_unit], label='left', closed='left').sum(min_count=1)
+
+
+def rollup(data, time_units=None, tz=None, virtual_meters=True):
+    """
+    Derive the energy (Wh) of each meter in every one of `time_units` from a single QUARTER_OF_AN_HOUR power or
+    energy response, returning `{time_unit: DataFrame}`.  The data may come from a fresh response or a cached one.
+
+    _parameters_
+    * _data_ (dict|Response) required - the decoded data (or response) of `get_site_power`, `get_site_power_details`,
+    or `get_site_energy`/`get_site_energy_details` with time_unit QUARTER_OF_AN_HOUR.
+    * _time_units_ (list) default: QUARTER_OF_AN_HOUR, HOUR, DAY, MONTH - the time units to derive.
+    * _tz_ (str) default: None - the site timezone used to localize date strings, not needed when the dates are
+    already timezone aware datetimes.
+    * _virtual_meters_ (bool) default: True - add SelfConsumption, FeedIn and Purchased when Production and
+    Consumption are available.
+    """
+    frame, kind = data_to_frame(data, tz=tz)
+    if kind == 'power':
+        frame = power_to_energy(frame)
+    if virtual_meters:
+        frame = add_virtual_meters(frame)
+    return {time_unit: rollup_frame(frame, time_unit) for time_unit in time_units or ROLLUP_TIME_UNITS_DEFAULT}
@@ -0,0 +1,147 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import logging
+import numpy as np
+
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+SERIES_FILE_MAGIC = b'SETS'
+SERIES_FILE_VERSION = 1
+SERIES_FILE_HEADER = struct.Struct('<4sBBHI')  # magic, version, flags, reserved, metadata length
+SERIES_FILE_COMPRESSED = 0x01
+SERIES_FILE_ALIGN = 8
+SERIES_FILE_COMPRESS_LEVEL = 1  # the XOR encoded values are mostly zero bytes, a fast level compresses them well
+
+
+class SeriesFileException(SolarEdgeInterfaceException):
+    pass
+
+
+def encode_timestamps(timestamps):
+    """
+    Returns `(step, runs)` for the `datetime64[s]` `timestamps` where `step` is the most common interval in seconds
+    and `runs` is an int64 array of `(start, count)` rows; a regular 15 minute series is one run and every gap, DST
+    repeat or off-cadence timestamp starts another run.
+    """
+    seconds = timestamps.astype('datetime64[s]').astype('<i8')
+    if len(seconds) == 0:
+        return 0, np.zeros((0, 2), dtype='<i8')
+    deltas = np.diff(seconds)
+    step = 0
+    if len(deltas):
+        steps, counts = np.unique(deltas, return_counts=True)
+        step = int(steps[np.argmax(counts)])
+    starts = np.concatenate([[0], np.flatnonzero(deltas != step) + 1])
+    counts = np.diff(np.concatenate([starts, [len(seconds)]]))
+    return step, np.stack([seconds[starts], counts], axis=1).astype('<i8')
+
+
+def decode_timestamps(step, runs):
+    """
+    Returns the `datetime64[s]` timestamps of `encode_timestamps()` output.
+    """
+    if len(runs) == 0:
+        return np.zeros(0, dtype='datetime64[s]')
+    starts, counts = runs[:, 0], runs[:, 1]
+    offsets = np.arange(int(counts.sum()), dtype='<i8') - np.repeat(np.cumsum(counts) - counts, counts)
+    return (np.repeat(starts, counts) + offsets * step).astype('datetime64[s]')
+
+
+def xor_encode(values):
+    """
+    Returns the float64 `values` (None or NaN for missing values) as uint64 bits XOR-ed with the previous value, so
+    a repeated or slowly changing value encodes as mostly zero bytes.
+    """
+    bits = np.ascontiguousarray(np.asarray(values, dtype='<f8')).view('<u8')
+    return np.bitwise_xor(bits, np.concatenate([np.zeros(1, dtype='<u8'), bits[:-1]]))
+
+
+def xor_decode(xored):
+    """
+    Returns the float64 values of `xor_encode()` output.
+    """
+    return np.bitwise_xor.accumulate(xored).view('<f8')
+
+
+def write_series(filename, series, metadata=None, compress=False):
+    """
+    Write time-series to `filename` in the compact series file format; timestamps are stored as runs of start plus
+    step and values are XOR encoded (and zlib compressed when `compress`).  The file is written to a temporary file
+    and renamed so readers never see a partial file.
+
+    _parameters_
+    * _filename_ (str) required - the file written.
+    * _series_ (dict) required - `{name: (timestamps, values)}` where timestamps are `datetime64` values or
+    `YYYY-MM-DD hh:mm:ss` strings and values are numbers or None.
+    * _metadata_ (dict) default: None - JSON serialisable metadata stored with the series.
+    * _compress_ (bool) default: False - zlib compress the values; uncompressed values are decoded straight from the
+    memory-mapped file, compressed values are first decompressed into a copy.
+    """
+    descriptors, blocks = [], []
+    for name, (timestamps, values) in series.items():
+        timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        if len(timestamps) != len(values):
+            raise SeriesFileException('Series {} has {} timestamps and {} values'.format(
+                name, len(timestamps), len(values)))
+        step, runs = encode_timestamps(timestamps)
+        xored = xor_encode(values).tobytes()
+        if compress:
+            xored = zlib.compress(xored, SERIES_FILE_COMPRESS_LEVEL)
+        descriptors.append({'name': name, 'count': len(timestamps), 'step': step, 'runs': len(runs),
+                            'values_bytes': len(xored)})
+        blocks.extend([runs.tobytes(), xored])
+
+    header_metadata = json.dumps({'series': descriptors, 'metadata': metadata or {}}).encode('utf-8')
+    flags = SERIES_FILE_COMPRESSED if compress else 0
+    temp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(temp_filename, 'wb') as f:
+        f.write(SERIES_FILE_HEADER.pack(SERIES_FILE_MAGIC, SERIES_FILE_VERSION, flags, 0, len(header_metadata)))
+        f.write(header_metadata)
+        for block in blocks:
+            f.write(b'\0' * (-f.tell() % SERIES_FILE_ALIGN))
+            f.write(block)
+    os.replace(temp_filename, filename)
+
+
+def read_series(filename):
+    """
+    Read a series file written by `write_series()` returning `(metadata, {name: (timestamps, values)})` with
+    `datetime64[s]` timestamps and float64 values, NaN where a value was missing.  The file is memory-mapped; the
+    timestamp runs (and uncompressed values) are decoded straight from the mapping.
+    """
+    with open(filename, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SeriesFileException('Empty series file', filename)
+    if len(mapped) < SERIES_FILE_HEADER.size:
+        raise SeriesFileException('Truncated series file', filename)
+    magic, version, flags, _, metadata_length = SERIES_FILE_HEADER.unpack_from(mapped, 0)
+    if magic != SERIES_FILE_MAGIC or version != SERIES_FILE_VERSION:
+        raise SeriesFileException('Not a version {} series file'.format(SERIES_FILE_VERSION), filename)
+    offset = SERIES_FILE_HEADER.size
+    header_metadata = json.loads(bytes(mapped[offset:offset + metadata_length]).decode('utf-8'))
+    offset += metadata_length
+
+    series = {}
+    for descriptor in header_metadata['series']:
+        offset += -offset % SERIES_FILE_ALIGN
+        runs = np.frombuffer(mapped, dtype='<i8', count=2 * descriptor['runs'], offset=offset).reshape(-1, 2)
+        offset += runs.nbytes
+        offset += -offset % SERIES_FILE_ALIGN
+        block = memoryview(mapped)[offset:offset + descriptor['values_bytes']]
+        offset += descriptor['values_bytes']
+        if flags & SERIES_FILE_COMPRESSED:
+            xored = np.frombuffer(zlib.decompress(block), dtype='<u8')
+        else:
+            xored = np.frombuffer(block, dtype='<u8')
+        if len(xored) != descriptor['count']:
+            raise SeriesFileException('Corrupt series {}'.format(descriptor['name']), filename)
+        series[descriptor['name']] = (decode_timestamps(descriptor['step'], runs), xor_decode(xored))
+        del block
+    return header_metadata['metadata'], series
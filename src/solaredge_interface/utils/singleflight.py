@@ -0,0 +1,58 @@
+
+import copy
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCall(object):
+    __slots__ = ['event', 'result', 'error']
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls; while a call for `key` is in flight every other caller asking for the same
+    `key` waits for, and shares, its result (or exception) instead of making the call again.  Every caller receives
+    its own shallow copy of the result so that one caller setting attributes (eg a response `.text`) does not change
+    the result of another.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Returns `(result, shared)` from calling `func(*args, **kwargs)` or from the in-flight call for `key`, where
+        `shared` is True when the result came from a call made by another caller.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = SingleFlightCall()
+
+        if not leader:
+            logger.debug('single-flight; waiting on in-flight call key={}'.format(key))
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result), True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return copy.copy(call.result), False
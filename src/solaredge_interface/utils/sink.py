@@ -0,0 +1,209 @@
+import os
+import abc
+import csv
+import sys
+import json
+import logging
+
+from solaredge_interface.utils.json import JSONEncoderDateTime
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+SINK_MEMORY_LIMIT = 32 * 1024 * 1024  # bytes of rows buffered before they are written out
+SINK_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+SINK_SIZE_SAMPLE = 64  # values sampled per column to estimate the buffered bytes
+
+
+class SinkException(SolarEdgeInterfaceException):
+    pass
+
+
+class Sink(abc.ABC):
+    """
+    A file that rows are streamed to as they become available.  Rows are written as columns, `{name: [values]}`, and
+    are buffered until their estimated size reaches `memory_limit`, then written to the file and released; a
+    `memory_limit` of 0 writes every batch of rows straight away.  Every batch must have the same column names.
+    """
+
+    filename = None
+    memory_limit = None
+    names = None
+    rows = None
+
+    def __init__(self, filename, memory_limit=SINK_MEMORY_LIMIT):
+        """
+        _parameters_
+        * _filename_ (str) required - the file written to, it is replaced if it exists.
+        * _memory_limit_ (int) default: 32MB - bytes of rows buffered in memory before they are written.
+        """
+        self.filename = filename
+        self.memory_limit = memory_limit
+        self.names = None
+        self.rows = 0
+        self.buffer = None
+        self.buffer_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, columns):
+        """
+        Add the rows in `columns`, a dict of equal length value lists, flushing the buffer once it reaches
+        `memory_limit`.
+        """
+        names = list(columns.keys())
+        if self.names is None:
+            self.names = names
+        elif names != self.names:
+            raise SinkException('Sink column names changed from {} to {}'.format(self.names, names))
+        if self.buffer is None:
+            self.buffer = {name: [] for name in names}
+        for name in names:
+            self.buffer[name].extend(columns[name])
+        self.buffer_bytes += estimate_bytes(columns)
+        if self.buffer_bytes >= self.memory_limit:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows to the file and release them.
+        """
+        if not self.buffer or not self.buffer[self.names[0]]:
+            return
+        count = len(self.buffer[self.names[0]])
+        logger.debug('sink; writing {} rows ({} bytes) to {}'.format(count, self.buffer_bytes, self.filename))
+        self.write_columns(self.buffer)
+        self.rows += count
+        self.buffer = None
+        self.buffer_bytes = 0
+
+    def close(self):
+        self.flush()
+
+    @abc.abstractmethod
+    def write_columns(self, columns):
+        """
+        Write `columns` to the file; implemented by each sink format.
+        """
+
+
+class CsvSink(Sink):
+    """
+    Streams rows to a CSV file with a header row.
+    """
+
+    def __init__(self, filename, memory_limit=SINK_MEMORY_LIMIT):
+        super().__init__(filename, memory_limit=memory_limit)
+        self.file = None
+
+    def write_columns(self, columns):
+        if self.file is None:
+            self.file = open(self.filename, 'w', newline='')
+            csv.writer(self.file).writerow(self.names)
+        csv.writer(self.file).writerows(zip(*[columns[name] for name in self.names]))
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class NdjsonSink(Sink):
+    """
+    Streams rows to a file with one JSON object per line.
+    """
+
+    def __init__(self, filename, memory_limit=SINK_MEMORY_LIMIT):
+        super().__init__(filename, memory_limit=memory_limit)
+        self.file = None
+
+    def write_columns(self, columns):
+        if self.file is None:
+            self.file = open(self.filename, 'w')
+        for row in zip(*[columns[name] for name in self.names]):
+            self.file.write(json.dumps(dict(zip(self.names, row)), cls=JSONEncoderDateTime))
+            self.file.write('\n')
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ParquetSink(Sink):
+    """
+    Streams rows to a Parquet file, each flush of the buffer is written as one row group.  Requires the optional
+    pyarrow package.
+    """
+
+    def __init__(self, filename, memory_limit=SINK_MEMORY_LIMIT):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SinkException('Parquet export requires the pyarrow package, install with: pip install pyarrow')
+        super().__init__(filename, memory_limit=memory_limit)
+        self.writer = None
+
+    def write_columns(self, columns):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: columns[name] for name in self.names})
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.filename, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        super().close()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+SINK_CLASSES = {
+    'csv': CsvSink,
+    'ndjson': NdjsonSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(filename, sink_format=None, memory_limit=SINK_MEMORY_LIMIT):
+    """
+    Returns a `Sink` writing to `filename` in `sink_format` (csv, ndjson or parquet); if None the format is taken
+    from the filename extension.
+    """
+    if sink_format is None:
+        sink_format = SINK_FORMATS.get(os.path.splitext(filename)[1].lower())
+        if sink_format is None:
+            raise SinkException('Unable to determine the sink format from the filename, use .csv, .ndjson or .parquet',
+                                filename)
+    sink_format = str(sink_format).lower()
+    if sink_format not in SINK_CLASSES:
+        raise SinkException('Unknown sink format requested: {}'.format(sink_format))
+    return SINK_CLASSES[sink_format](filename, memory_limit=memory_limit)
+
+
+def estimate_bytes(columns):
+    """
+    Returns the approximate in-memory size of `columns`, sampling the first values of each column.
+    """
+    size = 0
+    for values in columns.values():
+        sample = values[:SINK_SIZE_SAMPLE]
+        if sample:
+            size += int(len(values) * (sum([sys.getsizeof(value) for value in sample]) / len(sample) + 8))
+    return size
@@ -1,6 +1,4 @@
 
-from pytz import timezone
-from dateutil import parser
 from datetime import datetime, timedelta
 
 FORMAT_DATE_STRING = '%Y-%m-%d'
@@ -10,6 +8,7 @@ DICT_KEY_CONTAIN_CONVERT_DATETIME = ['date', 'time']  # keys containing these st
 
 
 def datestring_current(tz=None, datetime_format=FORMAT_DATE_STRING):
+    from pytz import timezone
     if tz:
         dt = datetime.now(tz=timezone(tz))
     else:
@@ -18,12 +17,14 @@ def datestring_current(tz=None, datetime_format=FORMAT_DATE_STRING):
 
 
 def datestring_days_delta(datestring, delta, datetime_format=FORMAT_DATE_STRING):
+    from dateutil import parser
     dt = parser.parse(datestring)
     dt_delta = dt + timedelta(days=delta)
     return dt_delta.strftime(datetime_format)
 
 
 def timestring_current(tz=None, datetime_format=FORMAT_DATETIME_STRING):
+    from pytz import timezone
     if tz:
         dt = datetime.now(tz=timezone(tz))
     else:
@@ -32,6 +33,7 @@ def timestring_current(tz=None, datetime_format=FORMAT_DATETIME_STRING):
 
 
 def timestring_seconds_delta(timestring, delta, datetime_format=FORMAT_DATETIME_STRING):
+    from dateutil import parser
     dt = parser.parse(timestring)
     dt_delta = dt + timedelta(seconds=delta)
     return dt_delta.strftime(datetime_format)
@@ -43,6 +45,13 @@ def datetime_to_string(dt, datetime_format=FORMAT_DATETIME_STRING):
 
 
 def string_to_datetime(string, tz=None):
+    global parser, timezone
+    try:
+        parser, timezone
+    except NameError:
+        # resolved once on first use, not per value, as this runs for every date string of a response
+        from pytz import timezone
+        from dateutil import parser
     try:
         dt = parser.parse(string)
     except (ValueError, TypeError):
@@ -69,12 +78,56 @@ def data_to_datetime(data, tz=None):
 
 
 def set_datetime_tzinfo(data, tz=None):
+    if not tz:
+        return data
+    from pytz import timezone
+    return localize_datetimes(data, timezone(tz))
+
+
+def localize_datetimes(data, zone):
+    """
+    Localize every naive datetime in the nested `data` to the pytz `zone`.
+    """
     if type(data) is list:
         for index, item in enumerate(data):
-            data[index] = set_datetime_tzinfo(item, tz)
+            data[index] = localize_datetimes(item, zone)
     elif type(data) is dict:
         for key in data.keys():
-            data[key] = set_datetime_tzinfo(data[key], tz)
-    elif type(data) is datetime and data.tzinfo is None and tz:
-        data = timezone(tz).localize(data)
+            data[key] = localize_datetimes(data[key], zone)
+    elif type(data) is datetime and data.tzinfo is None:
+        data = zone.localize(data)
     return data
+
+
+def period_start(dt, time_unit):
+    """
+    Returns the start of the `time_unit` period that contains `dt`.
+    """
+    if time_unit == 'QUARTER_OF_AN_HOUR':
+        return dt.replace(minute=dt.minute - dt.minute % 15, second=0, microsecond=0)
+    if time_unit == 'HOUR':
+        return dt.replace(minute=0, second=0, microsecond=0)
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if time_unit == 'DAY':
+        return day
+    if time_unit == 'WEEK':
+        return day - timedelta(days=day.weekday())
+    if time_unit == 'MONTH':
+        return day.replace(day=1)
+    if time_unit == 'YEAR':
+        return day.replace(month=1, day=1)
+    raise ValueError('Unknown time_unit: {}'.format(time_unit))
+
+
+def time_windows(start, end, window=None):
+    """
+    Split the inclusive `start` to `end` datetime range into consecutive `(start, end)` windows of at most `window`
+    length, each ending one second before the next begins; a `window` of None returns the whole range.
+    """
+    if window is None:
+        return [(start, end)]
+    windows = []
+    while start <= end:
+        windows.append((start, min(start + window - timedelta(seconds=1), end)))
+        start = windows[-1][1] + timedelta(seconds=1)
+    return windows
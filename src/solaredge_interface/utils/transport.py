@@ -0,0 +1,227 @@
+import os
+import abc
+import json
+import base64
+import hashlib
+import logging
+import datetime
+
+from solaredge_interface.utils.http_request import http_session, response_text
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_POOL_SIZE = 10
+RECORD_REPLAY_MODES = ['record', 'replay', 'auto']
+RECORD_HEADERS = ['Content-Type']  # response headers kept in recordings
+
+
+class TransportException(SolarEdgeInterfaceException):
+    pass
+
+
+class TransportResponse(object):
+    """
+    The response returned by transports that do not return a `requests.Response`; it has the same attributes as used
+    by `http_request()`.
+    """
+
+    url = request = headers = cookies = status_code = encoding = elapsed = content = None
+
+    def __init__(self, **attrs):
+        for k in attrs:
+            setattr(self, k, attrs[k])
+
+    @property
+    def text(self):
+        return response_text(self.content, self.encoding) if self.content is not None else None
+
+
+class Transport(abc.ABC):
+    """
+    Base transport used by `http_request()` in place of a `requests.Session`.  A transport implements `get()`, which
+    returns a response with `url`, `status_code`, `headers`, `encoding`, `elapsed`, `content` and `text` attributes,
+    and raises `ConnectionError` or `TimeoutError` (or their `requests` equivalents) on network failures so that they
+    are retried.
+    """
+
+    @abc.abstractmethod
+    def get(self, url, params=None, headers=None, timeout=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Requests made with a pooled `requests.Session`, the default transport.
+    """
+
+    session = None
+
+    def __init__(self, session=None, pool_size=TRANSPORT_POOL_SIZE):
+        """
+        _parameters_
+        * _session_ (requests.Session) default: None - the session used, if None one with a pool of `pool_size`.
+        * _pool_size_ (int) default: `10` - connections kept alive per host.
+        """
+        self.session = session if session is not None else http_session(pool_size=pool_size)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class Http2Transport(Transport):
+    """
+    Requests made with an `httpx.Client` that multiplexes concurrent requests to the same host over one HTTP/2
+    connection rather than one connection per request in flight; falls back to HTTP/1.1 when the server does not
+    negotiate HTTP/2.  Requires the optional httpx package with HTTP/2 support: `pip install httpx[http2]`.
+    """
+
+    client = None
+
+    def __init__(self, max_connections=TRANSPORT_POOL_SIZE, http2=True):
+        """
+        _parameters_
+        * _max_connections_ (int) default: `10` - maximum connections held open.
+        * _http2_ (bool) default: True - negotiate HTTP/2, if False only HTTP/1.1 is used.
+        """
+        try:
+            import httpx
+            self.client = httpx.Client(http2=http2, limits=httpx.Limits(max_connections=max_connections))
+        except ImportError:
+            raise TransportException('The HTTP/2 transport requires the httpx package, install with: '
+                                     'pip install httpx[http2]')
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        import httpx
+
+        try:
+            r = self.client.get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        return TransportResponse(url=str(r.url), request=r.request, headers=r.headers, cookies=r.cookies,
+                                 status_code=r.status_code, encoding=r.encoding, elapsed=r.elapsed, content=r.content)
+
+    def close(self):
+        self.client.close()
+
+
+class RecordReplayTransport(Transport):
+    """
+    Serves responses saved in `directory`, one JSON file per request, for offline and deterministic runs of the whole
+    client.  Recordings are keyed by the url and params without the `api_key`, which is never saved.
+
+    * `record` mode makes every request with the wrapped `transport` and saves the response.
+    * `replay` mode serves saved responses only and raises `TransportException` for a request not recorded.
+    * `auto` mode serves saved responses and records those not yet saved.
+
+    Only successful (2xx) responses are saved unless `record_errors` is set, so that a transient 429 or 5xx is never
+    replayed in place of the real response.
+    """
+
+    directory = None
+    mode = None
+    transport = None
+    record_errors = None
+
+    def __init__(self, directory, mode='auto', transport=None, record_errors=False):
+        """
+        _parameters_
+        * _directory_ (str) required - directory holding the recordings, created if it does not exist.
+        * _mode_ (str) default: `auto` - record, replay or auto.
+        * _transport_ (Transport) default: None - transport used to record, if None a `RequestsTransport`.
+        * _record_errors_ (bool) default: False - if True also save responses with a non-2xx status code.
+        """
+        if mode not in RECORD_REPLAY_MODES:
+            raise TransportException('Unknown record-replay mode {}, use one of: {}'.format(
+                mode, ', '.join(RECORD_REPLAY_MODES)))
+        self.directory = directory
+        self.mode = mode
+        self.transport = transport
+        self.record_errors = record_errors
+        if mode != 'replay':
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def request_params(params):
+        return {k: str(v) for k, v in sorted((params or {}).items()) if k != 'api_key'}
+
+    def filename(self, url, params=None):
+        """
+        Returns the recording filename for a request.
+        """
+        key = json.dumps([url.split('?')[0], self.request_params(params)])
+        return os.path.join(self.directory, '{}.json'.format(hashlib.sha1(key.encode('utf-8')).hexdigest()))
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        filename = self.filename(url, params)
+        if self.mode != 'record' and os.path.isfile(filename):
+            logger.debug('record-replay; replaying {}'.format(filename))
+            return self.load(filename)
+        if self.mode == 'replay':
+            raise TransportException('No recorded response for request {}'.format(url), filename)
+        if self.transport is None:
+            self.transport = RequestsTransport()
+        response = self.transport.get(url, params=params, headers=headers, timeout=timeout)
+        if self.record_errors or 200 <= response.status_code < 300:
+            self.save(filename, url, params, response)
+        else:
+            logger.debug('record-replay; not recording status_code={} response {}'.format(response.status_code, url))
+        return response
+
+    def save(self, filename, url, params, response):
+        recording = {
+            'url': url.split('?')[0],
+            'params': self.request_params(params),
+            'status_code': response.status_code,
+            'encoding': response.encoding,
+            'headers': {k: response.headers[k] for k in RECORD_HEADERS if response.headers and k in response.headers},
+        }
+        try:
+            recording['text'] = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            recording['content_base64'] = base64.b64encode(response.content).decode('ascii')
+        logger.debug('record-replay; recording {}'.format(filename))
+        temp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(temp_filename, 'w') as f:
+            json.dump(recording, f, indent=2)
+        os.replace(temp_filename, filename)
+
+    @staticmethod
+    def load(filename):
+        with open(filename, 'r') as f:
+            recording = json.load(f)
+        if 'text' in recording:
+            content = recording['text'].encode('utf-8')
+        else:
+            content = base64.b64decode(recording['content_base64'])
+        return TransportResponse(url=recording['url'], headers=recording.get('headers') or {},
+                                 status_code=recording['status_code'], encoding=recording.get('encoding'),
+                                 elapsed=datetime.timedelta(0), content=content)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+def transport_from_string(value):
+    """
+    Returns the transport named by `value`: `requests`, `http2`, or `record:DIR`, `replay:DIR` and `auto:DIR` for a
+    `RecordReplayTransport` on directory DIR.
+    """
+    name, _, directory = str(value).partition(':')
+    if name == 'requests':
+        return RequestsTransport()
+    if name == 'http2':
+        return Http2Transport()
+    if name in RECORD_REPLAY_MODES and directory:
+        return RecordReplayTransport(directory, mode=name)
+    raise TransportException('Unknown transport {}, use requests, http2, record:DIR, replay:DIR or auto:DIR'
+                             .format(value))
@@ -24,8 +24,8 @@ def url_join(*parts):
 def url_join_site_ids(data):
 
     if type(data) is list:
-        return url_join('sites', ','.join(data).replace(' ',''))
+        return url_join('sites', ','.join([str(item) for item in data]).replace(' ',''))
     elif ',' in str(data):
-        return url_join('sites', data.replace(' ',''))
+        return url_join('sites', str(data).replace(' ',''))
     else:
-        return url_join('site', data.replace(' ',''))
+        return url_join('site', str(data).replace(' ',''))
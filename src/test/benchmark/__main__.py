@@ -0,0 +1,48 @@
+"""
+Offline benchmark suite for the SolarEdgeAPI response hot paths, run from the `src` directory -
+
+    $ python -m test.benchmark                      # all scenarios, compare against baseline.json
+    $ python -m test.benchmark --small              # only the small scenarios
+    $ python -m test.benchmark --save-baseline      # record the results as the new baseline
+
+Exits with status 1 if any benchmark is slower than the baseline by more than the tolerance factor.
+"""
+
+import sys
+import argparse
+
+from test.benchmark.runner import SCENARIOS, SCENARIOS_SMALL, REGRESSION_TOLERANCE
+from test.benchmark.runner import run_benchmarks, load_baseline, save_baseline, compare_baseline, print_results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m test.benchmark')
+    parser.add_argument('scenarios', nargs='*', help='Scenarios to run (default: all) from: {}'.format(
+        ', '.join(SCENARIOS.keys())))
+    parser.add_argument('--small', action='store_true', help='Run only the small scenarios')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark, the median is reported')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help='Slowdown factor against the baseline that counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Save results as the new baseline')
+    args = parser.parse_args()
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error('unknown scenario: {}'.format(scenario))
+
+    scenarios = args.scenarios or (SCENARIOS_SMALL if args.small else list(SCENARIOS.keys()))
+    results = run_benchmarks(scenarios=scenarios, repeat=args.repeat)
+    baseline = load_baseline()
+    print_results(results, baseline=baseline)
+
+    if args.save_baseline:
+        save_baseline(results)
+        return 0
+
+    regressions = compare_baseline(results, baseline or {}, tolerance=args.tolerance)
+    for scenario, name, reference, seconds in regressions:
+        print('REGRESSION: {} {} {:.4f}s -> {:.4f}s'.format(scenario, name, reference, seconds), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+
+import os
+import json
+import copy
+import datetime
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+FIXTURE_DATE = datetime.datetime(2020, 12, 6)
+FIXTURE_SITE_ID = 1234567
+QUARTERS_PER_DAY = 96
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_PATH, '{}.json'.format(name)), 'r') as f:
+        return json.load(f)
+
+
+def site_ids(sites):
+    return [str(FIXTURE_SITE_ID + index) for index in range(sites)]
+
+
+def scale_values(values, days, factor=1.0):
+    """
+    Repeat a recorded single day of quarter-hour `values` across `days` days, shifting the date of each copy and
+    scaling each value by `factor` so that every site in a scaled fixture carries its own numbers.
+    """
+    scaled = []
+    for day in range(days):
+        for item in values:
+            timestamp = datetime.datetime.strptime(item['date'], '%Y-%m-%d %H:%M:%S') + datetime.timedelta(days=day)
+            value = item['value']
+            scaled.append({
+                'date': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'value': round(value * factor, 5) if value is not None else None
+            })
+    return scaled
+
+
+def site_energy(sites=1, days=1):
+    """
+    Returns the data of a `get_site_energy` QUARTER_OF_AN_HOUR response for `sites` sites over `days` days; a single
+    site yields the single-site structure and multiple sites yield the "bulk-mode" structure.
+    """
+    recorded = load_fixture('site_energy_quarter_of_an_hour')['energy']
+    if sites == 1:
+        data = copy.deepcopy(recorded)
+        data['values'] = scale_values(recorded['values'], days)
+        return {'energy': data}
+    return {
+        'sitesEnergy': {
+            'timeUnit': recorded['timeUnit'],
+            'unit': recorded['unit'],
+            'count': sites,
+            'siteEnergyList': [
+                {
+                    'siteId': int(site_id),
+                    'energyValues': {
+                        'measuredBy': recorded['measuredBy'],
+                        'values': scale_values(recorded['values'], days, factor=1.0 + (index % 10) / 10)
+                    }
+                } for index, site_id in enumerate(site_ids(sites))
+            ]
+        }
+    }
+
+
+def site_power(days=1):
+    """
+    Returns the data of a single site `get_site_power` response over `days` days.
+    """
+    recorded = load_fixture('site_power')['power']
+    data = copy.deepcopy(recorded)
+    data['values'] = scale_values(recorded['values'], days)
+    return {'power': data}
+
+
+def site_power_details(days=1):
+    """
+    Returns the data of a single site `get_site_power_details` response over `days` days for all five meters.
+    """
+    recorded = load_fixture('site_power_details')
+    data = copy.deepcopy(recorded)
+    for meter in data['powerDetails']['meters']:
+        meter['values'] = scale_values(meter['values'], days)
+    return data
+
+
+def site_overview(sites=1):
+    """
+    Returns the data of a `get_site_overview` response for `sites` sites.
+    """
+    recorded = load_fixture('site_overview')
+    if sites == 1:
+        return recorded
+    return {
+        'sitesOverviews': {
+            'count': sites,
+            'siteEnergyList': [
+                {'siteId': int(site_id), 'siteOverview': copy.deepcopy(recorded['overview'])}
+                for site_id in site_ids(sites)
+            ]
+        }
+    }
+
+
+def site_details():
+    return load_fixture('site_details')
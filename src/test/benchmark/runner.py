@@ -0,0 +1,180 @@
+
+import io
+import os
+import gc
+import sys
+import json
+import time
+import datetime
+import platform
+import statistics
+import contextlib
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.transport import Transport, TransportResponse
+from solaredge_interface.utils.output import output_json, output_csv, output_pandas
+from solaredge_interface.utils.pandas import flatten_data, tabelize_data
+from solaredge_interface.utils.timedates import data_to_datetime
+
+from test.benchmark import fixtures
+
+BASELINE_FILENAME = os.path.join(os.path.dirname(__file__), 'baseline.json')
+REGRESSION_TOLERANCE = 1.5
+
+# scenario name: (sites, days)
+SCENARIOS = {
+    '1site-1day': (1, 1),
+    '1site-1month': (1, 31),
+    '10sites-1day': (10, 1),
+    '100sites-1day': (100, 1),
+    '100sites-1month': (100, 31),
+}
+SCENARIOS_SMALL = ['1site-1day', '1site-1month', '10sites-1day']
+
+
+class OfflineSolarEdgeAPI(SolarEdgeAPI):
+    """
+    SolarEdgeAPI that resolves site timezones from the recorded fixtures so benchmarks never touch the network.
+    """
+
+    def get_site_timezone(self, site_id, tempfile_cache_use=True):
+        if ',' in str(site_id):
+            return None
+        return fixtures.site_details()['details']['location']['timeZone']
+
+
+class FixtureTransport(Transport):
+    """
+    Transport that answers every request with the same fixture body, so benchmarks run the public request path of
+    `SolarEdgeAPI` without a network.
+    """
+
+    def __init__(self, text):
+        self.content = text.encode('utf-8')
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return TransportResponse(url=url, headers={}, status_code=200, encoding='utf-8',
+                                 elapsed=datetime.timedelta(0), content=self.content)
+
+
+def measure(setup, func, repeat):
+    """
+    Returns the wall-clock seconds for each of `repeat` runs of `func(setup())`; setup is excluded from the timing.
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup()
+        gc.collect()
+        start = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def response_wrapper(text, method, *args):
+    """
+    Returns the `(setup, func)` of a benchmark calling the public `method` of an api whose transport serves `text`;
+    the request itself costs next to nothing so the time is that of decoding and post-processing the response.
+    """
+    api = OfflineSolarEdgeAPI(api_key='benchmark', datetime_response=True, pandas_response=True,
+                              transport=FixtureTransport(text))
+    return (lambda: args), (lambda arguments: getattr(api, method)(*arguments))
+
+
+def wrapped_response(text, method, *args):
+    setup, run = response_wrapper(text, method, *args)
+    return run(setup())
+
+
+def quiet(func):
+    def run(argument):
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(argument)
+    return run
+
+
+def scenario_benchmarks(sites, days):
+    """
+    Yields `(name, setup, func)` benchmark tuples covering the response wrapper, the data flattening, datetime
+    conversion and output formatting hot paths for the given scale.
+    """
+    site_id, single_site_id = ','.join(fixtures.site_ids(sites)), fixtures.site_ids(1)[0]
+    start = fixtures.FIXTURE_DATE
+    end = start + datetime.timedelta(days=days) - datetime.timedelta(seconds=1)
+    start_date, end_date = start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+    start_time, end_time = start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S')
+    energy_text = json.dumps(fixtures.site_energy(sites=sites, days=days))
+    power_text = json.dumps(fixtures.site_power(days=days))
+    power_details_text = json.dumps(fixtures.site_power_details(days=days))
+    overview_text = json.dumps(fixtures.site_overview(sites=sites))
+
+    yield ('response_wrapper.site_energy',) + response_wrapper(energy_text, 'get_site_energy', site_id, start_date,
+                                                                 end_date, 'QUARTER_OF_AN_HOUR')
+    yield ('response_wrapper.site_overview',) + response_wrapper(overview_text, 'get_site_overview', site_id)
+    yield ('response_wrapper.site_power',) + response_wrapper(power_text, 'get_site_power', single_site_id,
+                                                                start_time, end_time)
+    yield ('response_wrapper.site_power_details',) + response_wrapper(power_details_text, 'get_site_power_details',
+                                                                        single_site_id, start_time, end_time)
+
+    yield 'flatten_data', (lambda: json.loads(energy_text)), flatten_data
+    yield 'tabelize_data', (lambda: flatten_data(json.loads(energy_text))), tabelize_data
+    yield 'data_to_datetime', (lambda: json.loads(energy_text)), data_to_datetime
+
+    response = wrapped_response(energy_text, 'get_site_energy', site_id, start_date, end_date, 'QUARTER_OF_AN_HOUR')
+    yield 'output_json', (lambda: response.data), quiet(output_json)
+    yield 'output_csv', (lambda: response.pandas), quiet(output_csv)
+    yield 'output_pandas', (lambda: response.pandas), quiet(output_pandas)
+
+
+def run_benchmarks(scenarios=None, repeat=3):
+    """
+    Runs the benchmark suite for the named `scenarios` (default all) and returns `{scenario: {benchmark: seconds}}`
+    using the median of `repeat` runs.
+    """
+    results = {}
+    for scenario in scenarios or SCENARIOS.keys():
+        sites, days = SCENARIOS[scenario]
+        results[scenario] = {}
+        for name, setup, func in scenario_benchmarks(sites, days):
+            results[scenario][name] = statistics.median(measure(setup, func, repeat))
+    return results
+
+
+def load_baseline(filename=BASELINE_FILENAME):
+    if not os.path.isfile(filename):
+        return None
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(results, filename=BASELINE_FILENAME):
+    baseline = load_baseline(filename) or {'results': {}}
+    baseline['python'] = platform.python_version()
+    baseline['platform'] = platform.platform()
+    baseline['results'].update(results)
+    with open(filename, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare_baseline(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Returns a list of `(scenario, benchmark, baseline_seconds, seconds)` for results that are slower than the
+    baseline by more than `tolerance` times.
+    """
+    regressions = []
+    for scenario, benchmarks in results.items():
+        for name, seconds in benchmarks.items():
+            reference = baseline.get('results', {}).get(scenario, {}).get(name)
+            if reference and seconds > reference * tolerance:
+                regressions.append((scenario, name, reference, seconds))
+    return regressions
+
+
+def print_results(results, baseline=None, file=sys.stdout):
+    for scenario, benchmarks in results.items():
+        print('{}'.format(scenario), file=file)
+        for name, seconds in benchmarks.items():
+            reference = (baseline or {}).get('results', {}).get(scenario, {}).get(name)
+            ratio = ' ({:.2f}x baseline)'.format(seconds / reference) if reference else ''
+            print('  {:<40} {:>10.4f}s{}'.format(name, seconds, ratio), file=file)
@@ -0,0 +1,29 @@
+
+import pytest
+
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+
+MOCK_SERVER_DEFAULTS = {'sites': 1}
+
+
+def mock_server(request):
+    """
+    Build a SolarEdgeMockServer from the defaults overlaid with the options passed through indirect
+    parametrization, eg: @pytest.mark.parametrize('server', [{'sites': 3, 'latency': 0.1}], indirect=True)
+    """
+    return SolarEdgeMockServer(**dict(MOCK_SERVER_DEFAULTS, **getattr(request, 'param', {})))
+
+
+@pytest.fixture(scope='module')
+def server(request):
+    with mock_server(request) as mock:
+        yield mock
+
+
+@pytest.fixture
+def fresh_server(request):
+    """
+    Same as the server fixture but started per test, for tests that change server state or count requests
+    """
+    with mock_server(request) as mock:
+        yield mock
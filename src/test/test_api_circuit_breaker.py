@@ -0,0 +1,74 @@
+import time
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.transport import RecordReplayTransport, TransportException
+from solaredge_interface.utils.circuit_breaker import CircuitBreaker, CircuitBreakerException, CIRCUIT_OPEN, \
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN
+
+
+def test_circuit_breaker_states():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == CIRCUIT_CLOSED
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN and not breaker.allow()
+    assert 0 < breaker.retry_after() <= 0.05
+    time.sleep(0.06)
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED and breaker.allow()
+
+
+def test_circuit_breaker_stale_while_revalidate(fresh_server):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    api = SolarEdgeAPI(api_key='mock', baseurl=fresh_server.baseurl, circuit_breaker=breaker)
+    site_id = fresh_server.site_ids[0]
+
+    fresh = api.get_site_overview(site_id)
+    assert fresh.status_code == 200 and fresh.stale_age is None
+
+    fresh_server.error_rate = 1.0
+    for _ in range(2):
+        stale = api.get_site_overview(site_id)
+        assert stale.status_code == 200 and stale.stale_age >= 0
+        assert stale.data == fresh.data
+    assert breaker.state == CIRCUIT_OPEN
+    requests_made = api.metrics.counter('site_overview', 'requests')
+
+    started = time.monotonic()
+    stale = api.get_site_overview(site_id)
+    assert time.monotonic() - started < 0.1
+    assert stale.stale_age is not None
+    assert api.metrics.counter('site_overview', 'requests') == requests_made
+    assert api.metrics.counter('site_overview', 'circuit_open') == 1
+
+    with pytest.raises(CircuitBreakerException):
+        api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+
+    fresh_server.error_rate = 0.0
+    deadline = time.monotonic() + 5
+    while breaker.state != CIRCUIT_CLOSED and time.monotonic() < deadline:
+        # a revalidation may have failed before the error rate was reset, requests keep starting new ones
+        api.get_site_overview(site_id)
+        time.sleep(0.05)
+    assert breaker.state == CIRCUIT_CLOSED
+    assert api.get_site_overview(site_id).stale_age is None
+
+
+def test_circuit_breaker_probe_released_on_any_exception(tmp_path):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    transport = RecordReplayTransport(str(tmp_path), mode='replay')
+    api = SolarEdgeAPI(api_key='mock', baseurl='http://127.0.0.1:9', circuit_breaker=breaker, transport=transport)
+    breaker.record_failure()
+    time.sleep(0.06)
+    with pytest.raises(TransportException):
+        api.get_site_overview(1)  # the half-open probe, no recorded response
+    assert breaker.state == CIRCUIT_OPEN and breaker.retry_after() > 0
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == CIRCUIT_HALF_OPEN
@@ -0,0 +1,80 @@
+import csv
+import json
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.sink import open_sink, Sink, CsvSink, SinkException
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 2, 'max_concurrency': 3}], indirect=True)
+
+
+def test_sink_memory_limit(tmp_path):
+    filename = str(tmp_path / 'rows.csv')
+    with CsvSink(filename, memory_limit=1) as sink:
+        sink.write({'a': [1, 2], 'b': ['x', 'y']})
+        assert sink.rows == 2 and sink.buffer is None
+        sink.memory_limit = 1024 * 1024
+        sink.write({'a': [3], 'b': ['z']})
+        assert sink.rows == 2
+        with pytest.raises(SinkException):
+            sink.write({'b': ['z'], 'a': [4]})
+    assert sink.rows == 3
+    with open(filename) as f:
+        assert list(csv.reader(f)) == [['a', 'b'], ['1', 'x'], ['2', 'y'], ['3', 'z']]
+
+    with pytest.raises(SinkException):
+        open_sink(str(tmp_path / 'rows.txt'))
+    with pytest.raises(TypeError):
+        Sink(filename)  # write_columns is abstract
+
+
+@server_options
+def test_export_site_data_windows(server, tmp_path):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    filename = str(tmp_path / 'power.ndjson')
+    with open_sink(filename, memory_limit=0) as sink:
+        rows = api.export_site_data(sink, 'site_power_details', server.site_ids, '2020-11-01 00:00:00',
+                                    '2020-12-31 23:59:59', meters='Production,Consumption')
+        assert sink.rows == rows
+    assert rows == len(server.site_ids) * 2 * 61 * 96
+    assert api.metrics.counter('site_power_details', 'requests') == len(server.site_ids) * 3
+
+    with open(filename) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == rows
+    assert set(records[0].keys()) == {'site_id', 'meter', 'date', 'value'}
+    assert len({(r['site_id'], r['meter'], r['date']) for r in records}) == rows
+
+
+@server_options
+def test_export_site_data_dates(server, tmp_path):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    site_id = server.site_ids[0]
+    filename = str(tmp_path / 'energy.csv')
+    rows = api.export_site_data(filename, 'site_energy', site_id, '2019-01-01', '2020-12-31', time_unit='DAY')
+    assert rows == 731
+    with open(filename) as f:
+        lines = list(csv.reader(f))
+    assert lines[0] == ['site_id', 'date', 'value']
+    assert lines[1][0] == str(site_id)
+
+    with pytest.raises(Exception):
+        api.export_site_data(filename, 'site_overview', site_id, '2020-12-01', '2020-12-31')
+
+
+@server_options
+def test_export_cli(server, tmp_path):
+    filename = str(tmp_path / 'power.csv')
+    result = CliRunner().invoke(
+        click.solaredge_interface,
+        ['--baseurl', server.baseurl, 'export', 'site_power', filename, ','.join(map(str, server.site_ids)),
+         '--start_time', '2020-12-01 00:00:00', '--end_time', '2020-12-01 23:59:59', '--memory_limit', '0.01'],
+        env={'SOLAREDGE_API_KEY': 'mock'}
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['export']['rows'] == len(server.site_ids) * 96
+    with open(filename) as f:
+        assert len(f.readlines()) == 1 + len(server.site_ids) * 96
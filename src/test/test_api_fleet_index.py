@@ -0,0 +1,63 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.FleetIndex import FleetIndex
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+@server_options
+def test_fleet_index_refresh_and_lookup(server, tmp_path):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    filename = str(tmp_path / 'fleet.sqlite')
+    with FleetIndex(api, filename=filename) as index:
+        assert index.refresh() == server.site_ids
+        assert index.site_ids() == server.site_ids
+
+        site_id = server.site_ids[0]
+        site = index.site(site_id)
+        assert site['timezone'] == 'Australia/Sydney'
+        assert site['inverters'] and site['sensors'][0]['serial'] == 'SENSOR 1'
+        assert index.inverters(site_id) == server.sites[site_id].inverters
+
+        serial = server.sites[site_id].inverters[0]
+        assert [row['site_id'] for row in index.find_serial(serial)] == [site_id]
+        assert len(index.find_model('SE%K')) == sum(len(s.inverters) for s in server.sites.values())
+        assert index.site(1) is None
+
+        index.set_group('north', server.site_ids[:2])
+        assert index.group('north') == server.site_ids[:2]
+        assert index.groups() == ['north']
+
+    requests = api.metrics.counter('site_inventory', 'requests')
+    with FleetIndex(api, filename=filename) as index:
+        assert index.timezone(site_id) == 'Australia/Sydney'
+        assert index.refresh() == []
+        assert index.refresh(site_ids=[site_id], force=True) == [site_id]
+        assert index.group('north') == server.site_ids[:2]
+    assert api.metrics.counter('site_inventory', 'requests') == requests + 1
+    assert api.metrics.counter('site_inventory', 'cache_misses') == len(server.site_ids) + 1
+
+
+@server_options
+def test_fleet_index_default_filename_per_key(server):
+    filename = FleetIndex.default_filename(SolarEdgeAPI(api_key='mock', baseurl=server.baseurl))
+    assert filename != FleetIndex.default_filename(SolarEdgeAPI(api_key='other', baseurl=server.baseurl))
+    assert filename != FleetIndex.default_filename(SolarEdgeAPI(api_key='mock'))
+    assert filename == FleetIndex.default_filename(SolarEdgeAPI(api_key='mock', baseurl=server.baseurl))
+
+
+@server_options
+def test_fleet_index_sensors_same_name(server, monkeypatch):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    sensors = {'SiteSensors': {'count': 2, 'list': [
+        {'connectedTo': 'Inverter 1', 'sensors': [{'name': 'SENSOR 1', 'measurement': 'A', 'type': 'IRRADIANCE'}]},
+        {'connectedTo': 'Inverter 2', 'sensors': [{'name': 'SENSOR 1', 'measurement': 'A', 'type': 'IRRADIANCE'}]},
+    ]}}
+    monkeypatch.setattr(server, 'equipment_sensors', lambda site, params: sensors)
+    with FleetIndex(api, filename=':memory:') as index:
+        index.refresh(site_ids=[server.site_ids[0]])
+        rows = index.equipment(server.site_ids[0], kind='sensor')
+        assert sorted(row['connected_to'] for row in rows) == ['Inverter 1', 'Inverter 2']
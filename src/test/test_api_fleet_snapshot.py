@@ -0,0 +1,60 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.FleetSnapshot import FleetSnapshot, FleetSnapshotException
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+@server_options
+def test_fleet_snapshot_export_and_load(server, tmp_path):
+    filename = str(tmp_path / 'fleet.snapshot')
+    plain = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    with FleetSnapshot.export(plain, filename) as snapshot:
+        assert snapshot.site_ids() == sorted(server.site_ids)
+        assert server.site_ids[0] in snapshot
+        assert 42 not in snapshot
+
+    expected = {site_id: (plain.get_site_details(site_id).data, plain.get_site_inventory(site_id).data,
+                          plain.get_site_data_period(site_id).data) for site_id in server.site_ids}
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, fleet_snapshot=filename)
+    requests = server.stats['requests']
+    for site_id in server.site_ids:
+        details, inventory, data_period = expected[site_id]
+        assert api.get_site_details(site_id).data == details
+        assert api.get_site_inventory(site_id).data == inventory
+        assert api.get_site_data_period(site_id).data == data_period
+        assert api.get_site_timezone(site_id, tempfile_cache_use=False) == details['details']['location']['timeZone']
+    assert server.stats['requests'] == requests
+    assert api.metrics.counter('site_details', 'requests') == 0
+    assert api.metrics.counter('site_timezone.snapshot', 'cache_hits') >= len(server.site_ids)
+
+
+@server_options
+def test_fleet_snapshot_partial_and_datetime(server, tmp_path):
+    filename = str(tmp_path / 'fleet.snapshot')
+    site_id = server.site_ids[0]
+    FleetSnapshot.export(SolarEdgeAPI(api_key='mock', baseurl=server.baseurl), filename, site_ids=[site_id]).close()
+
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True,
+                       fleet_snapshot=FleetSnapshot(filename))
+    period = api.get_site_data_period(site_id).data['dataPeriod']
+    assert period['startDate'].tzinfo is not None
+    assert api.metrics.counter('site_data_period', 'requests') == 0
+
+    assert api.get_site_details(server.site_ids[1]).data['details']['id'] == server.site_ids[1]
+    assert api.metrics.counter('site_details', 'requests') == 1
+
+    with pytest.raises(FleetSnapshotException):
+        FleetSnapshot.export(api, filename)
+
+
+def test_fleet_snapshot_invalid_file(tmp_path):
+    filename = tmp_path / 'invalid.snapshot'
+    filename.write_bytes(b'not a fleet snapshot file')
+    with pytest.raises(FleetSnapshotException):
+        FleetSnapshot(str(filename))
+    with pytest.raises(FleetSnapshotException):
+        FleetSnapshot(str(tmp_path / 'missing.snapshot'))
@@ -0,0 +1,69 @@
+
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.FleetIndex import FleetIndex
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 2, 'max_concurrency': 3}], indirect=True)
+
+
+@server_options
+def test_site_inverter_data_fan_out(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, pandas_response=True)
+    site_id = server.site_ids[0]
+    serial_numbers = server.sites[site_id].inverters
+
+    response = api.get_site_inverter_data(site_id, '2020-12-01 00:00:00', '2020-12-10 23:59:59')
+    assert response.status_code == 200
+    data = response.data['inverterData']
+    assert data['serialNumbers'] == serial_numbers
+    assert data['count'] == len(serial_numbers) * 10 * 96
+    assert api.metrics.counter('site_equipment_data', 'requests') == len(serial_numbers) * 2
+
+    assert list(response.pandas.index.names) == ['serialNumber', 'date']
+    assert response.pandas.index.is_unique
+    assert 'L1Data.acVoltage' in response.pandas.columns
+    assert response.pandas.index.get_level_values('date')[0].tzinfo is not None
+
+
+@server_options
+def test_site_inverter_data_slim(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, slim_response=True)
+    site_id = server.site_ids[0]
+    response = api.get_site_inverter_data(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    assert response.status_code == 200
+    telemetries = response.data['inverterData']['telemetries']
+    assert len(telemetries) == len(server.sites[site_id].inverters) * 96
+    assert telemetries[0]['date'].tzinfo is not None
+
+
+@server_options
+def test_site_inverter_data_fleet_index(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    site_id = server.site_ids[1]
+    with FleetIndex(api, filename=':memory:') as index:
+        response = api.get_site_inverter_data(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59',
+                                              fleet_index=index)
+        assert response.data['inverterData']['serialNumbers'] == index.inverters(site_id)
+        assert api.metrics.counter('site_inventory', 'requests') == 1
+
+        api.get_site_inverter_data(site_id, '2020-12-02 00:00:00', '2020-12-02 23:59:59', fleet_index=index)
+        assert api.metrics.counter('site_inventory', 'requests') == 1
+
+
+@server_options
+def test_site_inverter_data_cli(server):
+    site_id = server.site_ids[0]
+    result = CliRunner().invoke(
+        click.solaredge_interface,
+        ['--baseurl', server.baseurl, '--format', 'csv', 'site_inverter_data', str(site_id),
+         '--start_time', '2020-12-01 00:00:00', '--end_time', '2020-12-01 23:59:59'],
+        env={'SOLAREDGE_API_KEY': 'mock'}
+    )
+    assert result.exit_code == 0, result.output
+    lines = [line for line in result.output.splitlines() if line]
+    assert lines[0].startswith('serialNumber,date,')
+    assert len(lines) == 1 + len(server.sites[site_id].inverters) * 96
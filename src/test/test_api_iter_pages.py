@@ -0,0 +1,44 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.models import Site
+from solaredge_interface.exceptions.SolarEdgeInterfaceException import SolarEdgeInterfaceException
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 25, 'latency': 0.1}], indirect=True)
+
+
+@server_options
+@pytest.mark.parametrize('prefetch', [0, 1, 3])
+def test_iter_sites_walks_all_pages(server, prefetch):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    sites = list(api.iter_sites(page_size=4, prefetch=prefetch))
+    assert [site['id'] for site in sites] == server.site_ids
+    assert api.metrics.counter('sites', 'requests') == 7
+
+
+@server_options
+def test_iter_sites_prefetch_overlaps_pages(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    sites = api.iter_sites(page_size=5, prefetch=2, typed=True)
+    first = next(sites)
+    assert isinstance(first, Site)
+    assert first.id == server.site_ids[0] and first.timezone == 'Australia/Sydney'
+    assert len(list(sites)) == 24
+    assert server.stats['max_concurrency'] >= 2
+
+
+@server_options
+def test_iter_accounts(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    accounts = list(api.iter_accounts())
+    assert len(accounts) == 1
+    assert accounts[0]['name'] == 'Mock Account'
+
+
+@server_options
+def test_iter_sites_error(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl + '/missing')
+    with pytest.raises(SolarEdgeInterfaceException):
+        list(api.iter_sites())
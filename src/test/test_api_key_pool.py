@@ -0,0 +1,91 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.KeyPool import KeyPool, KeyPoolException, merge_bulk_data
+
+
+API_KEYS = {'key-one': [1000001, 1000002], 'key-two': [1000003, 1000004], 'key-all': [1000001, 1000004]}
+server_options = pytest.mark.parametrize('server', [{'sites': 4, 'api_keys': API_KEYS}], indirect=True)
+
+
+def test_key_pool_acquire_and_quota():
+    pool = KeyPool(['a', 'b', 'a', ''], daily_quota=2)
+    assert pool.api_keys == ['a', 'b']
+    pool.add_sites('a', [1, 2])
+    pool.add_sites('b', [2])
+    assert pool.acquire([1]) == 'a'
+    assert pool.acquire([2]) == 'b'
+    assert pool.acquire([2]) == 'a'
+    assert pool.remaining('a') == 0
+    pool.rate_limited('b', quota_spent=True)
+    assert pool.remaining('b') == 0
+    with pytest.raises(KeyPoolException):
+        pool.acquire([2])
+
+
+def test_key_pool_partition():
+    pool = KeyPool(['a', 'b'])
+    pool.add_sites('a', [1, 2])
+    pool.add_sites('b', [2, 3])
+    groups = pool.partition(['1', '2', '3'])
+    assert sorted(site for group in groups.values() for site in group) == ['1', '2', '3']
+    assert groups['a'][0] == '1' and '3' in groups['b']
+    with pytest.raises(KeyPoolException):
+        KeyPool([])
+
+
+def test_merge_bulk_data():
+    merged = merge_bulk_data([
+        {'sitesEnergy': {'unit': 'Wh', 'count': 1, 'siteEnergyList': [{'siteId': 1}]}},
+        {'sitesEnergy': {'unit': 'Wh', 'count': 2, 'siteEnergyList': [{'siteId': 2}, {'siteId': 3}]}},
+    ])
+    assert merged['sitesEnergy']['count'] == 3
+    assert [item['siteId'] for item in merged['sitesEnergy']['siteEnergyList']] == [1, 2, 3]
+
+
+@server_options
+def test_key_pool_routes_requests(server):
+    api = SolarEdgeAPI(api_key=['key-one', 'key-two', 'key-all'], baseurl=server.baseurl)
+    assert api.api_key == 'key-one'
+
+    for site_id in server.site_ids:
+        response = api.get_site_overview(site_id)
+        assert response.status_code == 200, site_id
+    assert api.key_pool.discovered is True
+    assert api.key_pool.keys_for_site(1000004) == ['key-two', 'key-all']
+
+
+@server_options
+def test_key_pool_splits_bulk_requests(server):
+    api = SolarEdgeAPI(api_key=KeyPool(['key-one', 'key-two']), baseurl=server.baseurl)
+    site_ids = ','.join([str(site_id) for site_id in server.site_ids])
+    response = api.get_site_energy(site_ids, '2020-12-01', '2020-12-06')
+    assert response.status_code == 200
+    assert response.data['sitesEnergy']['count'] == 4
+    assert sorted([item['siteId'] for item in response.data['sitesEnergy']['siteEnergyList']]) == server.site_ids
+
+
+@server_options
+def test_key_pool_falls_back_after_rate_limit(server):
+    pool = KeyPool(['key-one', 'key-all'], daily_quota=100)
+    api = SolarEdgeAPI(api_key=pool, baseurl=server.baseurl)
+    api.discover_key_pool()
+    pool.rate_limited('key-all', quota_spent=True)
+    assert api.get_site_overview(1000001).status_code == 200
+    with pytest.raises(KeyPoolException):
+        api.get_site_overview(1000004)
+
+
+def test_key_pool_transient_rate_limit():
+    pool = KeyPool(['a', 'b'])
+    pool.rate_limited('a')
+    assert pool.remaining('a') > 0
+    assert pool.acquire() == 'b'
+    assert pool.acquire() == 'b'
+
+
+@server_options
+def test_key_pool_iter_sites(server):
+    api = SolarEdgeAPI(api_key=['key-one', 'key-two', 'key-all'], baseurl=server.baseurl)
+    assert sorted([site['id'] for site in api.iter_sites(page_size=1)]) == server.site_ids
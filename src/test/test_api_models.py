@@ -0,0 +1,87 @@
+
+import math
+import array
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.models import Site, DataPeriod, TimeSeries, MeterSeries, Overview, PowerFlow, \
+    PowerFlowElement, Inventory, Battery, Telemetries, data_to_model
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+@server_options
+def test_typed_response_models(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, typed_response=True)
+    site_id = server.site_ids[0]
+
+    details = api.get_site_details(site_id)
+    assert isinstance(details.model, Site)
+    assert details._data is None and not hasattr(details.model, '__dict__')  # the decoded dict is not kept
+    decodes = api.metrics.histogram('site_details', 'phase.json_decode')['count']
+    assert details.model.timezone == details.data['details']['location']['timeZone']
+    details.data['details']['name'] = 'renamed'
+    assert details.data['details']['name'] == 'renamed'  # decoded at most once, changes to .data are kept
+    assert api.metrics.histogram('site_details', 'phase.json_decode')['count'] == decodes + 1
+    assert isinstance(api.get_site_data_period(site_id).model, DataPeriod)
+    assert isinstance(api.get_site_overview(site_id).model, Overview)
+    power_flow = api.get_site_current_power_flow(site_id).model
+    assert isinstance(power_flow, PowerFlow)
+    assert isinstance(power_flow.load, PowerFlowElement) and power_flow.storage is None
+
+    power = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    assert isinstance(power.model, TimeSeries)
+    assert isinstance(power.model.values, array.array)
+    assert power.model.dates == [item['date'] for item in power.data['power']['values']]
+    assert [None if math.isnan(value) else value for value in power.model.values] == \
+        [item['value'] for item in power.data['power']['values']]
+
+    details = api.get_site_power_details(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59', meters='Production')
+    assert isinstance(details.model, MeterSeries)
+    assert list(details.model.meters) == ['Production']
+    assert len(details.model['Production']) == 96
+
+    inventory = api.get_site_inventory(site_id).model
+    assert isinstance(inventory, Inventory)
+    assert [item.serial_number for item in inventory.inverters] == \
+        [item['SN'] for item in api.get_site_inventory(site_id).data['Inventory']['inverters']]
+
+    storage = api.get_site_storage_data(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59').model
+    assert isinstance(storage[0], Battery)
+    assert isinstance(storage[0].telemetries['stateOfCharge'], array.array)
+
+    bulk = api.get_site_energy(','.join([str(item) for item in server.site_ids]), '2020-12-01', '2020-12-07')
+    assert sorted(bulk.model) == server.site_ids
+    assert len(bulk.model[site_id]) == 7
+
+
+@server_options
+def test_typed_response_slim_and_default(server):
+    site_id = server.site_ids[0]
+    slim = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, typed_response=True, slim_response=True)
+    assert slim.get_site_details(site_id).model.id == site_id
+    assert SolarEdgeAPI(api_key='mock', baseurl=server.baseurl).get_site_details(site_id).model is None
+
+
+def test_telemetries_columns():
+    telemetries = Telemetries([
+        {'date': '2020-12-01 00:00:00', 'totalActivePower': 10, 'inverterMode': 'MPPT', 'L1Data': {'acVoltage': 230.1}},
+        {'date': '2020-12-01 00:15:00', 'totalActivePower': None, 'inverterMode': 'SLEEPING'},
+    ])
+    assert telemetries.dates == ['2020-12-01 00:00:00', '2020-12-01 00:15:00']
+    assert telemetries['totalActivePower'][0] == 10.0 and math.isnan(telemetries['totalActivePower'][1])
+    assert telemetries['inverterMode'] == ['MPPT', 'SLEEPING']
+    assert telemetries['L1Data.acVoltage'][0] == 230.1
+    assert data_to_model({'unknown': {}}) is None
+
+
+@server_options
+def test_inverter_data_model(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, typed_response=True)
+    site_id = server.site_ids[0]
+    response = api.get_site_inverter_data(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    assert sorted(response.model) == sorted(server.sites[site_id].inverters)
+    assert all(len(telemetries) == 96 for telemetries in response.model.values())
+    assert response.data['inverterData']['count'] == 96 * len(response.model)
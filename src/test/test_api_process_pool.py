@@ -0,0 +1,66 @@
+
+import json
+import pickle
+import concurrent.futures
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.postprocess import postprocess, columns_to_dataframe
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 2}], indirect=True)
+
+
+def test_postprocess_columns_roundtrip():
+    body = '{"power": {"unit": "W", "values": [{"date": "2020-12-06 00:00:00", "value": 1.5}, ' \
+           '{"date": "2020-12-06 00:15:00", "value": null}]}}'
+    columns = postprocess(body, datetime_response=True, tz='Australia/Sydney', pandas_response=True,
+                          pandas_datetime64=True)
+    dataframe = columns_to_dataframe(columns)
+    assert list(dataframe.columns) == ['power.unit', 'power.values.date', 'power.values.value']
+    assert str(dataframe['power.values.date'].dt.tz) == 'Australia/Sydney'
+    assert postprocess('not json') is None
+    assert postprocess(body, datetime_response=True) is None  # nothing to return without pandas_response
+
+
+def test_postprocess_payload_is_columns_only():
+    values = [{'date': '2020-12-{:02d} {:02d}:{:02d}:00'.format(1 + i // 96, i % 96 // 4, i % 4 * 15), 'value': i * 1.5}
+              for i in range(7 * 96)]
+    body = json.dumps({'power': {'timeUnit': 'QUARTER_OF_AN_HOUR', 'unit': 'W', 'values': values}})
+    columns = postprocess(body, datetime_response=True, tz='Australia/Sydney', pandas_response=True,
+                          pandas_datetime64=True)
+    _, column_names, arrays = columns
+    assert column_names == ['power.timeUnit', 'power.unit', 'power.values.date', 'power.values.value']
+    assert not any(isinstance(item, dict) for item in columns) and len(arrays) == 4
+    assert len(pickle.dumps(columns)) < len(body)
+
+
+@server_options
+def test_process_pool_matches_in_process(server):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, pandas_response=True,
+                           process_pool=executor)
+        plain = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, pandas_response=True)
+        site_id = server.site_ids[0]
+
+        response = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59')
+        expected = plain.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59')
+        assert response.size >= 16384
+        assert api.metrics.histogram('site_power', 'phase.process_pool')['count'] == 1
+        assert response.data == expected.data
+        assert response.pandas.equals(expected.pandas)
+
+        overview = api.get_site_overview(site_id)
+        assert api.metrics.histogram('site_overview', 'phase.process_pool') is None
+        assert overview.data == plain.get_site_overview(site_id).data
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as threads:
+            responses = list(threads.map(
+                lambda day: api.get_site_power(server.site_ids[1], '2020-12-{:02d} 00:00:00'.format(day),
+                                               '2020-12-{:02d} 23:59:59'.format(day + 6)), range(1, 9)))
+        assert all(len(response.data['power']['values']) == 7 * 96 for response in responses)
+
+        unpooled = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, process_pool=executor)
+        unpooled.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59')
+        assert unpooled.metrics.histogram('site_power', 'phase.process_pool') is None
@@ -0,0 +1,104 @@
+
+import datetime
+
+import pytz
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.api.SegmentCache import SegmentCache
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+
+
+def test_segment_cache_sliding_window(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, segment_cache=True)
+    plain = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    site_id = server.site_ids[0]
+
+    first = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59')
+    assert first.data == plain.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59').data
+
+    second = api.get_site_power(site_id, '2020-12-02 00:00:00', '2020-12-08 23:59:59')
+    assert api.metrics.counter('site_power', 'requests') == 2
+    assert 'startTime=2020-12-08+00%3A00%3A00' in second.url
+    assert second.data == plain.get_site_power(site_id, '2020-12-02 00:00:00', '2020-12-08 23:59:59').data
+
+    api.get_site_power(site_id, '2020-12-03 06:00:00', '2020-12-05 18:00:00')
+    assert api.metrics.counter('site_power', 'requests') == 2
+
+
+def test_segment_cache_meters_and_dates(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, segment_cache=SegmentCache())
+    plain = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    site_id = server.site_ids[0]
+
+    api.get_site_energy_details(site_id, '2020-12-01 00:00:00', '2020-12-10 23:59:59', meters='Production')
+    details = api.get_site_energy_details(site_id, '2020-11-25 00:00:00', '2020-12-05 23:59:59',
+                                          meters='Production')
+    expected = plain.get_site_energy_details(site_id, '2020-11-25 00:00:00', '2020-12-05 23:59:59',
+                                             meters='Production')
+    assert details.data == expected.data
+    assert api.metrics.counter('site_energy_details', 'requests') == 2
+
+    api.get_site_energy(site_id, '2020-12-01', '2020-12-10')
+    energy = api.get_site_energy(site_id, '2020-12-05', '2020-12-12')
+    assert energy.data == plain.get_site_energy(site_id, '2020-12-05', '2020-12-12').data
+    assert api.metrics.counter('site_energy', 'requests') == 2
+
+    api.get_site_energy(site_id, '2020-12-01', '2020-12-10', time_unit='MONTH')
+    api.get_site_energy(site_id, '2020-12-01', '2020-12-10', time_unit='MONTH')
+    assert api.metrics.counter('site_energy', 'requests') == 4
+
+
+def test_segment_cache_does_not_hold_unsettled_data(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, segment_cache=True)
+    site_id = server.site_ids[0]
+    now = datetime.datetime.now(pytz.timezone('Australia/Sydney')).replace(tzinfo=None)
+    start = (now - datetime.timedelta(days=1)).strftime('%Y-%m-%d %H:%M:%S')
+    end = now.strftime('%Y-%m-%d %H:%M:%S')
+    api.get_site_power(site_id, start, end)
+    api.get_site_power(site_id, start, end)
+    assert api.metrics.counter('site_power', 'requests') == 2
+    assert len(api.segment_cache.entries) == 1
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_segment_cache_directory(server, tmp_path, compress):
+    site_id = server.site_ids[0]
+    first = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl,
+                         segment_cache=SegmentCache(directory=str(tmp_path), compress=compress))
+    expected = first.get_site_power_details(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59')
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # a new process (here a new cache) reloads the held values from the series file
+    second = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl,
+                          segment_cache=SegmentCache(directory=str(tmp_path)))
+    details = second.get_site_power_details(site_id, '2020-12-02 00:00:00', '2020-12-06 23:59:59')
+    assert second.metrics.counter('site_power_details', 'requests') == 0
+    entry = next(iter(second.segment_cache.entries.values()))
+    assert all(timestamps.dtype == 'datetime64[s]' and values.dtype == 'f8'
+               for timestamps, values in entry.values.values())  # held as arrays, not per-value dicts
+    for meter, expected_meter in zip(details.data['powerDetails']['meters'], expected.data['powerDetails']['meters']):
+        assert meter['type'] == expected_meter['type']
+        assert meter['values'] == [item for item in expected_meter['values']
+                                   if '2020-12-02' <= item['date'] < '2020-12-07']
+
+
+def test_segment_cache_directory_per_baseurl(server, tmp_path):
+    site_id = server.site_ids[0]
+    cache = SegmentCache(directory=str(tmp_path))
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, segment_cache=cache)
+    api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    filename = next(tmp_path.iterdir())
+    modified = filename.stat().st_mtime_ns
+
+    # a fully held range is served without rewriting the series file
+    api.get_site_power(site_id, '2020-12-01 06:00:00', '2020-12-01 11:59:59')
+    assert filename.stat().st_mtime_ns == modified
+
+    # the same site under another baseurl does not share the persisted values
+    with SolarEdgeMockServer(sites=1) as other:
+        other_api = SolarEdgeAPI(api_key='mock', baseurl=other.baseurl,
+                                 segment_cache=SegmentCache(directory=str(tmp_path)))
+        other_api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+        assert other_api.metrics.counter('site_power', 'requests') == 1
+    assert len(list(tmp_path.iterdir())) == 2
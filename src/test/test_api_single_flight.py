@@ -0,0 +1,70 @@
+
+import asyncio
+import threading
+import concurrent.futures
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.singleflight import SingleFlight
+
+
+server_options = pytest.mark.parametrize('fresh_server', [{'sites': 2, 'latency': 0.3}], indirect=True)
+
+
+def test_single_flight_shares_result_and_error():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        release.wait(5)
+        return value
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(single_flight.do, 'key', slow, 'result') for _ in range(4)]
+        release.wait(0.2)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) < 4
+    assert all(result == 'result' for result, _ in results)
+    assert single_flight.calls == {}
+
+    def fail():
+        raise ValueError('failed')
+
+    with pytest.raises(ValueError):
+        single_flight.do('key', fail)
+    assert single_flight.do('key', lambda: 1) == (1, False)
+
+
+@server_options
+def test_single_flight_threaded_requests(fresh_server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=fresh_server.baseurl)
+    site_id = fresh_server.site_ids[0]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(lambda _: api.get_site_overview(site_id), range(5)))
+
+    assert api.metrics.counter('site_overview', 'requests') == 1
+    assert all(response.data == responses[0].data for response in responses)
+    responses[0].text = 'changed by one caller'
+    assert all(response.text != responses[0].text for response in responses[1:])
+    assert api.metrics.counter('site_overview', 'coalesced') == 4
+
+    api.get_site_overview(site_id)
+    assert api.metrics.counter('site_overview', 'requests') == 2
+
+
+@server_options
+def test_single_flight_async_requests(fresh_server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=fresh_server.baseurl)
+    site_id = fresh_server.site_ids[1]
+
+    async def gather():
+        return await asyncio.gather(*[api.call_async('get_site_overview', site_id) for _ in range(5)])
+
+    responses = asyncio.run(gather())
+    assert api.metrics.counter('site_overview', 'requests') == 1
+    assert all(response.status_code == 200 for response in responses)
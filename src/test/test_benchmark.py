@@ -0,0 +1,27 @@
+
+from test.benchmark import fixtures
+from test.benchmark.runner import run_benchmarks, compare_baseline, load_baseline
+
+
+def test_benchmark_fixtures_scale():
+    assert len(fixtures.site_energy(sites=1, days=2)['energy']['values']) == 2 * fixtures.QUARTERS_PER_DAY
+    bulk = fixtures.site_energy(sites=3, days=1)['sitesEnergy']
+    assert bulk['count'] == 3
+    assert len(bulk['siteEnergyList'][2]['energyValues']['values']) == fixtures.QUARTERS_PER_DAY
+    assert len(fixtures.site_overview(sites=5)['sitesOverviews']['siteEnergyList']) == 5
+
+
+def test_benchmark_smallest_scenario():
+    results = run_benchmarks(scenarios=['1site-1day'], repeat=1)
+    assert 'response_wrapper.site_energy' in results['1site-1day']
+    assert 'output_csv' in results['1site-1day']
+    assert 'response_wrapper.site_power' in results['1site-1day']
+    assert all(seconds >= 0 for seconds in results['1site-1day'].values())
+
+
+def test_benchmark_compare_baseline():
+    baseline = {'results': {'1site-1day': {'flatten_data': 0.1}}}
+    assert compare_baseline({'1site-1day': {'flatten_data': 0.12}}, baseline) == []
+    assert compare_baseline({'1site-1day': {'flatten_data': 0.2}}, baseline) == \
+        [('1site-1day', 'flatten_data', 0.1, 0.2)]
+    assert load_baseline() is not None
@@ -0,0 +1,49 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.http_request import Response, SlimResponse
+from solaredge_interface.utils.json import json_decode
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 2}], indirect=True)
+
+
+def test_response_lazy_text():
+    response = Response(status_code=200, content='{"name": "café"}'.encode('utf-8'), encoding='utf-8')
+    assert response.body is response.content
+    assert json_decode(response.body) == {'name': 'café'}
+    assert response._text is None
+    assert response.text == '{"name": "café"}'
+
+    response.text = '{"name": "merged"}'
+    assert response.content is None
+    assert response.body == '{"name": "merged"}'
+
+    assert json_decode(b'\xff\xfe not json') is None
+
+
+@server_options
+def test_bytes_decode_api(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, bytes_decode=True)
+    site_id = server.site_ids[0]
+    response = api.get_site_power(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert type(response.content) is bytes
+    assert response._text is None
+    assert len(response.data['power']['values']) == 96
+    assert response._text is None
+    assert response.text.startswith('{"power":')
+
+    bulk = api.get_site_energy(','.join([str(s) for s in server.site_ids]), '2020-12-01', '2020-12-06')
+    assert bulk.data['sitesEnergy']['count'] == 2
+
+
+@server_options
+def test_bytes_decode_slim_release(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, slim_response=True, bytes_decode=True)
+    response = api.get_site_overview(server.site_ids[1])
+    assert isinstance(response, SlimResponse)
+    assert type(response.body) is bytes
+    response.release()
+    assert response.content is None and response.text is None
+    assert response.data['overview']
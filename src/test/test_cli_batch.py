@@ -0,0 +1,110 @@
+
+import os
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.cli.batch import load_manifest, job_kwargs, run_job, BatchJob, BatchException
+from solaredge_interface.cli.config import Config
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 2, 'max_concurrency': 3}], indirect=True)
+
+
+def test_batch_load_manifest_json_and_csv(tmp_path):
+    manifest_json = tmp_path / 'manifest.json'
+    manifest_json.write_text(json.dumps({'jobs': [
+        {'command': 'site_energy', 'site_id': 1, 'options': {'time_unit': 'DAY'}},
+        {'subcommand': 'site_overview', 'site_id': 2},
+    ]}))
+    jobs = load_manifest(str(manifest_json))
+    assert [job.command for job in jobs] == ['site_energy', 'site_overview']
+    assert jobs[0].options == {'time_unit': 'DAY'}
+
+    manifest_csv = tmp_path / 'manifest.csv'
+    manifest_csv.write_text('command,site_id,start_date,end_date\nsite_energy,1,2020-12-01,2020-12-07\n'
+                            'site_details,2,,\n')
+    jobs = load_manifest(str(manifest_csv))
+    assert jobs[0].options == {'start_date': '2020-12-01', 'end_date': '2020-12-07'}
+    assert jobs[1].options == {}
+    assert jobs[1].name == '0001-site_details-2'
+
+    manifest_txt = tmp_path / 'manifest.txt'
+    manifest_txt.write_text('')
+    with pytest.raises(BatchException):
+        load_manifest(str(manifest_txt))
+
+
+@server_options
+def test_batch_ndjson(server, tmp_path):
+    site_ids = server.site_ids
+    manifest = tmp_path / 'manifest.csv'
+    manifest.write_text('command,site_id,start_date,end_date\n' + ''.join(
+        'site_energy,{},2020-12-01,2020-12-07\nsite_details,{},,\n'.format(site_id, site_id) for site_id in site_ids
+    ) + 'version_current,,,\n')
+    output = tmp_path / 'results.ndjson'
+
+    result = CliRunner().invoke(
+        click.solaredge_interface,
+        ['--baseurl', server.baseurl, 'batch', str(manifest), '--parallel', '3', '--ndjson', str(output)],
+        env={'SOLAREDGE_API_KEY': 'mock', 'SOLAREDGE_SITE_ID': ''}
+    )
+    assert result.exit_code == 0, result.output
+
+    records = sorted([json.loads(line) for line in output.read_text().splitlines()], key=lambda r: r['index'])
+    assert len(records) == 5
+    assert all(record['status_code'] == 200 for record in records)
+    assert len(records[0]['data']['energy']['values']) == 7
+    assert records[4]['data']['version']['release']
+
+
+@server_options
+def test_batch_output_dir_and_failures(server, tmp_path):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps([
+        {'command': 'site_overview', 'site_id': server.site_ids[0]},
+        {'command': 'site_overview', 'site_id': 1},
+        {'command': 'no_such_command'},
+        {'command': 'site_timezone', 'site_id': server.site_ids[0]},
+    ]))
+    output_dir = tmp_path / 'results'
+
+    result = CliRunner().invoke(
+        click.solaredge_interface,
+        ['--baseurl', server.baseurl, 'batch', str(manifest), '--output_dir', str(output_dir)],
+        env={'SOLAREDGE_API_KEY': 'mock', 'SOLAREDGE_SITE_ID': ''}
+    )
+    assert result.exit_code != 0
+    assert '3 of 4 batch jobs failed' in str(result.exception)
+    filenames = sorted(os.listdir(str(output_dir)))
+    assert filenames == ['0000-site_overview-{}.json'.format(server.site_ids[0])]
+    assert 'overview' in json.loads((output_dir / filenames[0]).read_text())
+
+
+@server_options
+def test_batch_manifest_site_id_list(server, tmp_path):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps([{'command': 'site_energy', 'site_id': server.site_ids,
+                                     'options': {'start_date': '2020-12-01', 'end_date': '2020-12-07'}}]))
+    job = load_manifest(str(manifest))[0]
+    assert job.name == '0000-site_energy-{}_{}'.format(*server.site_ids)
+
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    _, kwargs = job_kwargs(api, job, Config())
+    assert kwargs['site_id'] == '{},{}'.format(*server.site_ids)
+    response = run_job(api, job, Config())
+    assert len(response.data['sitesEnergy']['siteEnergyList']) == 2
+
+
+@server_options
+def test_batch_job_kwargs(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    config = Config()
+    with pytest.raises(BatchException):
+        job_kwargs(api, BatchJob(0, 'site_energy_rollup', site_id=server.site_ids[0]), config)
+    _, kwargs = job_kwargs(api, BatchJob(0, 'site_inverter_data', site_id=server.site_ids[0], options={'parallel': 3}),
+                           config)
+    assert kwargs['parallel'] == 1
@@ -0,0 +1,58 @@
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.cli.multisite import run_sites
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+def invoke(server, *args):
+    return CliRunner().invoke(click.solaredge_interface, ['--baseurl', server.baseurl] + list(args),
+                              env={'SOLAREDGE_API_KEY': 'mock', 'SOLAREDGE_SITE_ID': None})
+
+
+@server_options
+def test_multisite_json(server, tmp_path):
+    site_ids = [str(site_id) for site_id in server.site_ids]
+    site_ids_file = tmp_path / 'sites.txt'
+    site_ids_file.write_text('# fleet\n{}\n'.format(site_ids[2]))
+
+    result = invoke(server, 'site_inventory', site_ids[0], site_ids[1], '--site_ids_file', str(site_ids_file),
+                    '--parallel', '2')
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert [item['site_id'] for item in data] == server.site_ids
+    assert all(['Inventory' in item for item in data])
+
+    single = json.loads(invoke(server, 'site_inventory', site_ids[0]).output)
+    assert single == {'Inventory': data[0]['Inventory']}
+
+
+@server_options
+def test_multisite_csv(server):
+    result = invoke(server, '--format', 'csv', 'site_power_details', ','.join([str(item) for item in server.site_ids]),
+                    '--meters', 'Production', '--start_time', '2020-12-01 00:00:00',
+                    '--end_time', '2020-12-01 00:59:59')
+    assert result.exit_code == 0, result.output
+    lines = result.output.strip().split('\n')
+    assert lines[0].split(',')[1] == 'site_id'
+    assert len(lines) == 1 + 4 * len(server.site_ids)
+    assert sorted({line.split(',')[1] for line in lines[1:]}) == [str(item) for item in server.site_ids]
+
+
+@server_options
+def test_multisite_failures(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    response = run_sites(api.get_site_inventory, [server.site_ids[0], '999'], parallel=2)
+    assert response.failed == 1
+    assert response.data[0]['site_id'] == server.site_ids[0]
+    assert response.data[1]['site_id'] == 999 and 'error' in response.data[1]
+
+    result = invoke(server, 'site_inventory', str(server.site_ids[0]), '999')
+    assert result.exit_code != 0
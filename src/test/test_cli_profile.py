@@ -0,0 +1,53 @@
+import pstats
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.utils.metrics import ProfileCollector, process_elapsed
+
+
+def test_profile_collector_phases():
+    collector = ProfileCollector()
+    with collector.phase('output'):
+        sum(range(10000))
+    with collector.timer('site_power', 'phase.json_decode'):
+        pass
+    with collector.timer('site_power', 'phase.json_decode'):
+        pass
+    assert list(collector.phases.keys()) == ['output', 'json_decode']
+    assert collector.phases['json_decode'][0] == 2
+    assert collector.histogram('site_power', 'phase.json_decode')['count'] == 2
+
+    lines = collector.profile_table(total=(1.0, 0.5)).splitlines()
+    assert lines[0].split() == ['phase', 'calls', 'wall_s', 'cpu_s']
+    assert [line.split()[0] for line in lines[1:]] == ['output', 'json_decode', 'total']
+
+
+def test_process_elapsed():
+    elapsed = process_elapsed()
+    if elapsed is None:
+        pytest.skip('process start time not available')
+    assert elapsed > 0
+
+
+def test_cli_profile(server, tmp_path):
+    stats = str(tmp_path / 'solaredge.stats')
+    result = CliRunner().invoke(
+        click.solaredge_interface,
+        ['--baseurl', server.baseurl, '--format', 'csv', '--profile', '--profile-stats', stats, 'site_power',
+         str(server.site_ids[0]), '--start_time', '2020-12-01 00:00:00', '--end_time', '2020-12-01 23:59:59'],
+        env={'SOLAREDGE_API_KEY': 'mock'}
+    )
+    assert result.exit_code == 0, result.output
+    rows = {line.split()[0]: line.split()[1:] for line in result.stderr.splitlines()[1:] if line.split()}
+    for phase in ['startup', 'config', 'api_init', 'http', 'json_decode', 'data_to_pandas', 'output', 'total']:
+        assert phase in rows
+    # startup and total count from the same process start
+    assert float(rows['total'][1]) >= float(rows['startup'][1])
+    assert float(rows['total'][2]) >= float(rows['startup'][2])
+    assert result.stdout.startswith(',power.timeUnit')
+    assert pstats.Stats(stats).total_calls > 0
+
+    result = CliRunner().invoke(click.solaredge_interface, ['--baseurl', server.baseurl, 'version_current'],
+                                env={'SOLAREDGE_API_KEY': 'mock'})
+    assert result.exit_code == 0 and 'wall_s' not in result.stderr
@@ -0,0 +1,87 @@
+import os
+import sys
+import pytest
+from click.testing import CliRunner
+
+from solaredge_interface.cli import click
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+from solaredge_interface.utils.transport import Transport, RecordReplayTransport, RequestsTransport, \
+    Http2Transport, TransportException, transport_from_string
+
+
+def test_record_replay_transport(tmp_path):
+    directory = str(tmp_path / 'recordings')
+    with SolarEdgeMockServer(sites=1) as server:
+        site_id, baseurl = server.site_ids[0], server.baseurl
+        api = SolarEdgeAPI(api_key='secret-key', baseurl=baseurl, transport=RecordReplayTransport(directory, 'record'))
+        recorded = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+        assert recorded.status_code == 200
+
+    recordings = os.listdir(directory)
+    assert recordings  # the power request, and the site details for the timezone unless already cached
+    for recording in recordings:
+        with open(os.path.join(directory, recording)) as f:
+            assert 'secret-key' not in f.read()
+
+    # the mock server is stopped, responses now come from the recordings only
+    api = SolarEdgeAPI(api_key='other-key', baseurl=baseurl, datetime_response=True,
+                       transport='replay:{}'.format(directory))
+    replayed = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    assert replayed.status_code == 200
+    assert replayed.text == recorded.text
+    assert replayed.data['power']['values'][0]['date'].tzinfo is not None
+
+    with pytest.raises(TransportException):
+        api.get_site_power(site_id, '2020-12-02 00:00:00', '2020-12-02 23:59:59')
+
+
+def test_transport_from_string(tmp_path):
+    assert isinstance(transport_from_string('requests'), RequestsTransport)
+    assert transport_from_string('auto:{}'.format(tmp_path)).mode == 'auto'
+    with pytest.raises(TransportException):
+        transport_from_string('replay')
+    with pytest.raises(TransportException):
+        RecordReplayTransport(str(tmp_path), mode='rewind')
+    with pytest.raises(TypeError):
+        Transport()  # get is abstract
+
+
+def test_record_transport_skips_errors(tmp_path):
+    directory = str(tmp_path / 'recordings')
+    with SolarEdgeMockServer(sites=1) as server:
+        transport = RecordReplayTransport(directory, 'record')
+        assert transport.get(server.baseurl + '/site/1/overview', params={'api_key': 'mock'}).status_code != 200
+        assert os.listdir(directory) == []
+
+        transport = RecordReplayTransport(directory, 'record', record_errors=True)
+        assert transport.get(server.baseurl + '/site/1/overview', params={'api_key': 'mock'}).status_code != 200
+        assert len(os.listdir(directory)) == 1
+
+
+def test_http2_transport_requires_httpx(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'httpx', None)  # import httpx raises ImportError
+    with pytest.raises(TransportException):
+        Http2Transport()
+    with pytest.raises(TransportException):
+        transport_from_string('http2')
+
+
+def test_http2_transport():
+    pytest.importorskip('httpx')
+    with SolarEdgeMockServer(sites=1) as server:
+        api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, transport=Http2Transport())
+        assert api.get_site_overview(server.site_ids[0]).status_code == 200
+
+
+def test_cli_transport(tmp_path):
+    directory = str(tmp_path / 'recordings')
+    with SolarEdgeMockServer(sites=1) as server:
+        args = ['--baseurl', server.baseurl, '--transport', 'record:{}'.format(directory), 'site_overview',
+                str(server.site_ids[0])]
+        recorded = CliRunner().invoke(click.solaredge_interface, args, env={'SOLAREDGE_API_KEY': 'mock'})
+        assert recorded.exit_code == 0, recorded.output
+    args[3] = 'replay:{}'.format(directory)
+    replayed = CliRunner().invoke(click.solaredge_interface, args, env={'SOLAREDGE_API_KEY': 'mock'})
+    assert replayed.exit_code == 0, replayed.output
+    assert replayed.output == recorded.output
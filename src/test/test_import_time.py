@@ -0,0 +1,49 @@
+
+import os
+import sys
+import json
+import subprocess
+
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+
+IMPORT_TIME_BUDGET = 0.1  # seconds, for importing the command-line entrypoint module
+HEAVY_MODULES = ['requests', 'pandas', 'numpy', 'pytz', 'dateutil', 'solaredge_interface.api.SolarEdgeAPI']
+SRC_PATH = os.path.join(os.path.dirname(__file__), '..')
+
+
+def run_python(code, env=None):
+    environ = dict(os.environ, PYTHONPATH=SRC_PATH, **(env or {}))
+    result = subprocess.run([sys.executable, '-c', code], env=environ, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cli_import_avoids_heavy_modules():
+    loaded = run_python(
+        'import sys, json\n'
+        'import solaredge_interface.cli.entrypoints\n'
+        'print(json.dumps([m for m in {} if m in sys.modules]))'.format(HEAVY_MODULES)
+    )
+    assert loaded == []
+
+
+def test_cli_import_time_budget():
+    timings = [run_python(
+        'import time, json\n'
+        'start = time.perf_counter()\n'
+        'import solaredge_interface.cli.entrypoints\n'
+        'print(json.dumps(time.perf_counter() - start))'
+    ) for _ in range(3)]
+    assert min(timings) < IMPORT_TIME_BUDGET
+
+
+def test_cli_json_format_avoids_pandas():
+    with SolarEdgeMockServer(sites=1) as server:
+        loaded = run_python(
+            'import sys, json, io, contextlib\n'
+            'from solaredge_interface.cli import click\n'
+            'with contextlib.redirect_stdout(io.StringIO()):\n'
+            '    click.solaredge_interface(["--format", "json", "version_current"], standalone_mode=False)\n'
+            'print(json.dumps([m for m in ["pandas", "numpy"] if m in sys.modules]))',
+            env={'SOLAREDGE_API_KEY': 'mock', 'SOLAREDGE_API_BASEURL': server.baseurl}
+        )
+    assert loaded == []
@@ -0,0 +1,78 @@
+
+import pytest
+import requests
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.mock.SolarEdgeMockServer import SolarEdgeMockServer
+from solaredge_interface.mock import series
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+def test_mock_series_energy_matches_power():
+    start = series.datetime.datetime(2020, 12, 6)
+    end = start.replace(hour=23, minute=45)
+    power = series.power_values(0, start, end, peak_power=6.6)
+    energy = series.energy_values(0, start, end, peak_power=6.6, time_unit='DAY')
+    assert len(power) == 96
+    assert len(energy) == 1
+    assert energy[0]['value'] == pytest.approx(sum(item['value'] for item in power) / 4.0, abs=0.01)
+    assert power[0]['value'] == 0.0
+
+
+@server_options
+def test_mock_server_site_endpoints(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, pandas_response=True)
+    site_id = str(server.site_ids[0])
+
+    details = api.get_site_details(site_id)
+    assert details.status_code == 200
+    assert details.data['details']['location']['timeZone'] == 'Australia/Sydney'
+
+    power = api.get_site_power(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert len(power.data['power']['values']) == 96
+    assert power.data['power']['values'][0]['date'].tzinfo is not None
+    assert power.pandas is not None
+
+    power_details = api.get_site_power_details(site_id, '2020-12-06 00:00:00', '2020-12-07 00:00:00',
+                                               meters='Production,FeedIn')
+    assert [meter['type'] for meter in power_details.data['powerDetails']['meters']] == ['Production', 'FeedIn']
+
+    inventory = api.get_site_inventory(site_id)
+    serial = inventory.data['Inventory']['inverters'][0]['SN']
+    equipment = api.get_site_equipment_data(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59', serial)
+    assert equipment.data['data']['count'] == 96
+
+    assert api.get_version_current().data['version']['release']
+
+
+@server_options
+def test_mock_server_bulk_endpoints(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    site_ids = [str(site_id) for site_id in server.site_ids]
+
+    energy = api.get_site_energy(site_ids, '2020-12-01', '2020-12-07', time_unit='DAY')
+    assert energy.data['sitesEnergy']['count'] == 3
+    assert len(energy.data['sitesEnergy']['siteEnergyList'][0]['energyValues']['values']) == 7
+
+    overview = api.get_site_overview(','.join(site_ids))
+    assert len(overview.data['sitesOverviews']['siteEnergyList']) == 3
+
+
+@server_options
+def test_mock_server_errors(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl)
+    assert api.get_site_power(server.site_ids[0], '2020-01-01 00:00:00', '2020-06-01 00:00:00').status_code == 403
+    assert requests.get(server.baseurl + '/site/1/details', params={'api_key': 'mock'}).status_code == 403
+    assert requests.get(server.baseurl + '/version/current').status_code == 403
+
+
+def test_mock_server_rate_limits():
+    with SolarEdgeMockServer(sites=1, daily_quota=2) as mock_server:
+        url = mock_server.baseurl + '/version/current'
+        assert [requests.get(url, params={'api_key': 'mock'}).status_code for _ in range(3)] == [200, 200, 429]
+        assert requests.get(url, params={'api_key': 'other'}).status_code == 200
+
+    with SolarEdgeMockServer(sites=1, rate_limit_rate=1.0) as mock_server:
+        assert requests.get(mock_server.baseurl + '/version/current', params={'api_key': 'mock'}).status_code == 429
@@ -0,0 +1,36 @@
+
+import sys
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.http_request import Response, SlimResponse
+
+
+def test_slim_response_lazy_and_release():
+    response = SlimResponse(Response(url='http://x', status_code=200, text='{"a": [1, 2]}', size=13))
+    assert not hasattr(response, '__dict__')
+    assert response.data == {'a': [1, 2]}
+    assert response.pandas is None
+    assert response.release() is response
+    assert response.text is None and response.request is None
+    assert response.data == {'a': [1, 2]}
+
+
+def test_slim_response_api(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True, pandas_response=True,
+                       slim_response=True)
+    site_id = server.site_ids[0]
+    response = api.get_site_power(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert isinstance(response, SlimResponse)
+    assert api.metrics.histogram('site_power', 'phase.json_decode') is None
+
+    assert len(response.data['power']['values']) == 96
+    assert response.data['power']['values'][0]['date'].tzinfo is not None
+    assert api.metrics.histogram('site_power', 'phase.data_to_pandas') is None
+    assert 'power.values.value' in response.pandas.columns
+
+    text_size = sys.getsizeof(response.text)
+    response.release()
+    assert response.text is None and text_size > 0
+    assert len(response.data['power']['values']) == 96
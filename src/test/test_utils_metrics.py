@@ -0,0 +1,73 @@
+
+import datetime
+
+from solaredge_interface.api import SolarEdgeAPI as SolarEdgeAPIModule
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.http_request import Response
+from solaredge_interface.utils.metrics import MetricsSink, MetricsCollector
+
+
+def fake_http_request(url, params=None, retries=0, **kwargs):
+    text = '{"version": {"release": "1.0.0"}}'
+    return Response(url=url, status_code=200, text=text, size=len(text), retries=1,
+                    elapsed=datetime.timedelta(milliseconds=120))
+
+
+def test_metrics_collector():
+    metrics = MetricsCollector()
+    metrics.increment('site_energy', 'requests')
+    metrics.increment('site_energy', 'requests')
+    metrics.observe('site_energy', 'request_latency', 0.2)
+    metrics.observe('site_energy', 'request_latency', 0.4)
+    with metrics.timer('site_energy', 'phase.json_decode'):
+        pass
+
+    assert metrics.counter('site_energy', 'requests') == 2
+    assert metrics.counter('site_energy', 'unknown') == 0
+    latency = metrics.histogram('site_energy', 'request_latency')
+    assert latency['count'] == 2
+    assert latency['min'] == 0.2
+    assert latency['max'] == 0.4
+    assert 'phase.json_decode' in metrics.summary()['site_energy']['histograms']
+
+    metrics.reset()
+    assert metrics.summary() == {}
+
+
+def test_solaredge_api_metrics(monkeypatch):
+    monkeypatch.setattr(SolarEdgeAPIModule, 'http_request', fake_http_request)
+    api = SolarEdgeAPI(api_key='test')
+    api.get_version_current()
+
+    assert api.metrics.counter('version_current', 'requests') == 1
+    assert api.metrics.counter('version_current', 'retries') == 1
+    assert api.metrics.histogram('version_current', 'request_latency')['total'] == 0.12
+    assert api.metrics.histogram('version_current', 'response_bytes')['count'] == 1
+    assert api.metrics.histogram('version_current', 'phase.json_decode')['count'] == 1
+
+
+def test_solaredge_api_cache_metrics(monkeypatch):
+    monkeypatch.setattr(SolarEdgeAPIModule, 'http_request', fake_http_request)
+    api = SolarEdgeAPI(api_key='test')
+    api.get_sites(size=10)
+    api.get_sites(size=10)
+
+    assert api.metrics.counter('sites', 'cache_misses') == 1
+    assert api.metrics.counter('sites', 'cache_hits') == 1
+    assert api.metrics.counter('sites', 'requests') == 1
+
+
+def test_solaredge_api_custom_sink(monkeypatch):
+
+    class RecordingSink(MetricsSink):
+        def __init__(self):
+            self.observed = []
+
+        def observe(self, endpoint, name, value):
+            self.observed.append((endpoint, name))
+
+    monkeypatch.setattr(SolarEdgeAPIModule, 'http_request', fake_http_request)
+    sink = RecordingSink()
+    api = SolarEdgeAPI(api_key='test', metrics=sink)
+    api.get_version_supported()
+    assert ('version_supported', 'request_latency') in sink.observed
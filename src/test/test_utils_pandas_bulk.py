@@ -0,0 +1,54 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.pandas import bulk_data_key, bulk_to_pandas
+
+
+server_options = pytest.mark.parametrize('server', [{'sites': 3}], indirect=True)
+
+
+def test_bulk_to_pandas_values():
+    data = {'sitesEnergy': {'timeUnit': 'DAY', 'unit': 'Wh', 'count': 2, 'siteEnergyList': [
+        {'siteId': 1, 'energyValues': {'measuredBy': 'INVERTER', 'values': [
+            {'date': '2020-12-01 00:00:00', 'value': 10.0}, {'date': '2020-12-02 00:00:00', 'value': None}]}},
+        {'siteId': 2, 'energyValues': {'measuredBy': 'INVERTER', 'values': [
+            {'date': '2020-12-01 00:00:00', 'value': 30.0}]}},
+    ]}}
+    assert bulk_data_key(data) == 'sitesEnergy'
+    dataframe = bulk_to_pandas(data)
+    assert list(dataframe.columns) == ['site_id', 'timestamp', 'energy']
+    assert dataframe['site_id'].tolist() == [1, 1, 2]
+    assert str(dataframe['timestamp'].dtype).startswith('datetime64[')
+    assert dataframe['energy'].isna().tolist() == [False, True, False]
+    assert dataframe.groupby('site_id')['energy'].sum().to_dict() == {1: 10.0, 2: 30.0}
+
+    assert bulk_data_key({'energy': {'values': []}}) is None
+    with pytest.raises(ValueError):
+        bulk_to_pandas({'energy': {'values': []}})
+
+
+@server_options
+def test_bulk_pandas_response(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, pandas_response=True, pandas_bulk_long=True)
+    site_ids = ','.join([str(site_id) for site_id in server.site_ids])
+
+    power = api.get_site_power(site_ids, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert list(power.pandas.columns) == ['site_id', 'timestamp', 'power']
+    assert power.pandas['site_id'].value_counts().to_dict() == {site_id: 96 for site_id in server.site_ids}
+
+    overview = api.get_site_overview(site_ids)
+    assert overview.pandas['site_id'].tolist() == server.site_ids
+    assert overview.pandas['timestamp'].notna().all()
+    assert 'lifeTimeData.energy' in overview.pandas.columns
+
+    data_period = api.get_site_data_period(site_ids)
+    assert list(data_period.pandas.columns) == ['site_id', 'timestamp', 'startDate', 'endDate']
+    assert data_period.pandas['timestamp'].isna().all()
+
+    single = api.get_site_power(server.site_ids[0], '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert 'site_id' not in single.pandas.columns
+
+    wide = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, pandas_response=True)
+    power = wide.get_site_power(site_ids, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    assert 'site_id' not in power.pandas.columns
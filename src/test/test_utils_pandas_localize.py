@@ -0,0 +1,48 @@
+
+import pandas as pd
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils.pandas import localize_pandas
+
+
+def test_localize_pandas_dst_ambiguous(caplog):
+    # Australia/Sydney DST ends 2021-04-04 03:00 -> 02:00; the 02:xx local times repeat
+    dates = ['2021-04-04 01:30:00', '2021-04-04 02:00:00', '2021-04-04 02:30:00',
+             '2021-04-04 02:00:00', '2021-04-04 02:30:00', '2021-04-04 03:00:00']
+    dataframe = pd.DataFrame({'values.date': dates, 'values.value': range(6), 'name': ['x'] * 6})
+    dataframe = localize_pandas(dataframe, tz='Australia/Sydney')
+    assert str(dataframe['values.date'].dtype).startswith('datetime64[')
+    assert str(dataframe['values.date'].dt.tz) == 'Australia/Sydney'
+    assert [str(value)[-6:] for value in dataframe['values.date']] == ['+11:00'] * 3 + ['+10:00'] * 3
+    assert dataframe['name'].tolist() == ['x'] * 6
+
+    unordered = localize_pandas(pd.DataFrame({'date': ['2021-04-04 02:00:00', '2021-04-04 02:00:00'][::-1] * 2}),
+                                tz='Australia/Sydney')
+    assert unordered['date'].isna().any()
+    assert 'unable to infer DST ambiguous times' in caplog.text
+    with pytest.raises(Exception):
+        localize_pandas(pd.DataFrame({'date': ['2021-04-04 02:00:00']}), tz='Australia/Sydney', ambiguous='raise')
+
+
+def test_localize_pandas_index_levels():
+    dataframe = pd.DataFrame({'serialNumber': ['a', 'b'], 'date': ['2020-12-06 00:00:00'] * 2, 'value': [1, 2]})
+    dataframe = localize_pandas(dataframe.set_index(['serialNumber', 'date']), tz='UTC')
+    assert list(dataframe.index.names) == ['serialNumber', 'date']
+    assert str(dataframe.index.get_level_values('date').tz) == 'UTC'
+
+
+@pytest.mark.parametrize('datetime_response', [False, True])
+def test_pandas_datetime64_api(server, datetime_response):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, pandas_response=True, pandas_datetime64=True,
+                       datetime_response=datetime_response)
+    plain = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, pandas_response=True, datetime_response=True)
+    site_id = server.site_ids[0]
+    response = api.get_site_power(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+    expected = plain.get_site_power(site_id, '2020-12-06 00:00:00', '2020-12-06 23:59:59')
+
+    dates = response.pandas['power.values.date']
+    assert str(dates.dt.tz) == 'Australia/Sydney'
+    assert list(dates) == list(expected.pandas['power.values.date'])
+    if datetime_response:
+        assert response.data['power']['values'][0]['date'].tzinfo is None
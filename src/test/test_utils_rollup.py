@@ -0,0 +1,57 @@
+
+import pytest
+
+from solaredge_interface.api.SolarEdgeAPI import SolarEdgeAPI
+from solaredge_interface.utils import rollup
+
+
+def test_rollup_dst_day_boundaries():
+    # Australia/Sydney DST ends 2021-04-04 03:00 -> 02:00, the day has 25 hours (100 quarter hours)
+    values = []
+    for day, hours in [(3, 24), (4, 25), (5, 24)]:
+        for quarter in range(hours * 4):
+            hour, minute = divmod(quarter * 15, 60)
+            if day == 4 and hour >= 3:
+                hour -= 1  # the repeated 02:00-02:59 local hour
+            values.append({'date': '2021-04-{:02d} {:02d}:{:02d}:00'.format(day, hour, minute), 'value': 4.0})
+    data = {'power': {'timeUnit': 'QUARTER_OF_AN_HOUR', 'unit': 'W', 'values': values}}
+
+    result = rollup.rollup(data, time_units=['HOUR', 'DAY'], tz='Australia/Sydney')
+    days = result['DAY']['Production']
+    assert list(days.values) == [96.0, 100.0, 96.0]
+    assert [str(index) for index in days.index] == [
+        '2021-04-03 00:00:00+11:00', '2021-04-04 00:00:00+11:00', '2021-04-05 00:00:00+10:00'
+    ]
+    assert len(result['HOUR'].index) == 24 + 25 + 24
+
+
+def test_rollup_virtual_meters():
+    data = {'energyDetails': {'timeUnit': 'QUARTER_OF_AN_HOUR', 'unit': 'Wh', 'meters': [
+        {'type': 'Production', 'values': [{'date': '2020-12-06 12:00:00', 'value': 300.0},
+                                          {'date': '2020-12-06 12:15:00', 'value': 100.0}]},
+        {'type': 'Consumption', 'values': [{'date': '2020-12-06 12:00:00', 'value': 200.0},
+                                           {'date': '2020-12-06 12:15:00', 'value': 150.0}]},
+    ]}}
+    hour = rollup.rollup(data, time_units=['HOUR'], tz='UTC')['HOUR'].iloc[0]
+    assert hour['SelfConsumption'] == 300.0
+    assert hour['FeedIn'] == 100.0
+    assert hour['Purchased'] == 50.0
+    with pytest.raises(ValueError):
+        rollup.rollup({'overview': {}})
+
+
+def test_rollup_matches_api_time_units(server):
+    api = SolarEdgeAPI(api_key='mock', baseurl=server.baseurl, datetime_response=True)
+    site_id = server.site_ids[0]
+    result = api.get_site_energy_rollup(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59',
+                                        time_units=['HOUR', 'DAY'])
+    assert api.metrics.counter('site_energy_details', 'requests') == 1
+
+    daily = api.get_site_energy_details(site_id, '2020-12-01 00:00:00', '2020-12-07 23:59:59', time_unit='DAY')
+    for meter in daily.data['energyDetails']['meters']:
+        expected = [item['value'] for item in meter['values']]
+        assert list(result['DAY'][meter['type']].values) == pytest.approx(expected, abs=0.01)
+
+    power = api.get_site_power(site_id, '2020-12-01 00:00:00', '2020-12-01 23:59:59')
+    from_power = rollup.rollup(power, time_units=['DAY'])['DAY']['Production']
+    assert from_power.iloc[0] == pytest.approx(result['DAY']['Production'].iloc[0], abs=0.01)
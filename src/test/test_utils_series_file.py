@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from solaredge_interface.utils.series_file import write_series, read_series, encode_timestamps, \
+    decode_timestamps, xor_encode, xor_decode, SeriesFileException
+
+
+def test_encode_timestamps_runs():
+    timestamps = np.array(['2020-12-01 00:00:00', '2020-12-01 00:15:00', '2020-12-01 00:30:00',
+                           '2020-12-01 01:30:00', '2020-12-01 01:45:00', '2020-12-01 01:50:00'],
+                          dtype='datetime64[s]')
+    step, runs = encode_timestamps(timestamps)
+    assert step == 900
+    assert runs[:, 1].tolist() == [3, 2, 1]
+    assert (decode_timestamps(step, runs) == timestamps).all()
+
+    values = np.array([0.0, 1.5, 1.5, np.nan, -2.25, 1e9])
+    decoded = xor_decode(xor_encode(values))
+    assert np.array_equal(decoded, values, equal_nan=True)
+    assert xor_encode([1.5, 1.5])[1] == 0
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_write_read_series(tmp_path, compress):
+    filename = str(tmp_path / 'site.sets')
+    dates = np.arange(np.datetime64('2020-01-01T00:00:00'), np.datetime64('2020-02-01T00:00:00'),
+                      np.timedelta64(15, 'm'))
+    values = [None if i % 97 == 0 else float(i % 50) for i in range(len(dates))]
+    write_series(filename, {'Production': (dates, values), 'empty': ([], [])}, metadata={'site_id': 1},
+                 compress=compress)
+
+    metadata, series = read_series(filename)
+    assert metadata == {'site_id': 1}
+    timestamps, decoded = series['Production']
+    assert (timestamps == dates).all()
+    assert np.isnan(decoded[0]) and decoded[1] == 1.0
+    assert np.array_equal(decoded, np.array(values, dtype='f8'), equal_nan=True)
+    assert len(series['empty'][0]) == 0
+
+    with pytest.raises(SeriesFileException):
+        write_series(filename, {'bad': (dates[:2], [1.0])})
+    with open(filename, 'wb') as f:
+        f.write(b'not a series file')
+    with pytest.raises(SeriesFileException):
+        read_series(filename)